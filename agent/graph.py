@@ -1,33 +1,227 @@
 # This File defines the flow of our travel planning AI agent.
 # Importing state management, agent state, and all functional nodes used to build the travel planning conversational flow.
 
-from langgraph.graph import StateGraph, END
+import copy
+import threading
+import time
+from dataclasses import fields, replace
+from typing import Callable, Dict, List, Optional
+
+from langgraph.graph import StateGraph, START, END
+from langchain_core.runnables import RunnableLambda
 from agent.state import AgentState  # Fixed: Relative import for sibling file
+from agent.tools.checkpoints import make_checkpointer
+from agent.tools.metrics import estimate_bytes, observe_node, register_gauges
+from agent.tools.usage import node_scope
 from .nodes.preference_extractor import extract_preferences  # Fixed: Relative import
-from .nodes.destination_finder import filter_destinations  # Fixed: Relative import
-from .nodes.itinerary_creator import create_itinerary  # Fixed: Relative import
-from .nodes.followup_handler import check_followup  # Fixed: Relative import
+from .nodes.destination_finder import find_destinations, afind_destinations  # Fixed: Relative import
+from .nodes.itinerary_creator import create_itinerary, acreate_itinerary, replan_itinerary, areplan_itinerary  # Fixed: Relative import
+from .nodes.followup_handler import check_followup, SUGGESTION_INTENTS  # Fixed: Relative import
 from .nodes.response_generator import generate_response  # Fixed: Relative import
 
 
-def build_graph():
+# Each node: (sync function, async variant or None). Nodes that block (catalog, Gemini) get a
+# sync + async pair: invoke() runs the first, ainvoke() awaits the second.
+NODES = {
+    "extract_preferences": (extract_preferences, None),  # Reads what the user wants (node-1)
+    "find_destinations": (find_destinations, afind_destinations),  # Suggests matching places (node-2)
+    "check_followup": (check_followup, None),  # Turns follow-ups into intents + preference deltas (node-3)
+    "create_itinerary": (create_itinerary, acreate_itinerary),  # Plans the day-by-day trip (node-4)
+    "replan_itinerary": (replan_itinerary, areplan_itinerary),  # Re-plans only the days a follow-up asked to change
+    "generate_response": (generate_response, None),  # Builds a response message (node-5)
+}
+
+# node -> what it runs after. Each entry is a node name, or a tuple of names for a fan-in join
+# (runs once all of them finished); entries are alternatives. Nodes whose inputs are ready in
+# the same step run concurrently. Edges out of a node in ROUTES are chosen by its router instead.
+DEPENDENCIES = {
+    "extract_preferences": [],
+    "check_followup": [],  # in parallel with extraction; its preference delta is applied downstream
+    # Routed from check_followup; extract_preferences ran in the same step, so its preferences are in
+    "find_destinations": ["check_followup"],
+    "replan_itinerary": ["check_followup"],
+    "create_itinerary": ["find_destinations"],
+    "generate_response": ["find_destinations", "create_itinerary", "replan_itinerary"],
+}
+
+# The original strict chain: every node on every turn, kept for comparison (build_graph(routed=False))
+SERIAL_DEPENDENCIES = {
+    "extract_preferences": [],
+    "find_destinations": ["extract_preferences"],
+    "check_followup": ["find_destinations"],
+    "create_itinerary": ["check_followup"],
+    "generate_response": ["create_itinerary"],
+}
+
+
+def route_turn(state: AgentState) -> str:
+    """Itinerary edits go straight to replan_itinerary; everything else needs a destination search"""
+    return "replan_itinerary" if state.intent == "replan" else "find_destinations"
+
+
+def route_after_search(state: AgentState) -> str:
+    """Follow-ups that only asked for new suggestions skip the Gemini itinerary"""
+    return "generate_response" if state.intent in SUGGESTION_INTENTS else "create_itinerary"
+
+
+ROUTES = {
+    "check_followup": route_turn,
+    "find_destinations": route_after_search,
+}
+
+
+def _sources(entry) -> tuple:
+    return entry if isinstance(entry, tuple) else (entry,)
+
+
+def _fork(state: AgentState) -> AgentState:
+    """Copy of the state whose top-level containers a node can mutate without touching
+    the values a concurrently running branch sees"""
+    return replace(state, **{f.name: copy.copy(getattr(state, f.name)) for f in fields(state)})
+
+
+def _changes(before: AgentState, after: AgentState) -> Dict:
+    """Only the fields a node changed. Parallel branches each write their own keys, so
+    their updates merge instead of overwriting each other with stale copies."""
+    return {f.name: getattr(after, f.name) for f in fields(after)
+            if f.name != "timings" and getattr(after, f.name) != getattr(before, f.name)}
+
+
+# Called after every node run with (node name, seconds, exception or None, state size delta in
+# bytes). metrics.observe_node feeds /metrics; tests and tools can append their own.
+NodeHook = Callable[[str, float, Optional[BaseException], int], None]
+node_hooks: List[NodeHook] = [observe_node]
+
+
+def _report(name: str, start: float, error: Optional[BaseException], before: AgentState, update: Dict) -> None:
+    if not node_hooks:
+        return
+    seconds = time.perf_counter() - start
+    delta = sum(estimate_bytes(value) - estimate_bytes(getattr(before, key)) for key, value in update.items())
+    for hook in node_hooks:
+        try:
+            hook(name, seconds, error, delta)
+        except Exception as e:  # instrumentation must never fail a request
+            print(f"⚠️ Node hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+
+def as_node(name: str, func: Callable, afunc: Optional[Callable] = None) -> RunnableLambda:
+    """Wraps a node so it returns a partial update plus its own run time in `timings`,
+    and reports every run (time, error, state growth) to the node hooks"""
+    def finish(state: AgentState, result: AgentState, start: float) -> Dict:
+        update = _changes(state, result)
+        _report(name, start, None, state, update)
+        update["timings"] = {name: round((time.perf_counter() - start) * 1000, 3)}
+        return update
+
+    def run(state: AgentState) -> Dict:
+        start = time.perf_counter()
+        try:
+            with node_scope(name):
+                result = func(_fork(state))
+        except Exception as e:
+            _report(name, start, e, state, {})
+            raise
+        return finish(state, result, start)
+
+    async def arun(state: AgentState) -> Dict:
+        start = time.perf_counter()
+        try:
+            with node_scope(name):
+                result = await afunc(_fork(state)) if afunc else func(_fork(state))
+        except Exception as e:
+            _report(name, start, e, state, {})
+            raise
+        return finish(state, result, start)
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
+def build_graph(routed: bool = True, checkpointer=None):
+    """The compiled graph; with a checkpointer (see tools/checkpoints.py) runs are saved after every step"""
     graph = StateGraph(AgentState)
+    dependencies = DEPENDENCIES if routed else SERIAL_DEPENDENCIES
+    routes = ROUTES if routed else {}
 
     # Add each node representing a stage of the travel planning pipeline
-    graph.add_node("extract_preferences", extract_preferences)  # Reads what the user wants (node-1)
-    graph.add_node("find_destinations", filter_destinations)  # Suggests matching places (node-2)
-    graph.add_node("check_followup", check_followup)  # Checks if user asked for changes (node-3) 
-    graph.add_node("create_itinerary", create_itinerary)  # Plans a 3-day trip (node-4) 
-    graph.add_node("generate_response", generate_response)  # Builds a response message (node-5)
-
-    # Set where the graph starts
-    graph.set_entry_point("extract_preferences")
-
-    # Define the path through each node
-    graph.add_edge("extract_preferences", "find_destinations")
-    graph.add_edge("find_destinations", "check_followup")
-    graph.add_edge("check_followup", "create_itinerary")
-    graph.add_edge("create_itinerary", "generate_response")
-    graph.add_edge("generate_response", END)
-    
-    return graph.compile()  # Compiles and returns the executable graph
\ No newline at end of file
+    for name in dependencies:
+        graph.add_node(name, as_node(name, *NODES[name]))
+
+    # Define the path through each node: roots start together, joins wait for every input
+    for name, entries in dependencies.items():
+        if not entries:
+            graph.add_edge(START, name)
+        for entry in entries:
+            if isinstance(entry, tuple):
+                graph.add_edge(list(entry), name)
+            elif entry not in routes:
+                graph.add_edge(entry, name)
+    for source, router in routes.items():
+        graph.add_conditional_edges(source, router, [name for name, entries in dependencies.items() if source in entries])
+    needed = {source for entries in dependencies.values() for entry in entries for source in _sources(entry)}
+    for name in dependencies:
+        if name not in needed:
+            graph.add_edge(name, END)
+
+    return graph.compile(checkpointer=checkpointer)  # Compiles and returns the executable graph
+
+
+def critical_path_ms(timings: Dict[str, float], dependencies: Dict[str, List] = DEPENDENCIES) -> float:
+    """Longest chain of node run times through the dependency graph: the latency floor of one run.
+    Nodes a run skipped have no timing and count as zero."""
+    finish: Dict[str, float] = {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            finish[name] = timings.get(name, 0.0) + max(
+                (max(finish_time(source) for source in _sources(entry)) for entry in dependencies[name]), default=0.0)
+        return finish[name]
+
+    return max((finish_time(name) for name in dependencies), default=0.0)
+
+
+# One compiled graph per process. A compiled graph keeps no per-run state (every invoke
+# gets its own channels), so the same instance serves concurrent requests safely.
+_graph = None
+_graph_lock = threading.Lock()
+graph_stats: Dict[str, float] = {}  # startup metrics: build_ms, warm_ms
+register_gauges("agent_graph", "Graph startup timings in milliseconds.", lambda: graph_stats)
+
+
+def get_graph():
+    """The shared compiled graph, built on first use"""
+    global _graph
+    graph = _graph
+    if graph is None:
+        with _graph_lock:
+            if _graph is None:
+                start = time.perf_counter()
+                _graph = build_graph()
+                graph_stats["build_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            graph = _graph
+    return graph
+
+
+_durable_graph = None  # False once we know checkpoints are off
+
+
+def get_durable_graph():
+    """The shared graph compiled with the checkpointer from GRAPH_CHECKPOINTS (tools/checkpoints.py),
+    for runs that should survive a restart; the plain graph when checkpoints are off"""
+    global _durable_graph
+    if _durable_graph is None:
+        with _graph_lock:
+            if _durable_graph is None:
+                checkpointer = make_checkpointer()
+                _durable_graph = build_graph(checkpointer=checkpointer) if checkpointer is not None else False
+    return _durable_graph if _durable_graph is not False else get_graph()
+
+
+def warm_graph() -> Dict[str, float]:
+    """Dry run through every node so the first real request doesn't pay for lazy setup
+    (catalog load, index compilation). No dates in the state, so no LLM call is made."""
+    graph = get_graph()
+    start = time.perf_counter()
+    graph.invoke(AgentState(chat_history=[{"user": ""}]))
+    graph_stats["warm_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return dict(graph_stats)
@@ -1,50 +1,24 @@
-# destination_db.py
-
-import json
-import os
-from typing import List, Dict
-
-def load_destinations() -> List[Dict]:
-    """Loads all destination data from the JSON file regardless of where script is run."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(base_dir, "..", "data", "destinations.json")
-
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"❌ destinations.json not found at {file_path}")
-        return []
-
-def filter_destinations(preferences: Dict) -> List[Dict]:
-    """Filters destinations based on full user preferences"""
-    all_destinations = load_destinations()
-    filtered = []
-
-    for dest in all_destinations:
-        match = True
-
-        # Region check
-        if "preferred_city" in preferences:
-            if preferences["preferred_city"].lower() not in dest.get("region", "").lower():
-                match = False
-
-        # Travel style (tags) check
-        if "travel_style" in preferences:
-            if preferences["travel_style"].lower() not in [tag.lower() for tag in dest.get("tags", [])]:
-                match = False
-
-        # Budget check
-        if "budget" in preferences:
-            if preferences["budget"].lower() != dest.get("budget", "").lower():
-                match = False
-
-        # Travel type check
-        if "travel_type" in preferences:
-            if preferences["travel_type"].lower() != dest.get("travel_type", "").lower():
-                match = False
-
-        if match:
-            filtered.append(dest)
-
-    return filtered
+# destination_finder.py
+# This node looks up destinations matching the extracted preferences in the shared catalog.
+
+from agent.nodes.followup_handler import apply_preference_delta
+from agent.state import AgentState
+from agent.tools.llm import run_blocking
+from agent.tools.destination_db import filter_destinations, rank_destinations
+
+def find_destinations(state: AgentState) -> AgentState:
+    """Stores the catalog matches for the current preferences (with the follow-up's delta) on the state"""
+    apply_preference_delta(state)
+    excluded = set(state.preferences.get("exclude", []))  # already shown on an earlier turn
+    matches = [d for d in filter_destinations(state.preferences) if d["name"] not in excluded]
+    if not matches:
+        # Nothing matches every preference: offer the closest matches instead of an empty answer
+        ranked = rank_destinations(state.preferences, k=5 + len(excluded))
+        matches = [d for d in ranked if d["name"] not in excluded][:5]
+    state.suggested_destinations = matches
+    return state
+
+
+async def afind_destinations(state: AgentState) -> AgentState:
+    """Async variant: catalog queries (and a first-use catalog load) run on the bounded pool"""
+    return await run_blocking(find_destinations, state)
@@ -1,11 +1,82 @@
 # This node helps the agent understand whether the user is asking a follow-up question.
+# Follow-ups are turned into a structured intent plus a delta on the preferences, which the
+# graph uses to decide what to re-run (new suggestions only, one itinerary day, or everything).
+# It runs in parallel with extract_preferences, so it never writes `preferences` itself: the
+# delta goes in `preference_delta` and the next node applies it (apply_preference_delta).
 
+from agent.nodes.preference_extractor import preferences_from
 from agent.state import AgentState
+from agent.tools.matcher import scan_message
+
+BUDGET_LADDER = ["low", "moderate", "high"]
+BUDGET_ALIASES = {"budget": "low", "mid-range": "moderate", "medium": "moderate", "luxury": "high"}
+
+# Intent phrases live in data/vocabulary.json ("intent" slot); suggestion intents are checked
+# in this order (the first match wins)
+INTENT_ORDER = ["cheaper", "another", "instead"]
+
+# Intents that only need new suggestions: the graph skips itinerary generation for them
+SUGGESTION_INTENTS = {"cheaper", "another", "instead"}
+
+
+def cheaper_budget(budget) -> str:
+    """One budget tier below `budget` (unknown budgets count as moderate)"""
+    budget = BUDGET_ALIASES.get(str(budget).lower(), str(budget).lower())
+    tier = BUDGET_LADDER.index(budget) if budget in BUDGET_LADDER else 1
+    return BUDGET_LADDER[max(0, tier - 1)]
+
+
+def apply_preference_delta(state: AgentState) -> AgentState:
+    """Applies (and clears) check_followup's delta; called by the nodes that read the preferences after it.
+    A None value drops that preference"""
+    if state.preference_delta:
+        merged = {**state.preferences, **state.preference_delta}
+        state.preferences = {key: value for key, value in merged.items() if value is not None}
+        state.preference_delta = {}
+    return state
+
+
 def check_followup(state: AgentState) -> AgentState:                                    # Checks if the user's latest message is a follow-up and updates the state.
     latest_message = state.chat_history[-1]["user"] if state.chat_history else ""
-    followup_keywords = ["change", "another", "cheaper", "instead", "more", "different", "else", "alternative"]
+    found = scan_message(latest_message)  # the same pass extract_preferences used
+    intents = found.get("intent", [])
+
+    state.is_followup = "followup" in intents
+    state.intent, state.replan_days, state.replan_slots, state.preference_delta = None, [], [], {}
+    # What extract_preferences makes of the same scan, so the delta is relative to this turn's preferences
+    preferences = {**state.preferences, **preferences_from(found)}
+    # Exclusions only carry over between "another" turns: any other turn (a new search, "cheaper",
+    # "instead", an edit) drops them, unless the "another" branch below replaces them
+    if "exclude" in preferences:
+        state.preference_delta = {"exclude": None}
+
+    # "change day 2 ...", "something cheaper in the evening" with an itinerary from an earlier
+    # turn: an edit of the plan, re-planning only the days / parts of days mentioned
+    if state.itinerary and "edit" in intents:
+        days = sorted({n for n in found.get("day", []) if 1 <= n <= len(state.itinerary)})
+        slots = list(found.get("time_of_day", []))
+        if days or slots:
+            state.intent, state.replan_days, state.replan_slots, state.is_followup = "replan", days, slots, True
+            if "cheaper" in intents:  # "cheaper" applies to the re-planned part too
+                state.preference_delta["budget"] = cheaper_budget(preferences.get("budget", "moderate"))
+            return state
+
+    # Suggestion intents only make sense once there is something to compare against
+    if not state.suggested_destinations:
+        return state
+    intent = next((intent for intent in INTENT_ORDER if intent in intents), None)
+    if intent is None:
+        return state
+    state.intent, state.is_followup = intent, True
+
+    if state.intent == "cheaper":
+        current = preferences.get("budget") or state.suggested_destinations[0].get("budget", "moderate")
+        state.preference_delta["budget"] = cheaper_budget(current)
+    elif state.intent == "another":
+        # Keep the preferences, hide what was already shown
+        shown = [d["name"] for d in state.suggested_destinations]
+        state.preference_delta["exclude"] = list(dict.fromkeys(preferences.get("exclude", []) + shown))
+    # "instead": the new value is picked up by extract_preferences this turn
 
-    is_followup = any(keyword in latest_message.lower() for keyword in followup_keywords)
-    
-    state.is_followup = is_followup
+    state.itinerary = []  # the old plan was for destinations that are being replaced
     return state
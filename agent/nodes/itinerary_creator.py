@@ -1,20 +1,111 @@
-from agent.state import AgentState
+# itinerary_creator.py
+# Plans the day-by-day trip with Gemini. A first plan is one full prompt; on later turns only
+# the days a change touches are regenerated and spliced back into the previous itinerary.
+# When the graph is streamed with stream_mode "custom" and {"configurable": {"stream_days": True}}
+# (main.py's /recommend/stream), Gemini's reply is streamed too and every day is sent to the
+# client as soon as it is complete.
+# Full-plan replies are date-independent ("Day 1", "Day 2", ...), so with LLM_CACHE set they are
+# cached by prompt fingerprint and reused for any trip with the same destinations, length and
+# travel type, with the days placed on the new trip's dates.
+# Identical prompts in flight at the same time (a burst of the same trip) share one Gemini call.
+# Trips longer than ITINERARY_CHUNK_DAYS are planned in day ranges generated concurrently, all
+# following one outline of which destination each day is at, and stitched back in day order.
+# With ITINERARY_FORMAT=json, full plans ask for JSON held to a response schema (days -> slots ->
+# activities, recommendations, tips) and read it with a single-pass incremental parser; a reply
+# that turns out to be markdown is read as before. Either way each itinerary day carries its
+# title and slots as data next to the markdown the chat shows.
+# A request with a token budget (see tools/usage.py) that a prompt would exceed gets the prompt's
+# compact form instead: the reply format in a few lines, without the worked example.
+
+import asyncio
+import contextvars
+import os
+import re
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import timedelta
-import google.generativeai as genai
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from langgraph.config import get_config, get_stream_writer
+from agent.nodes.followup_handler import apply_preference_delta
+from agent.state import AgentState
+from agent.tools.itinerary_json import (GENERATION_CONFIG, LIST_KEYS, JsonItineraryStream, day_markdown,
+                                        notes_markdown, parse_itinerary, typed_day)
+from agent.tools.llm import DEFAULT_MODEL, agenerate_text, astream_text, generate_text, run_blocking
+from agent.tools.llm_cache import make_llm_cache, prompt_key
+from agent.tools.metrics import register_cache
+from agent.tools.singleflight import SingleFlight
+from agent.tools.usage import count_trim, fits
 
-def create_itinerary(state: AgentState) -> AgentState:
-    if not state.suggested_destinations or not state.preferences.get("start_date"):
-        return state
+INCREMENTAL = os.getenv("ITINERARY_INCREMENTAL", "1") != "0"  # 0: always regenerate the whole plan
+PLAN_KEYS = ("travel_type",)  # preferences the prompts use: changing one affects every day
+DAY_HEADER = re.compile(r"^\*\*Day (\d+)")
+DAY_TITLE = re.compile(r"^\*\*Day \d+:?\s*(.*?)\*\*")
+SLOT_LINE = re.compile(r"^- (Morning|Afternoon|Evening):\s*(.*)")
+NOTE_HEADERS = {"**Key Recommendations": "recommendations", "**Travel Tips": "tips"}
+COMPACT_DAYS = '    Each day: "**Day [N]: [Day Title]**", then "- Morning:", "- Afternoon:" and "- Evening:" lines.'
+STRUCTURED = os.getenv("ITINERARY_FORMAT", "markdown") == "json"
+STREAM_DAYS = "stream_days"  # configurable flag: write a "day" event for every finished day
+CHUNK_DAYS = int(os.getenv("ITINERARY_CHUNK_DAYS", "7"))  # longer trips are generated in ranges; 0: never
 
+# Day-range calls in flight at once. Sync runs use chunk_pool, which is separate from
+# llm.blocking_pool because the sync run itself may be on that pool. Async runs use a semaphore
+# of the same size, one per event loop.
+CHUNK_WORKERS = int(os.getenv("ITINERARY_CHUNK_WORKERS", "8"))
+chunk_pool = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="itinerary-chunk")
+_chunk_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+response_cache = make_llm_cache()  # None unless LLM_CACHE is memory or sqlite
+if response_cache is not None:
+    register_cache("itinerary_llm", response_cache)
+flights = SingleFlight("itinerary_llm")
+
+
+def _json_prompt(state: AgentState, first: int, last: int, outline: str = "", compact: bool = False) -> str:
+    """Structured-mode prompt for days first..last; the reply is held to ITINERARY_SCHEMA, so the
+    compact form only names the fields"""
+    num_days = len(_trip_dates(state))
+    destination_names = ", ".join(d["name"] for d in state.suggested_destinations)
+    travel_type = state.preferences.get("travel_type", "general")
+    if (first, last) == (1, num_days):
+        task = f"Create a detailed {num_days}-day itinerary for {travel_type} travelers visiting: {destination_names}."
+    else:
+        task = (f"Plan Days {first}-{last} of a {num_days}-day itinerary for {travel_type} travelers visiting: "
+                f"{destination_names}.\n    The other days are planned separately. Every day follows this outline:"
+                f"\n    {outline}")
+    if compact:
+        fields = (['"title", "overview"'] if first == 1 else []) + [f'"days" {first} to {last}'] + \
+            (['"recommendations", "tips"'] if last == num_days else [])
+        return f"{task}\n    Reply with JSON only: {', '.join(fields)}.\n"
+    fields = ['"title": a short title for the trip, and "overview": one paragraph about it'] if first == 1 else []
+    fields.append(f'"days": Day {first} to Day {last} only, each with "day", a "title" and "slots": Morning, '
+                  f'Afternoon and Evening, each with an "activity" with details')
+    if last == num_days:
+        fields += ['"recommendations": best restaurant (with its cuisine), must-try activity, hidden gem, '
+                   'local insight', '"tips": transportation advice, a packing suggestion, a budget tip']
+    return f"""
+    {task}
+    Reply with JSON only, with these fields:
+    {chr(10).join("    - " + field for field in fields).lstrip()}
+    """
+
+
+def _itinerary_prompt(state: AgentState, compact: bool = False) -> str:
+    if STRUCTURED:
+        return _json_prompt(state, 1, len(_trip_dates(state)), compact=compact)
     start_date = state.preferences["start_date"]
-    end_date = state.preferences["end_date"]
-    num_days = (end_date - start_date).days + 1
+    num_days = (state.preferences["end_date"] - start_date).days + 1
     destination_names = [d["name"] for d in state.suggested_destinations]
     travel_type = state.preferences.get("travel_type", "general")
+    if compact:
+        return f"""
+    Create a detailed {num_days}-day itinerary for {travel_type} travelers visiting: {", ".join(destination_names)}.
+    Start with "### [Destination] Itinerary" and an overview paragraph, then "---".
+{COMPACT_DAYS}
+    End with "---", then "**Key Recommendations:**" and "**Travel Tips:**" bullet lists.
+    """
 
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    
-    prompt = f"""
+    return f"""
     Create a detailed {num_days}-day itinerary for {travel_type} travelers visiting: {", ".join(destination_names)}.
     Structure your response EXACTLY like this format:
 
@@ -52,52 +143,608 @@ def create_itinerary(state: AgentState) -> AgentState:
     - [Budget tip]
     """
 
-    try:
-        response = model.generate_content(prompt)
-        full_itinerary = response.text
-        
-        # Split the response into days
-        day_sections = []
-        current_day = []
-        
-        for line in full_itinerary.split('\n'):
-            if line.startswith('**Day ') and current_day:
-                day_sections.append('\n'.join(current_day))
-                current_day = [line]
-            else:
-                current_day.append(line)
-        
-        if current_day:
-            day_sections.append('\n'.join(current_day))
-        
-        # Assign each day section to the itinerary
-        itinerary = []
-        current_date = start_date
-        
-        for i, day_content in enumerate(day_sections[:num_days]):
-            itinerary.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "activities": day_content.strip()
-            })
-            current_date += timedelta(days=1)
-        
-        # Add the recommendations section to the last day
-        if len(itinerary) > 0:
-            recommendations_section = "\n".join(
-                line for line in full_itinerary.split('\n') 
-                if line.startswith('**Key Recommendations:') or 
-                   line.startswith('**Travel Tips:') or
-                   line.startswith('-')
-            )
-            itinerary[-1]["activities"] += "\n\n" + recommendations_section
-        
-        state.itinerary = itinerary
-        
-    except Exception as e:
-        # Fallback simple itinerary
-        state.itinerary = [{
-            "date": (start_date + timedelta(days=i)).strftime("%Y-%m-%d"),
-            "activities": f"Day {i+1}: Explore {destination_names[0]}"
-        } for i in range(num_days)]
-    
+
+def _day_ranges(num_days: int, size: int) -> List[Tuple[int, int]]:
+    """(first, last) day ranges of at most `size` days, as even as possible: 10 days by 7 -> 1-5, 6-10"""
+    if size <= 0 or num_days <= size:
+        return [(1, num_days)]
+    count = -(-num_days // size)
+    bounds = [i * num_days // count for i in range(count + 1)]
+    return [(bounds[i] + 1, bounds[i + 1]) for i in range(count)]
+
+
+def _outline(state: AgentState) -> str:
+    """Which destination each stretch of the trip is at, shared by every range's prompt"""
+    names, num_days = [d["name"] for d in state.suggested_destinations], len(_trip_dates(state))
+    stretches = [(i * num_days // len(names) + 1, (i + 1) * num_days // len(names), name)
+                 for i, name in enumerate(names)]
+    return "\n    ".join(f"- Day {first}" + (f" to Day {last}" if last > first else "") + f": {name}"
+                          for first, last, name in stretches if first <= last)
+
+
+def _chunk_prompt(state: AgentState, first: int, last: int, outline: str, compact: bool = False) -> str:
+    """Prompt for one day range of a long trip; the first range also writes the overview and the
+    last one the recommendations, so the stitched reply reads like a full-plan reply"""
+    if STRUCTURED:
+        return _json_prompt(state, first, last, outline, compact)
+    num_days = len(_trip_dates(state))
+    destination_names = [d["name"] for d in state.suggested_destinations]
+    travel_type = state.preferences.get("travel_type", "general")
+    if compact:
+        header = '    Start with "### [Destination] Itinerary" and an overview paragraph, then "---".\n' \
+            if first == 1 else ""
+        footer = '    End with "---", then "**Key Recommendations:**" and "**Travel Tips:**" bullet lists.\n' \
+            if last == num_days else ""
+        return f"""
+    Plan Days {first}-{last} of a {num_days}-day itinerary for {travel_type} travelers visiting: {", ".join(destination_names)}.
+    Every day follows this outline:
+    {outline}
+{header}{COMPACT_DAYS}
+{footer}"""
+    header = f"""
+    ### [Destination] Itinerary
+    **Selected Destinations:** {", ".join(destination_names)}
+    **Travel Style:** {travel_type} Travel
+
+    [Brief overview paragraph about the whole trip]
+
+    ---
+""" if first == 1 else ""
+    footer = """
+    ---
+
+    **Key Recommendations:**
+    - Best restaurant: [Name] ([Cuisine type])
+    - Must-try activity: [Activity]
+    - Hidden gem: [Tip]
+    - Local insight: [Cultural note]
+
+    **Travel Tips:**
+    - [Transportation advice]
+    - [Packing suggestion]
+    - [Budget tip]
+""" if last == num_days else ""
+    return f"""
+    Plan Days {first}-{last} of a {num_days}-day itinerary for {travel_type} travelers visiting: {", ".join(destination_names)}.
+    The other days are planned separately. Every day follows this outline:
+    {outline}
+
+    Structure your response EXACTLY like this format, with no other days:
+{header}
+    **Day {first}: [Day Title]**
+    - Morning: [Activity with details]
+    - Afternoon: [Activity with details]
+    - Evening: [Activity with details]
+
+    [Continue until Day {last}...]
+{footer}"""
+
+
+def _trip_dates(state: AgentState) -> List[str]:
+    start_date = state.preferences["start_date"]
+    num_days = (state.preferences["end_date"] - start_date).days + 1
+    return [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(num_days)]
+
+
+def _plan_basis(state: AgentState) -> Dict:
+    """What an itinerary was planned for; compared on later turns to find the days a change touches"""
+    return {"destinations": [d["name"] for d in state.suggested_destinations],
+            **{key: state.preferences.get(key) for key in PLAN_KEYS}}
+
+
+def _split_days(text: str) -> Tuple[str, Dict[int, str], Dict[str, List[str]]]:
+    """(text before the first day, {day number: that day's section}, the recommendations and tips
+    bullets) of a markdown reply. A day ends at the next day, a "---" rule or the recommendations."""
+    preamble, days, notes = [], {}, {}
+    current, section, started = None, None, False
+    for line in text.split('\n'):
+        header = DAY_HEADER.match(line)
+        note = next((key for prefix, key in NOTE_HEADERS.items() if line.startswith(prefix)), None)
+        if header:
+            current, section, started = int(header.group(1)), None, True
+            days[current] = [line]
+        elif note:
+            current, section = None, note
+            notes.setdefault(note, [])
+        elif current is not None and not line.startswith("---"):
+            days[current].append(line)
+        elif section and line.startswith("- "):
+            notes[section].append(line[2:].strip())
+        elif not started:
+            preamble.append(line)
+        else:
+            current = None
+    return '\n'.join(preamble).strip(), {day: '\n'.join(lines).strip() for day, lines in days.items()}, notes
+
+
+def _markdown_day(section: str) -> Dict[str, Any]:
+    """Title and slots of a markdown day section, the fields typed_day gives a JSON day"""
+    lines = section.split("\n")
+    title = DAY_TITLE.match(lines[0])
+    return {"title": title.group(1) if title else "",
+            "slots": [{"time": m.group(1), "activity": m.group(2)} for m in map(SLOT_LINE.match, lines[1:]) if m]}
+
+
+def _is_json(text: str) -> bool:
+    return text.lstrip()[:1] in ("{", "`")
+
+
+def _parse_reply(text: str) -> Tuple[str, Dict[int, Dict[str, Any]], Dict[str, List[str]]]:
+    """(overview, {day: {"activities", "title", "slots"}}, {"recommendations", "tips"}) of a JSON
+    reply, or of a markdown one when the model answered in markdown or no JSON day was readable"""
+    if _is_json(text):
+        parsed = parse_itinerary(text)
+        days = {day["day"]: {"activities": day_markdown(day), **typed_day(day)}
+                for day in parsed.days if isinstance(day.get("day"), int)}
+        if days:
+            title, overview = parsed.result.get("title"), parsed.result.get("overview")
+            preamble = "\n\n".join(part for part in (f"### {title}" if title else "", str(overview or "")) if part)
+            return preamble, days, {key: [str(item) for item in parsed.result[key]]
+                                    for key in LIST_KEYS if key in parsed.result}
+    preamble, sections, notes = _split_days(text)
+    return preamble, {day: {"activities": section, **_markdown_day(section)} for day, section in sections.items()}, notes
+
+
+class DayStream:
+    """Incremental _split_days: feed() text chunks as they arrive and get back every day whose
+    section is complete, i.e. once the next day's header (or the closing "---") has arrived"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self._pending, self._day, self._lines = "", None, []
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def _line(self, line: str) -> List[Tuple[int, str]]:
+        header = DAY_HEADER.match(line)
+        finished = []
+        if header or line.startswith("---") or line.startswith("**Key Recommendations"):
+            if self._day is not None:
+                finished.append((self._day, "\n".join(self._lines).strip()))
+            self._day, self._lines = (int(header.group(1)), [line]) if header else (None, [])
+        elif self._day is not None:
+            self._lines.append(line)
+        return finished
+
+    def feed(self, chunk: str) -> List[Tuple[int, str]]:
+        self.parts.append(chunk)
+        *lines, self._pending = (self._pending + chunk).split("\n")  # the last line may still grow
+        return [day for line in lines for day in self._line(line)]
+
+    def close(self) -> List[Tuple[int, str]]:
+        finished = self._line(self._pending)
+        if self._day is not None:
+            finished.append((self._day, "\n".join(self._lines).strip()))
+        self._pending, self._day, self._lines = "", None, []
+        return finished
+
+
+class ReplyStream:
+    """DayStream for either reply format, picked from the first characters: JSON ("{" or a code
+    fence) or markdown. feed()/close() return (day, markdown) pairs like DayStream's, and `typed`
+    holds each finished day's title and slots"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.typed: Dict[int, Dict[str, Any]] = {}
+        self._parser: Union[None, DayStream, JsonItineraryStream] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def _finished(self, finished: List) -> List[Tuple[int, str]]:
+        if isinstance(self._parser, DayStream):
+            self.typed.update((day, _markdown_day(section)) for day, section in finished)
+            return finished
+        days = [day for day in finished if isinstance(day.get("day"), int)]
+        self.typed.update((day["day"], typed_day(day)) for day in days)
+        return [(day["day"], day_markdown(day)) for day in days]
+
+    def feed(self, chunk: str) -> List[Tuple[int, str]]:
+        self.parts.append(chunk)
+        if self._parser is None:
+            head = self.text.lstrip()
+            if not head:
+                return []
+            self._parser, chunk = (JsonItineraryStream() if _is_json(head) else DayStream()), self.text
+        return self._finished(self._parser.feed(chunk))
+
+    def close(self) -> List[Tuple[int, str]]:
+        return self._finished(self._parser.close()) if self._parser is not None else []
+
+
+def _apply_itinerary(state: AgentState, full_itinerary: str) -> AgentState:
+    dates = _trip_dates(state)
+    preamble, days, notes = _parse_reply(full_itinerary)
+
+    # Assign each day to its date; the overview before Day 1 stays with Day 1. Days the reply
+    # lacks (cut short, or a failed day range) get the fallback plan instead of vanishing
+    itinerary = []
+    for i, date in enumerate(dates, 1):
+        item = {"date": date, **days.get(i, {"activities": f"Day {i}: Explore {state.suggested_destinations[0]['name']}"})}
+        if i == 1 and preamble:
+            item["activities"] = preamble + '\n\n' + item["activities"]
+        itinerary.append(item)
+
+    # Add the recommendations and tips to the last day
+    if itinerary and any(notes.values()):
+        itinerary[-1]["activities"] += "\n\n" + notes_markdown(notes)
+
+    state.itinerary = itinerary
+    state.itinerary_notes = notes
+    state.itinerary_basis = _plan_basis(state)
     return state
+
+
+def _fallback_itinerary(state: AgentState) -> AgentState:
+    state.itinerary = [{
+        "date": date,
+        "activities": f"Day {i+1}: Explore {state.suggested_destinations[0]['name']}"
+    } for i, date in enumerate(_trip_dates(state))]
+    state.itinerary_notes = {}
+    state.itinerary_basis = _plan_basis(state)
+    return state
+
+
+def affected_days(state: AgentState) -> List[int]:
+    """Days (1-based) of the trip that need generating; every other day reuses the previous
+    plan's day at the same position, with its date moved to match the new trip dates"""
+    num_days = len(_trip_dates(state))
+    previous, basis = state.itinerary, state.itinerary_basis
+    if not INCREMENTAL or not previous or not basis or any(basis.get(key) != state.preferences.get(key) for key in PLAN_KEYS):
+        return list(range(1, num_days + 1))
+
+    days = set(range(len(previous) + 1, num_days + 1))  # days the trip gained
+    dropped = set(basis.get("destinations", [])) - {d["name"] for d in state.suggested_destinations}
+    if dropped:
+        # Days that mention a destination no longer on the trip ("Nice" for "Nice, France")
+        places = [name.split(",")[0] for name in dropped]
+        touched = {i for i, item in enumerate(previous[:num_days], 1) if any(p in item["activities"] for p in places)}
+        days |= touched or set(range(1, min(len(previous), num_days) + 1))  # can't tell which: redo them all
+    return sorted(days)
+
+
+def _update_prompt(state: AgentState, days: List[int], slots: List[str] = (), compact: bool = False) -> str:
+    """Prompt regenerating `days` (only their `slots` when given); the compact form leaves out the
+    days that stay and the format example"""
+    destination_names = [d["name"] for d in state.suggested_destinations]
+    travel_type = state.preferences.get("travel_type", "general")
+    kept = "\n".join(f"Day {i}: {(item['activities'].splitlines() or [''])[0]}"
+                     for i, item in enumerate(state.itinerary, 1) if i not in days and i <= len(_trip_dates(state)))
+    day_list = ", ".join(f"Day {day}" for day in days)
+    if slots:
+        # Only some parts of the day change: show the current day and ask for those lines only
+        current = "\n\n".join(state.itinerary[day - 1]["activities"] for day in days if day <= len(state.itinerary))
+        scope = (f"In {day_list}, rewrite only the {' and '.join(slots)} activities and keep the other lines "
+                 f"as they are:\n\n{current}\n")
+    else:
+        scope = f"Write only {day_list}."
+    if compact:
+        return f"""
+    Update a {len(_trip_dates(state))}-day itinerary for {travel_type} travelers visiting: {", ".join(destination_names)}.
+    The traveler asked: "{state.chat_history[-1]["user"] if state.chat_history else ""}"
+    {scope}
+    Reply with ONLY those days.
+{COMPACT_DAYS}
+    """
+    return f"""
+    Update a {len(_trip_dates(state))}-day itinerary for {travel_type} travelers visiting: {", ".join(destination_names)}.
+    The traveler asked: "{state.chat_history[-1]["user"] if state.chat_history else ""}"
+    These days stay as they are:
+    {kept or "(none)"}
+
+    {scope}
+    Reply with ONLY those days, each EXACTLY in this format:
+
+    **Day [N]: [Day Title]**
+    - Morning: [Activity with details]
+    - Afternoon: [Activity with details]
+    - Evening: [Activity with details]
+    """
+
+
+def _day_span(lines: List[str]) -> Tuple[int, int]:
+    """(first, end) lines of the day itself in a stored day's markdown: Day 1 starts with the
+    trip overview and the last day ends with the recommendations, which a splice keeps"""
+    first = next((i for i, line in enumerate(lines) if DAY_HEADER.match(line)), 0)
+    end = next((i for i in range(first + 1, len(lines))
+                if any(lines[i].startswith(prefix) for prefix in NOTE_HEADERS) or lines[i].startswith("---")),
+               len(lines))
+    while end > first + 1 and not lines[end - 1].strip():
+        end -= 1
+    return first, end
+
+
+def _merge_day(previous: Dict[str, Any], generated: Dict[str, Any], slots: Sequence[str]) -> Dict[str, Any]:
+    """The previous day with the regenerated part from `generated`: its whole day, or with `slots`
+    only those lines; everything else (other slot lines, overview, recommendations) stays as it was"""
+    lines = previous["activities"].split("\n")
+    first, end = _day_span(lines)
+    if not slots:
+        activities = "\n".join(lines[:first] + [generated["activities"]] + lines[end:])
+        return {**previous, **generated, "activities": activities}
+
+    wanted = {slot.lower() for slot in slots}
+    fresh = {slot["time"].lower(): slot for slot in generated.get("slots", []) if slot["time"].lower() in wanted}
+    body = lines[first:end]
+    for i, line in enumerate(body):
+        match = SLOT_LINE.match(line)
+        if match and match.group(1).lower() in fresh:
+            body[i] = f"- {match.group(1)}: {fresh.pop(match.group(1).lower())['activity']}"
+    body += [f"- {slot['time']}: {slot['activity']}" for slot in fresh.values()]  # slots the day didn't have
+    day = _markdown_day("\n".join(body))
+    return {**previous, "activities": "\n".join(lines[:first] + body + lines[end:]),
+            "title": previous.get("title") or day["title"], "slots": day["slots"]}
+
+
+def _splice(state: AgentState, days: List[int], text: Optional[str], slots: Sequence[str] = ()) -> AgentState:
+    """New itinerary on the current trip dates: regenerated days (or, with `slots`, parts of
+    days) from `text` merged into the previous plan, the rest reused"""
+    generated = _parse_reply(text or "")[1]
+    previous = state.itinerary
+    itinerary = []
+    for i, date in enumerate(_trip_dates(state), 1):
+        if i in days and i in generated and i <= len(previous):
+            itinerary.append({**_merge_day(previous[i - 1], generated[i], slots), "date": date})
+        elif i in days and i in generated:
+            itinerary.append({"date": date, **generated[i]})
+        elif i <= len(previous):
+            itinerary.append({**previous[i - 1], "date": date})  # unaffected, or the model skipped it: keep
+        else:
+            itinerary.append({"date": date, "activities": f"Day {i}: Explore {state.suggested_destinations[0]['name']}"})
+    state.itinerary = itinerary
+    state.itinerary_basis = _plan_basis(state)
+    return state
+
+
+Prompt = Union[None, str, List[str]]
+
+
+class Job(NamedTuple):
+    """A prompt (or a long trip's day-range prompts; None when no day needs generating), how to
+    apply its reply (None when the call failed), the response cache key and whether it asks for JSON"""
+    prompt: Prompt
+    finish: Callable[[Optional[str]], AgentState]
+    key: Optional[str] = None
+    structured: bool = False
+
+
+def _within_budget(build: Callable[[bool], Prompt]) -> Tuple[Prompt, bool]:
+    """(build(False), False), or (build(True), True), the compact prompts, when the full ones would
+    take the request past its token budget. Still sent when even the compact ones don't fit: a plan beats none"""
+    prompt = build(False)
+    if not prompt or fits(*([prompt] if isinstance(prompt, str) else prompt)):
+        return prompt, False
+    count_trim()
+    return build(True), True
+
+
+def plan_cache_key(state: AgentState, compact: bool = False) -> str:
+    """Fingerprint of the full-plan prompt with the destinations in a canonical order; the
+    prompt has no dates in it, so trips on different dates share the key. Compact prompts get
+    their own key, so their terser replies are never served to (or shared with) unbudgeted requests"""
+    canonical = replace(state, suggested_destinations=sorted(state.suggested_destinations, key=lambda d: d["name"]))
+    return prompt_key(_itinerary_prompt(canonical, compact), DEFAULT_MODEL)
+
+
+def _itinerary_job(state: AgentState) -> Job:
+    """A full plan when nothing can be reused, else a prompt for just the days that changed"""
+    days = affected_days(state)
+    if len(days) == len(_trip_dates(state)):
+        # Nothing to reuse: a full plan, in day ranges for a long trip
+        ranges = _day_ranges(len(days), CHUNK_DAYS)
+        outline = _outline(state) if len(ranges) > 1 else ""
+        prompt, compact = _within_budget(lambda compact: [_chunk_prompt(state, first, last, outline, compact)
+                                                          for first, last in ranges] if outline else
+                                         _itinerary_prompt(state, compact))
+        return Job(prompt, lambda text: (
+            _apply_itinerary(state, text) if text is not None else _fallback_itinerary(state)),
+            plan_cache_key(state, compact), STRUCTURED)
+    # Update prompts quote the previous plan and the traveler's message: not worth caching
+    prompt = _within_budget(lambda compact: _update_prompt(state, days, compact=compact))[0] if days else None
+    return Job(prompt, lambda text: _splice(state, days, text))
+
+
+def _replan_job(state: AgentState) -> Job:
+    days = [day for day in state.replan_days if day <= len(state.itinerary)] or \
+        list(range(1, len(state.itinerary) + 1))
+    return Job(_within_budget(lambda compact: _update_prompt(state, days, state.replan_slots, compact))[0],
+               lambda text: _splice(state, days, text, state.replan_slots))
+
+
+def _cached(key: Optional[str]) -> Optional[str]:
+    return None if key is None or response_cache is None else response_cache.get(key, None)
+
+
+def _remember(key: Optional[str], text: Optional[str]) -> None:
+    """Caches a reply that parsed into days; failures and malformed replies are retried next time"""
+    if key is not None and response_cache is not None and text and _parse_reply(text)[1]:
+        response_cache.put(key, text)
+
+
+def _flight_key(prompt: str, key: Optional[str]) -> str:
+    """Full plans coalesce on their cache key (destination order doesn't matter), others on the prompt"""
+    return key or prompt_key(prompt, DEFAULT_MODEL)
+
+
+def _stitch(replies: Sequence[Union[str, BaseException]]) -> Tuple[str, bool]:
+    """Day-range replies joined in day order, and whether every range succeeded. A failed range
+    leaves its days to the fallback plan; only when all of them failed is the error raised."""
+    for reply in replies:
+        if isinstance(reply, BaseException) and not isinstance(reply, Exception):
+            raise reply  # cancelled or interrupted, not a failed call
+    texts = [reply for reply in replies if isinstance(reply, str)]
+    if not texts:
+        raise replies[0]
+    return "\n\n".join(texts), len(texts) == len(replies)
+
+
+def _generate_ranges(prompts: List[str], config: Optional[Dict]) -> Tuple[str, bool]:
+    # Each range runs in a copy of this context, so its usage is accounted to this node and request
+    futures = [chunk_pool.submit(contextvars.copy_context().run, generate_text, prompt, generation_config=config)
+               for prompt in prompts]
+    replies = []
+    for future in futures:
+        try:
+            replies.append(future.result())
+        except Exception as e:
+            replies.append(e)
+    return _stitch(replies)
+
+
+def _run(job: Job) -> AgentState:
+    prompt, finish, key, structured = job
+    if not prompt:
+        return finish("")
+    text = _cached(key)
+    if text is not None:
+        return finish(text)
+    config = GENERATION_CONFIG if structured else None
+
+    def generate() -> str:
+        if isinstance(prompt, list):
+            reply, complete = _generate_ranges(prompt, config)
+        else:
+            reply, complete = generate_text(prompt, generation_config=config), True
+        if complete:
+            _remember(key, reply)
+        return reply
+
+    try:
+        text = flights.do(_flight_key(prompt, key), generate)
+    except Exception:
+        text = None  # Fallback: simple plan for new days, previous plan for the rest
+    return finish(text)
+
+
+def _stream_writer() -> Optional[Callable[[Dict], None]]:
+    """The graph's custom stream writer when the run asked for day events (STREAM_DAYS in its
+    configurable; stream it with stream_mode "custom" to receive them), else None"""
+    try:
+        if not get_config().get("configurable", {}).get(STREAM_DAYS):
+            return None
+    except RuntimeError:  # called outside a graph run
+        return None
+    return get_stream_writer()
+
+
+def _write_days(state: AgentState, finished: List[Tuple[int, str]], write: Callable[[Dict], None],
+                typed: Dict[int, Dict[str, Any]]) -> None:
+    dates = _trip_dates(state)
+    for day, activities in finished:
+        write({"event": "day", "day": day, "date": dates[day - 1] if day <= len(dates) else None,
+               "activities": activities, **typed.get(day, {})})
+
+
+async def _astream_days(state: AgentState, prompt: str, write: Callable[[Dict], None],
+                        config: Optional[Dict]) -> str:
+    """Streams the reply, writing {"event": "day", ...} for each finished day; returns the full text"""
+    days = ReplyStream()
+    async for chunk in astream_text(prompt, generation_config=config):
+        _write_days(state, days.feed(chunk), write, days.typed)
+    _write_days(state, days.close(), write, days.typed)
+    return days.text
+
+
+def _range_slots() -> asyncio.Semaphore:
+    """This event loop's limit on day-range calls in flight, the async counterpart of chunk_pool"""
+    loop = asyncio.get_running_loop()
+    slots = _chunk_slots.get(loop)
+    if slots is None:
+        slots = _chunk_slots[loop] = asyncio.Semaphore(CHUNK_WORKERS)
+    return slots
+
+
+async def _agenerate_range(prompt: str, config: Optional[Dict]) -> str:
+    async with _range_slots():
+        return await agenerate_text(prompt, generation_config=config)
+
+
+async def _astream_ranges(state: AgentState, prompts: List[str], write: Callable[[Dict], None],
+                          config: Optional[Dict]) -> Tuple[str, bool]:
+    """Streams the day ranges, up to CHUNK_WORKERS at once; days are written in trip order, each
+    as soon as it and all the days before it are finished"""
+    ready: Dict[int, str] = {}
+    typed: Dict[int, Dict[str, Any]] = {}
+    written = [0]
+
+    def finished(days: List[Tuple[int, str]]) -> None:
+        ready.update(days)
+        while written[0] + 1 in ready:
+            written[0] += 1
+            _write_days(state, [(written[0], ready.pop(written[0]))], write, typed)
+
+    async def stream(prompt: str) -> str:
+        days = ReplyStream()
+        days.typed = typed  # shared: the ranges' day numbers don't overlap
+        async with _range_slots():
+            async for chunk in astream_text(prompt, generation_config=config):
+                finished(days.feed(chunk))
+        finished(days.close())
+        return days.text
+
+    replies = await asyncio.gather(*(stream(prompt) for prompt in prompts), return_exceptions=True)
+    _write_days(state, sorted(ready.items()), write, typed)  # days after a range that failed
+    return _stitch(replies)
+
+
+async def _arun(state: AgentState, job: Job) -> AgentState:
+    prompt, finish, key, structured = job
+    if not prompt:
+        return finish("")
+    write, streamed = _stream_writer(), []
+    text = await run_blocking(_cached, key) if key is not None and response_cache is not None else None
+    config = GENERATION_CONFIG if structured else None
+
+    async def generate() -> str:
+        streamed.append(bool(write))
+        if isinstance(prompt, list) and write:
+            reply, complete = await _astream_ranges(state, prompt, write, config)
+        elif isinstance(prompt, list):
+            reply, complete = _stitch(await asyncio.gather(
+                *(_agenerate_range(p, config) for p in prompt), return_exceptions=True))
+        elif write:
+            reply, complete = await _astream_days(state, prompt, write, config), True
+        else:
+            reply, complete = await agenerate_text(prompt, generation_config=config), True
+        if complete:
+            await run_blocking(_remember, key, reply)
+        return reply
+
+    if text is None:
+        try:
+            text = await flights.ado(_flight_key(prompt, key), generate)
+        except Exception:
+            return finish(None)
+    if write and not any(streamed):
+        # A cached or coalesced plan arrives all at once: send every day straight away
+        days = ReplyStream()
+        _write_days(state, days.feed(text) + days.close(), write, days.typed)
+    return finish(text)
+
+
+def create_itinerary(state: AgentState) -> AgentState:
+    apply_preference_delta(state)  # already applied by find_destinations, except in the serial graph
+    if not state.suggested_destinations or not state.preferences.get("start_date"):
+        return state
+    return _run(_itinerary_job(state))
+
+
+async def acreate_itinerary(state: AgentState) -> AgentState:
+    """Async variant for graph.ainvoke: awaits Gemini instead of blocking the event loop"""
+    apply_preference_delta(state)
+    if not state.suggested_destinations or not state.preferences.get("start_date"):
+        return state
+    return await _arun(state, _itinerary_job(state))
+
+
+def replan_itinerary(state: AgentState) -> AgentState:
+    """Regenerates only the days (or parts of days) a follow-up asked to change"""
+    return _run(_replan_job(apply_preference_delta(state)))
+
+
+async def areplan_itinerary(state: AgentState) -> AgentState:
+    return await _arun(state, _replan_job(apply_preference_delta(state)))
@@ -1,25 +1,31 @@
 # This node reads the user's message and pulls out travel preferences :
-#Extracts user travel preferences from the latest and recent  message and updates the state.
+#Extracts interest, region, budget, season, duration and travel type from the latest message in
+# one pass of the vocabulary matcher (agent/tools/matcher.py, phrases in data/vocabulary.json).
+
+from typing import Dict
 
 from agent.state import AgentState
+from agent.tools.matcher import Scan, scan_message
+
+PREFERENCE_SLOTS = ("interest", "region", "budget", "season", "duration", "travel_type")
+# Extracted slot -> the catalog filter it feeds (see destination_db.FILTER_KEYS)
+FILTER_KEYS = {"interest": "travel_style", "region": "preferred_city", "budget": "budget", "travel_type": "travel_type"}
+
+
+def preferences_from(found: Scan) -> Dict[str, str]:
+    """Preference dict for a matcher scan; the first mention of a slot wins"""
+    preferences = {}
+    for slot in PREFERENCE_SLOTS:
+        if slot in found:
+            preferences[slot] = found[slot][0]
+            if slot in FILTER_KEYS:
+                preferences[FILTER_KEYS[slot]] = found[slot][0]
+    return preferences
+
+
 def extract_preferences(state: AgentState) -> AgentState:
     latest_message = state.chat_history[-1]["user"] if state.chat_history else ""
-    preferences = {}
 
-    # Very simple mock extraction using keyword checks
-    if "beach" in latest_message.lower():
-        preferences["interest"] = "beach"
-    if "mountain" in latest_message.lower():
-        preferences["interest"] = "mountain"
-    if "europe" in latest_message.lower():
-        preferences["region"] = "europe"
-    if "low budget" in latest_message.lower():
-        preferences["budget"] = "low"
-    if "summer" in latest_message.lower():
-        preferences["season"] = "summer"
-    if "7 days" in latest_message.lower():
-        preferences["duration"] = "7 days"
-
-    # Update the state
-    state.preferences.update(preferences)
+    # Update the state: only what this message mentions, earlier turns' preferences stay
+    state.preferences.update(preferences_from(scan_message(latest_message)))
     return state
@@ -35,21 +35,35 @@ def generate_response(state: AgentState) -> AgentState:
 # Formats the final message using the suggested destination and the Gemini-powered itinerary.
 
 from agent.state import AgentState
+from agent.nodes.followup_handler import SUGGESTION_INTENTS
+
+def _region(dest: dict, template: str) -> str:
+    """The destination's region in `template`, or "" for catalog records that have none"""
+    return template.format(dest["region"]) if dest.get("region") else ""
+
 
 def generate_response(state: AgentState) -> AgentState:
     if not state.suggested_destinations:
         state.final_response = "❌ Sorry, I couldn't find a matching destination."
         return state
 
+    if state.intent in SUGGESTION_INTENTS:
+        # Follow-up that only asked for new suggestions: list them, no itinerary was planned
+        response = "🔄 Here are some new options based on your updated preferences:\n"
+        for dest in state.suggested_destinations:
+            response += f"- **{dest['name']}**{_region(dest, ' ({})')}\n"
+        state.final_response = response
+        return state
+
     destination = state.suggested_destinations[0]
     itinerary = state.itinerary
 
-    response = f"🌍 Here's your trip to **{destination['name']}** in **{destination['region']}**:\n\n"
+    response = f"🌍 Here's your trip to **{destination['name']}**{_region(destination, ' in **{}**')}:\n\n"
 
     if itinerary:
         response += "🗓️ **Itinerary Plan:**\n"
         for item in itinerary:
-            response += f"- {item['day']}: {item['activity']}\n"
+            response += f"- {item['date']}: {item['activities']}\n"
     else:
         response += "⚠️ No itinerary available."
 
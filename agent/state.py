@@ -3,7 +3,12 @@
 
 # import the library
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import Annotated, List, Dict, Optional, Any
+
+
+def merge_dicts(left: Dict, right: Dict) -> Dict:
+    """Reducer for fields that parallel nodes write at the same time: keys merge, later wins"""
+    return {**left, **right}
 
 @dataclass
 class AgentState:
@@ -24,3 +29,26 @@ class AgentState:
 
     # 6. Final message shown to the user
     final_response: Optional[str] = None
+
+    # 7. Structured follow-up intent ("cheaper", "another", "instead", "replan") and, for "replan",
+    #    the days (1-based, empty = all) and parts of the day (morning/afternoon/evening) to redo
+    intent: Optional[str] = None
+    replan_days: List[int] = field(default_factory=list)
+    replan_slots: List[str] = field(default_factory=list)
+
+    # 8. What the current itinerary was planned for (destinations, travel type), to find the
+    #    days a later change touches
+    itinerary_basis: Dict[str, Any] = field(default_factory=dict)
+
+    # 9. Milliseconds spent in each node during this run (merged across parallel branches)
+    timings: Annotated[Dict[str, float], merge_dicts] = field(default_factory=dict)
+
+    # 10. The itinerary's recommendations and travel tips ({"recommendations": [...], "tips": [...]})
+    itinerary_notes: Dict[str, List[str]] = field(default_factory=dict)
+
+    # 11. Preference changes a follow-up asks for ("cheaper" budget, "another" exclusions). check_followup
+    #     runs alongside extract_preferences, so the next node applies them on top of this turn's preferences
+    preference_delta: Dict[str, Any] = field(default_factory=dict)
+
+    # 12. Turns in this conversation so far, counting the current one (chat_history is capped, this isn't)
+    turn: int = 0
@@ -2,44 +2,79 @@
 
 # destination_db.py
 
-import json
-from typing import List, Dict
-from agent.state import AgentState
+import os
+from typing import List, Dict, Optional, Tuple
+from agent.tools.cache import MISSING, LRUCache
+from agent.tools.catalog import CatalogManager, DestinationCatalog
+from agent.tools.metrics import register_cache, register_gauges
+from agent.tools.ingest import IngestReport, iter_shards, load_catalog_streaming, shard_paths
+from agent.tools.snapshot import CatalogSnapshot, SnapshotCatalog
+
+# data/destinations.json, resolved from this file so it works from any working directory
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "destinations.json")
+# Binary build of the same data (python -m agent.tools.snapshot); used when it is newer than every shard
+SNAPSHOT_PATH = os.path.join(os.path.dirname(DATA_PATH), "destinations.snapshot")
+
 
 def load_destinations() -> List[Dict]:
-    """Loads all destination data from the JSON file"""
-    with open("data/destinations.json", "r") as f:
-        return json.load(f)
+    """Loads all valid destination records from the JSON file (streamed, one record at a time)"""
+    return list(iter_shards([DATA_PATH]))
 
-def filter_destinations(preferences: Dict) -> List[Dict]:
-    """Filters destinations based on full user preferences"""
-    all_destinations = load_destinations()
-    filtered = []
+def catalog_paths() -> List[str]:
+    """Every file the catalog is built from: destinations.json, its shards and the snapshot"""
+    return shard_paths(DATA_PATH) + [SNAPSHOT_PATH]
 
-    for dest in all_destinations:
-        match = True
+def load_catalog() -> DestinationCatalog:
+    """Maps the compiled snapshot when it is up to date, otherwise streams the JSON shards into the indexes"""
+    shards = shard_paths(DATA_PATH)
+    if os.path.exists(SNAPSHOT_PATH) and os.path.getmtime(SNAPSHOT_PATH) >= max(os.path.getmtime(p) for p in shards):
+        return SnapshotCatalog(CatalogSnapshot(SNAPSHOT_PATH))
+    report = IngestReport()
+    catalog = load_catalog_streaming(shards, report)
+    if report.skipped or report.duplicates:
+        print(f"⚠️ Catalog: {report.loaded} loaded, {report.skipped} invalid, {report.duplicates} duplicates skipped")
+        for error in report.errors:
+            print(f"   {error}")
+    return catalog
 
-        # Region check
-        if "preferred_city" in preferences:
-            if preferences["preferred_city"].lower() not in dest.get("region", "").lower():
-                match = False
+# Process-wide catalog; catalog_manager.start() begins polling the data files for edits
+catalog_manager = CatalogManager(load_catalog, catalog_paths,
+                                 poll_seconds=float(os.getenv("CATALOG_POLL_SECONDS", "5")))
 
-        # Travel style (tags) check
-        if "travel_style" in preferences:
-            if preferences["travel_style"].lower() not in [tag.lower() for tag in dest.get("tags", [])]:
-                match = False
+def get_catalog() -> DestinationCatalog:
+    """Returns the live indexed catalog, reading the data file only on first use"""
+    return catalog_manager.current()
 
-        # Budget check
-        if "budget" in preferences:
-            if preferences["budget"].lower() != dest.get("budget", "").lower():
-                match = False
+# Results of repeated filter/rank calls; keys carry the catalog version, so a reload invalidates them
+query_cache = LRUCache(maxsize=int(os.getenv("DESTINATION_CACHE_SIZE", "1024")),
+                       ttl=float(os.getenv("DESTINATION_CACHE_TTL", "600")))
 
-        # Travel type check
-        if "travel_type" in preferences:
-            if preferences["travel_type"].lower() != dest.get("travel_type", "").lower():
-                match = False
+register_cache("destination_query", query_cache)
+register_gauges("agent_catalog", "Live destination catalog.",
+                lambda: {"version": catalog_manager.version, "destinations": len(catalog_manager.peek() or ())})
 
-        if match:
-            filtered.append(dest)
+FILTER_KEYS = ("preferred_city", "travel_style", "budget", "travel_type")
+
+def canonical_preferences(preferences: Dict) -> Tuple:
+    """The part of the preferences that affects catalog matching, normalised the way matching does"""
+    return tuple((key, preferences[key].lower()) for key in FILTER_KEYS if key in preferences)
+
+def filter_destinations(preferences: Dict) -> List[Dict]:
+    """Filters destinations based on full user preferences"""
+    catalog = get_catalog()
+    key = ("filter", catalog.version, canonical_preferences(preferences))
+    matches = query_cache.get(key)
+    if matches is MISSING:
+        matches = catalog.query(preferences)
+        query_cache.put(key, matches)
+    return list(matches)
 
-    return filtered
+def rank_destinations(preferences: Dict, k: int = 5, weights: Optional[Dict[str, float]] = None) -> List[Dict]:
+    """Returns the k destinations closest to the preferences, best first"""
+    catalog = get_catalog()
+    key = ("rank", catalog.version, canonical_preferences(preferences), k, tuple(sorted((weights or {}).items())))
+    matches = query_cache.get(key)
+    if matches is MISSING:
+        matches = catalog.rank(preferences, k, weights)
+        query_cache.put(key, matches)
+    return list(matches)
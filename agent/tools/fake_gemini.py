@@ -0,0 +1,191 @@
+# fake_gemini.py
+# Offline stand-in for genai.GenerativeModel (LLM_PROVIDER=fake): answers itinerary prompts with
+# realistic markdown (or JSON, when asked for a JSON response) in the format the itinerary nodes
+# parse, at a configurable time to first token, token rate and error rate, streamed or in one reply. Lets the whole pipeline be load
+# tested and profiled without network or quota; a fixed FAKE_LLM_SEED makes runs repeatable.
+
+import asyncio
+import os
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+from google.api_core.exceptions import ResourceExhausted
+
+CHARS_PER_TOKEN = 4  # roughly what Gemini's tokenizer gives for English markdown
+CHUNK_TOKENS = 24  # tokens per streamed chunk
+FULL_PLAN = re.compile(r"Create a detailed (\d+)-day itinerary for (.+?) travelers visiting: (.+?)\.\n")
+DAY_RANGE = re.compile(r"Plan Days (\d+)-(\d+) of a (\d+)-day itinerary for (.+?) travelers visiting: (.+?)\.\n")
+UPDATE = re.compile(r"itinerary for (.+?) travelers visiting: (.+?)\.\n")
+DAYS = re.compile(r"Day (\d+)")
+CURRENT_DAY = re.compile(r"^\*\*Day (\d+):?\s*(.*?)\*\*$((?:\n- .*)*)", re.M)
+CURRENT_SLOT = re.compile(r"^- (Morning|Afternoon|Evening):\s*(.*)$", re.M)
+SLOTS = ("Morning", "Afternoon", "Evening")
+ACTIVITIES = {
+    "Morning": ["Guided walking tour of the old town, starting at the main square",
+                "Breakfast at a local market, then a visit to the cathedral",
+                "Sunrise hike to a viewpoint above {place}",
+                "Boat trip along the coast with a stop for swimming"],
+    "Afternoon": ["Lunch at a family-run trattoria, then the city museum",
+                  "Bike ride through the parks and historic quarter",
+                  "Cooking class with a local chef (3 hours)",
+                  "Free time for shopping in the artisan district"],
+    "Evening": ["Sunset drinks on a rooftop terrace in {place}",
+                "Dinner at a seafood restaurant near the harbour",
+                "Food tour of the night market",
+                "Live music in a traditional tavern"],
+}
+
+
+def _places(names: str) -> List[str]:
+    """City names from the prompt's "City, Country, City, Country" list"""
+    parts = [part.strip() for part in names.split(",") if part.strip()]
+    return parts[::2] if len(parts) % 2 == 0 else parts
+
+
+def _day(rng: random.Random, day: int, place: str, slots=SLOTS) -> Dict[str, Any]:
+    title = f"{rng.choice(['Discovering', 'Exploring', 'A Day in', 'Flavours of'])} {place}"
+    return {"day": day, "title": title,
+            "slots": [{"time": slot, "activity": rng.choice(ACTIVITIES[slot]).format(place=place)} for slot in slots]}
+
+
+def _plan(rng: random.Random, first: int, last: int, num_days: int, names: str) -> Dict[str, Any]:
+    """Days first..last of a plan, with the overview when it starts the trip and the tips when it ends it"""
+    places = _places(names) or ["the city"]
+    plan: Dict[str, Any] = {}
+    if first == 1:
+        plan["title"] = f"{places[0]} Itinerary"
+        plan["overview"] = f"A {num_days}-day trip through {', '.join(places)} mixing sights, food and time to slow down."
+    plan["days"] = [_day(rng, d, places[(d - 1) * len(places) // num_days]) for d in range(first, last + 1)]
+    if last == num_days:
+        plan["recommendations"] = ["Best restaurant: Da Nonna (Mediterranean)",
+                                   f"Must-try activity: {rng.choice(ACTIVITIES['Afternoon']).format(place=places[0])}",
+                                   "Hidden gem: The covered market behind the station",
+                                   "Local insight: Dinner starts late"]
+        plan["tips"] = ["Buy a regional rail pass", "Pack layers for the evenings", "Lunch menus are the best value"]
+    return plan
+
+
+def _markdown(plan: Dict[str, Any], travel_type: str = "", names: str = "") -> str:
+    """A plan in the markdown format the itinerary prompts ask for"""
+    parts = []
+    if "title" in plan:
+        parts.append(f"### {plan['title']}\n**Selected Destinations:** {names}\n**Travel Style:** {travel_type} Travel"
+                     f"\n\n{plan['overview']}\n\n---")
+    parts += ["\n".join([f"**Day {day['day']}: {day['title']}**"] +
+                        [f"- {slot['time']}: {slot['activity']}" for slot in day["slots"]]) for day in plan["days"]]
+    if "tips" in plan:
+        parts.append("---\n\n**Key Recommendations:**\n" + "\n".join(f"- {item}" for item in plan["recommendations"])
+                     + "\n\n**Travel Tips:**\n" + "\n".join(f"- {item}" for item in plan["tips"]) + "\n")
+    return "\n\n".join(parts)
+
+
+def fake_reply(prompt: str, rng: random.Random, structured: bool = False) -> str:
+    """Markdown (or, structured, JSON) answering an itinerary prompt: a full plan, a day range or a
+    day update. Any other prompt gets a short chat answer."""
+    full, day_range = FULL_PLAN.search(prompt), DAY_RANGE.search(prompt)
+    update, scope = UPDATE.search(prompt), re.search(r"(?:Write only|In) ((?:Day \d+(?:, )?)+)", prompt)
+    if full:
+        num_days, travel_type, names = int(full.group(1)), full.group(2), full.group(3)
+        plan = _plan(rng, 1, num_days, num_days, names)
+    elif day_range:
+        first, last, num_days = map(int, day_range.group(1, 2, 3))
+        travel_type, names = day_range.group(4), day_range.group(5)
+        plan = _plan(rng, first, last, num_days, names)
+    elif update and scope:
+        places = _places(update.group(2)) or ["the city"]
+        partial = re.search(r"rewrite only the (.+?) activities", prompt)
+        slots = [slot for slot in SLOTS if partial and slot.lower() in partial.group(1)]
+        travel_type, names = update.group(1), update.group(2)
+        plan = {"days": [_day(rng, d, places[(d - 1) % len(places)], slots or SLOTS)
+                         for d in map(int, DAYS.findall(scope.group(1)))]}
+        if slots:
+            # Like the real model: the whole day back, the other lines as the prompt quoted them
+            current = {int(m.group(1)): (m.group(2), dict(CURRENT_SLOT.findall(m.group(3))))
+                       for m in CURRENT_DAY.finditer(prompt)}
+            for day in plan["days"]:
+                title, kept = current.get(day["day"], (day["title"], {}))
+                fresh = {slot["time"]: slot["activity"] for slot in day["slots"]}
+                day["title"] = title
+                day["slots"] = [{"time": slot, "activity": fresh.get(slot) or kept[slot]}
+                                for slot in SLOTS if slot in fresh or slot in kept]
+    else:
+        return ("Here is a suggestion: spend the mornings on the main sights before the crowds, keep the "
+                "afternoons for a museum or a cooking class, and book dinner somewhere the locals go.")
+    return orjson.dumps(plan).decode() if structured else _markdown(plan, travel_type, names)
+
+
+def _usage(prompt: str, text: str) -> SimpleNamespace:
+    prompt_tokens, output_tokens = len(prompt) // CHARS_PER_TOKEN, len(text) // CHARS_PER_TOKEN
+    return SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+                           total_token_count=prompt_tokens + output_tokens)
+
+
+class FakeResponse:
+    """The parts of a genai response the agent reads: .text and .usage_metadata"""
+
+    def __init__(self, text: str, usage: SimpleNamespace):
+        self.text, self.usage_metadata = text, usage
+
+
+class FakeGeminiModel:
+    def __init__(self, name: str = "fake-gemini", latency: float = 0.5, tokens_per_s: float = 150.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        self.model_name, self.latency, self.tokens_per_s, self.error_rate = name, latency, tokens_per_s, error_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "FakeGeminiModel":
+        seed = os.getenv("FAKE_LLM_SEED")
+        return cls(name, latency=float(os.getenv("FAKE_LLM_LATENCY", "0.5")),
+                   tokens_per_s=float(os.getenv("FAKE_LLM_TOKENS_PER_S", "150")),
+                   error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")), seed=int(seed) if seed else None)
+
+    def _reply(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
+        self.calls += 1
+        if self.rng.random() < self.error_rate:
+            raise ResourceExhausted("429 Resource has been exhausted (fake quota)")
+        structured = (generation_config or {}).get("response_mime_type") == "application/json"
+        return fake_reply(prompt, self.rng, structured)
+
+    def _chunks(self, text: str) -> Iterator[str]:
+        size = CHUNK_TOKENS * CHARS_PER_TOKEN
+        return (text[i:i + size] for i in range(0, len(text), size))
+
+    def _generation_time(self, text: str) -> float:
+        return len(text) / CHARS_PER_TOKEN / self.tokens_per_s
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config: Optional[Dict] = None):
+        text = self._reply(prompt, generation_config)
+        if not stream:
+            time.sleep(self.latency + self._generation_time(text))
+            return FakeResponse(text, _usage(prompt, text))
+
+        def chunks():
+            time.sleep(self.latency)
+            sent = ""
+            for chunk in self._chunks(text):
+                time.sleep(self._generation_time(chunk))
+                sent += chunk
+                yield FakeResponse(chunk, _usage(prompt, sent))
+        return chunks()
+
+    async def generate_content_async(self, prompt: str, stream: bool = False,
+                                     generation_config: Optional[Dict] = None):
+        text = self._reply(prompt, generation_config)
+        if not stream:
+            await asyncio.sleep(self.latency + self._generation_time(text))
+            return FakeResponse(text, _usage(prompt, text))
+
+        async def chunks():
+            await asyncio.sleep(self.latency)
+            sent = ""
+            for chunk in self._chunks(text):
+                await asyncio.sleep(self._generation_time(chunk))
+                sent += chunk
+                yield FakeResponse(chunk, _usage(prompt, sent))
+        return chunks()
@@ -0,0 +1,115 @@
+# geo.py
+# Spatial lookups over destination coordinates.
+# Points are bucketed into a fixed lat/lon grid (cell ids sorted once with NumPy), so a radius
+# query only runs the vectorised haversine over the grid cells its bounding box touches.
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points (all in degrees)"""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - math.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoIndex:
+    """Grid index answering nearest(lat, lon, k) and within_radius(lat, lon, km) over fixed points."""
+
+    def __init__(self, lats, lons, cell_deg: float = 1.0, ids=None):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = (np.asarray(lons, dtype=np.float64) + 180.0) % 360.0 - 180.0  # normalise to [-180, 180)
+
+        self.cell_deg = cell_deg
+        self.n_rows = int(math.ceil(180.0 / cell_deg))
+        self.n_cols = int(math.ceil(360.0 / cell_deg))
+
+        cells = self._row(lats) * self.n_cols + self._col(lons)
+        order = np.argsort(cells, kind="stable")
+        # position in the sorted arrays -> caller's id (the input position unless `ids` is given)
+        self.order = order if ids is None else np.asarray(ids, dtype=np.int64)[order]
+        self.cells = cells[order]
+        self.lats = lats[order]
+        self.lons = lons[order]
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _row(self, lats):
+        return np.clip(np.floor((lats + 90.0) / self.cell_deg), 0, self.n_rows - 1).astype(np.int64)
+
+    def _col(self, lons):
+        return np.floor((lons + 180.0) / self.cell_deg).astype(np.int64) % self.n_cols
+
+    def _candidates(self, lat: float, lon: float, km: float) -> np.ndarray:
+        """Sorted-array positions of every point in grid cells overlapping the query circle"""
+        delta = km / EARTH_RADIUS_KM  # angular radius
+        dlat = math.degrees(delta)
+        row_lo = int(self._row(np.float64(lat - dlat)))
+        row_hi = int(self._row(np.float64(lat + dlat)))
+
+        # Longitude half-width of the circle; the whole ring when it covers a pole
+        cos_lat = math.cos(math.radians(lat))
+        if lat - dlat <= -90.0 or lat + dlat >= 90.0 or math.sin(delta) >= cos_lat:
+            dlon = 180.0
+        else:
+            dlon = math.degrees(math.asin(math.sin(delta) / cos_lat)) * (1 + 1e-9) + 1e-9
+
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64) * self.n_cols
+        if dlon >= 180.0:
+            spans = [(rows[0], rows[-1] + self.n_cols - 1)]  # full rows are one contiguous cell range
+        else:
+            col_lo = int(math.floor((lon - dlon + 180.0) / self.cell_deg))
+            col_hi = int(math.floor((lon + dlon + 180.0) / self.cell_deg))
+            if col_hi - col_lo + 1 >= self.n_cols:
+                spans = [(rows[0], rows[-1] + self.n_cols - 1)]
+            elif col_lo < 0:  # wraps west over the antimeridian
+                spans = [(rows, rows + col_hi), (rows + col_lo % self.n_cols, rows + self.n_cols - 1)]
+            elif col_hi >= self.n_cols:  # wraps east
+                spans = [(rows + col_lo, rows + self.n_cols - 1), (rows, rows + col_hi % self.n_cols)]
+            else:
+                spans = [(rows + col_lo, rows + col_hi)]
+
+        pieces = []
+        for first, last in spans:
+            starts = np.atleast_1d(np.searchsorted(self.cells, first, side="left"))
+            ends = np.atleast_1d(np.searchsorted(self.cells, last, side="right"))
+            pieces.extend(np.arange(s, e) for s, e in zip(starts, ends) if e > s)
+        return np.concatenate(pieces) if pieces else np.empty(0, dtype=np.int64)
+
+    def within_radius(self, lat: float, lon: float, km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances (km) of all points within `km`, nearest first"""
+        positions = self._candidates(lat, lon, km)
+        distances = haversine_km(lat, lon, self.lats[positions], self.lons[positions])
+        inside = distances <= km
+        positions, distances = positions[inside], distances[inside]
+        ranked = np.argsort(distances, kind="stable")
+        return self.order[positions[ranked]], distances[ranked]
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances (km) of the k nearest points, nearest first"""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Start from the radius that would hold ~k points at uniform density and widen until it does.
+        # Every point within the radius is returned, so once k are found they are the true k nearest.
+        km = max(math.sqrt(4 * EARTH_RADIUS_KM ** 2 * k / len(self)), 1.0)
+        while km < HALF_CIRCUMFERENCE_KM:
+            ids, distances = self.within_radius(lat, lon, km)
+            if len(ids) >= k:
+                return ids[:k], distances[:k]
+            km *= 2
+        distances = haversine_km(lat, lon, self.lats, self.lons)
+        best = np.argpartition(distances, k - 1)[:k]
+        best = best[np.argsort(distances[best], kind="stable")]
+        return self.order[best], distances[best]
@@ -0,0 +1,185 @@
+# ingest.py
+# Streams destination records out of JSON-array or JSONL files one record at a time,
+# validating each, so large provider dumps never sit in memory as a whole document.
+# Several shard files can be merged into one catalog (or one snapshot build).
+
+import glob
+import json
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from agent.tools.catalog import DestinationCatalog
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\r\n"
+CATEGORICAL = ("region", "budget", "travel_type")
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(f, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """Yields the elements of a top-level JSON array read incrementally from a text file"""
+    buf, pos, eof = "", 0, False
+
+    def more() -> bool:
+        # Drops the consumed prefix and appends the next chunk; False once the file is exhausted
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+        return bool(chunk)
+
+    while True:
+        while pos < len(buf) and buf[pos] in WHITESPACE:
+            pos += 1
+        if pos < len(buf):
+            break
+        if not more():
+            raise ValueError("expected a JSON array")
+    if buf[pos] != "[":
+        raise ValueError("expected a JSON array")
+    pos += 1
+    first = True  # only right after "[" may a "]" close the array (no trailing commas)
+
+    while True:
+        while pos < len(buf) and buf[pos] in WHITESPACE:
+            pos += 1
+        if pos >= len(buf):
+            if more():
+                continue
+            raise ValueError("unterminated JSON array")
+        if buf[pos] == "]" and first:
+            return
+
+        try:
+            value, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if more():
+                continue  # element runs past the buffer
+            raise
+
+        # Only accept the element once the following ',' or ']' is in the buffer: a number cut
+        # at the chunk boundary ("0." of "0.65") would otherwise parse as a shorter value
+        nxt = end
+        while nxt < len(buf) and buf[nxt] in WHITESPACE:
+            nxt += 1
+        if nxt < len(buf) and buf[nxt] in ",]":
+            yield value
+            if buf[nxt] == "]":
+                return
+            pos, first = nxt + 1, False
+            continue
+        if nxt < len(buf) and eof:
+            raise ValueError(f"unexpected {buf[nxt]!r} after array element")
+        if not more() and nxt >= len(buf):
+            raise ValueError("unterminated JSON array")
+
+
+def iter_jsonl(f) -> Iterator:
+    """Yields one JSON value per non-empty line"""
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {line_no}: {e}") from e
+
+
+def iter_file(path: str) -> Iterator:
+    """Yields raw records from a .json array or .jsonl/.ndjson file (sniffed from content when unsure)"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            yield from iter_jsonl(f)
+            return
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        yield from (iter_json_array(f) if head == "[" else iter_jsonl(f))
+
+
+def validate_record(record) -> Optional[str]:
+    """Returns why a record can't go in the catalog, or None when it is fine"""
+    if not isinstance(record, dict):
+        return "not an object"
+    if not isinstance(record.get("name"), str) or not record["name"].strip():
+        return "missing name"
+    for key in ("region", "budget", "travel_type"):
+        if key in record and not isinstance(record[key], str):
+            return f"{key} must be a string"
+    tags = record.get("tags", [])
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        return "tags must be a list of strings"
+    for key, limit in (("latitude", 90.0), ("longitude", 180.0)):
+        if key in record:
+            try:
+                value = float(record[key])
+            except (TypeError, ValueError):
+                return f"{key} is not a number"
+            if math.isnan(value) or abs(value) > limit:
+                return f"{key} out of range"
+    return None
+
+
+def compact_record(record: Dict) -> Dict:
+    """Interns keys and categorical values. Each streamed element is decoded on its own, so
+    without this every record would carry private copies of "name", "region", "Europe", ..."""
+    compact = {}
+    for key, value in record.items():
+        if key in CATEGORICAL and isinstance(value, str):
+            value = sys.intern(value)
+        elif key == "tags":
+            value = [sys.intern(tag) for tag in value]
+        compact[sys.intern(key)] = value
+    return compact
+
+
+@dataclass
+class IngestReport:
+    loaded: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    errors: List[str] = field(default_factory=list)  # first few problems, for logging
+
+    def note(self, message: str, limit: int = 20) -> None:
+        if len(self.errors) < limit:
+            self.errors.append(message)
+
+
+def iter_shards(paths: Iterable[str], report: Optional[IngestReport] = None) -> Iterator[Dict]:
+    """Yields valid, de-duplicated records from every shard in order. Later duplicates
+    (same name and region) are dropped, so the main file wins over provider shards."""
+    report = report if report is not None else IngestReport()
+    seen = set()
+    for path in paths:
+        for position, record in enumerate(iter_file(path)):
+            problem = validate_record(record)
+            if problem:
+                report.skipped += 1
+                report.note(f"{os.path.basename(path)}[{position}]: {problem}")
+                continue
+            # The key itself, not its hash: two different places whose hashes collide must both load
+            key = (record["name"].lower(), record.get("region", "").lower())
+            if key in seen:
+                report.duplicates += 1
+                continue
+            seen.add(key)
+            report.loaded += 1
+            yield compact_record(record)
+
+
+def shard_paths(data_path: str) -> List[str]:
+    """The main data file followed by its shards, e.g. destinations.json + destinations-*.json[l]"""
+    stem, _ = os.path.splitext(data_path)
+    shards = [p for pattern in ("-*.json", "-*.jsonl", "-*.ndjson") for p in glob.glob(stem + pattern)]
+    return [data_path] + sorted(shards)
+
+
+def load_catalog_streaming(paths: Iterable[str], report: Optional[IngestReport] = None) -> DestinationCatalog:
+    """Builds a catalog by feeding the indexes one record at a time"""
+    catalog = DestinationCatalog()
+    for record in iter_shards(paths, report):
+        catalog.add(record)
+    return catalog
@@ -0,0 +1,155 @@
+# itinerary_json.py
+# Structured itinerary replies (ITINERARY_FORMAT=json): the JSON schema Gemini is asked to follow
+# and a single-pass incremental parser for its reply. The parser only stops at brackets (and, at
+# the top level, at keys, colons and commas): one regex skips everything in between, strings
+# included. It hands back each day object as soon as its closing brace arrives (while the rest
+# of the reply is still streaming) and decodes every other top-level value once, when it ends. Several objects in a row (a long trip's day ranges) merge into one.
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+SLOT_TIMES = ("Morning", "Afternoon", "Evening")
+ITINERARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "overview": {"type": "string"},
+        "days": {"type": "array", "items": {
+            "type": "object",
+            "properties": {
+                "day": {"type": "integer"},
+                "title": {"type": "string"},
+                "slots": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {"time": {"type": "string"}, "activity": {"type": "string"}},
+                    "required": ["time", "activity"]}},
+            },
+            "required": ["day", "title", "slots"]}},
+        "recommendations": {"type": "array", "items": {"type": "string"}},
+        "tips": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["days"],
+}
+GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": ITINERARY_SCHEMA}
+LIST_KEYS = ("recommendations", "tips")  # merged across objects; other keys keep their first value
+
+# Top level: a complete string, a structural character, or (last) the opening quote of a string still arriving
+TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]:,]|"')
+# Inside a value: everything up to the next bracket (or a string still arriving)
+NESTED = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+
+class JsonItineraryStream:
+    """feed() chunks of the JSON reply; each call returns the day objects completed by that chunk.
+    `result` has the other top-level values (title, overview, recommendations, tips) once read."""
+
+    def __init__(self):
+        self.text = ""
+        self.days: List[Dict[str, Any]] = []
+        self.result: Dict[str, Any] = {}
+        self.objects = 0  # top-level objects read to the end
+        self._pos, self._depth = 0, 0
+        self._string: Optional[Tuple[int, int]] = None  # where the last string is
+        self._key: Optional[str] = None  # top-level key whose value is being read
+        self._value: Optional[int] = None  # where that value started
+        self._day: Optional[int] = None  # where the day object being read started
+
+    def _end_value(self, end: int) -> None:
+        key, start = self._key, self._value
+        self._key = self._value = None
+        if key is None or start is None or key == "days":  # days were decoded one by one
+            return
+        try:
+            value = orjson.loads(self.text[start:end])
+        except orjson.JSONDecodeError:
+            return
+        if key in LIST_KEYS and isinstance(value, list):
+            self.result.setdefault(key, []).extend(value)
+        else:
+            self.result.setdefault(key, value)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text += chunk
+        text, pos, finished = self.text, self._pos, []
+        while True:
+            if self._depth > 1:
+                i = NESTED.match(text, pos).end()
+                if i == len(text) or text[i] == '"':
+                    pos = i  # wait for the next bracket, or the rest of this string
+                    break
+                char = text[i]
+                pos = i + 1
+            else:
+                match = TOKEN.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                token, i = match.group(), match.start()
+                if token == '"':
+                    pos = i  # the rest of this string is in a later chunk
+                    break
+                pos, char = match.end(), token[0]
+            if char == '"':
+                self._string = (i, pos)
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 3 and char == "{" and self._key == "days":
+                    self._day = i
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._day is not None:
+                    try:
+                        day = orjson.loads(text[self._day:i + 1])
+                    except orjson.JSONDecodeError:
+                        day = None
+                    if isinstance(day, dict):
+                        self.days.append(day)
+                        finished.append(day)
+                    self._day = None
+                elif self._depth == 0:
+                    self._end_value(i)
+                    self.objects += 1
+            elif self._depth == 1 and char == ":" and self._string is not None:
+                try:
+                    self._key = orjson.loads(text[self._string[0]:self._string[1]])
+                except orjson.JSONDecodeError:
+                    self._key = None
+                self._value = i + 1
+            elif self._depth == 1 and char == ",":
+                self._end_value(i)
+        self._pos = pos
+        return finished
+
+    def close(self) -> List[Dict[str, Any]]:
+        return []  # a day is only handed back once its object is complete
+
+
+def parse_itinerary(text: str) -> JsonItineraryStream:
+    """A whole JSON reply, read in one pass"""
+    parsed = JsonItineraryStream()
+    parsed.feed(text)
+    return parsed
+
+
+def typed_day(day: Dict[str, Any]) -> Dict[str, Any]:
+    """A JSON day as itinerary fields: title and [{"time", "activity"}] slots"""
+    slots = [{"time": str(slot.get("time", "")), "activity": str(slot.get("activity", ""))}
+             for slot in day.get("slots") or [] if isinstance(slot, dict)]
+    return {"title": str(day.get("title", "")), "slots": slots}
+
+
+def day_markdown(day: Dict[str, Any]) -> str:
+    """A JSON day in the markdown the markdown prompts produce, for the chat and the Streamlit UI"""
+    typed = typed_day(day)
+    return "\n".join([f"**Day {day.get('day')}: {typed['title']}**"] +
+                     [f"- {slot['time']}: {slot['activity']}" for slot in typed["slots"]])
+
+
+def notes_markdown(notes: Dict[str, List[str]]) -> str:
+    sections = []
+    for heading, key in (("**Key Recommendations:**", "recommendations"), ("**Travel Tips:**", "tips")):
+        if notes.get(key):
+            sections.append("\n".join([heading] + [f"- {item}" for item in notes[key]]))
+    return "\n\n".join(sections)
@@ -0,0 +1,97 @@
+# llm.py
+# Thin wrapper around LLM text generation, with sync, async and streamed entry points, plus the
+# bounded thread pool that async nodes use to run blocking helpers off the event loop.
+# The backend is picked by LLM_PROVIDER: "gemini" (default) or "fake", the offline stand-in in
+# fake_gemini.py for load tests and profiling. Both implement TextModel.
+# Every call's tokens, cost and latency are accounted by usage.record (see usage.py).
+
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Optional, Protocol, TypeVar
+
+import google.generativeai as genai
+
+from agent.tools.fake_gemini import FakeGeminiModel
+from agent.tools.metrics import track_outbound
+from agent.tools.usage import record
+
+DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+T = TypeVar("T")
+
+# Bounded so a burst of requests can't spawn unbounded threads (or exhaust the catalog's CPU)
+blocking_pool = ThreadPoolExecutor(max_workers=int(os.getenv("AGENT_THREAD_POOL_SIZE", "8")),
+                                   thread_name_prefix="agent-blocking")
+
+
+class TextModel(Protocol):
+    """What the agent needs from a model: genai.GenerativeModel's generate calls. Responses (and
+    streamed chunks) have .text; generate_content_async(prompt, stream=True) returns an async iterable.
+    generation_config (e.g. a JSON response schema) is only passed by structured itinerary prompts"""
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config: Optional[Dict] = None): ...
+
+    async def generate_content_async(self, prompt: str, stream: bool = False,
+                                     generation_config: Optional[Dict] = None): ...
+
+
+PROVIDERS: Dict[str, Callable[[str], TextModel]] = {
+    "gemini": genai.GenerativeModel,
+    "fake": FakeGeminiModel.from_env,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_model(name: str = DEFAULT_MODEL) -> TextModel:
+    """Models are reusable; build one per model name from the LLM_PROVIDER backend"""
+    if LLM_PROVIDER not in PROVIDERS:
+        raise ValueError(f"Unknown LLM_PROVIDER {LLM_PROVIDER!r}, expected one of {sorted(PROVIDERS)}")
+    return PROVIDERS[LLM_PROVIDER](name)
+
+
+def _options(generation_config: Optional[Dict]) -> Dict:
+    """Only passed when set, so models without the parameter (test stubs) still work"""
+    return {"generation_config": generation_config} if generation_config else {}
+
+
+def generate_text(prompt: str, model: str = DEFAULT_MODEL, generation_config: Optional[Dict] = None) -> str:
+    start = time.perf_counter()
+    with track_outbound("gemini", model):
+        response = get_model(model).generate_content(prompt, **_options(generation_config))
+    record(model, prompt, response.text, getattr(response, "usage_metadata", None), time.perf_counter() - start)
+    return response.text
+
+
+async def agenerate_text(prompt: str, model: str = DEFAULT_MODEL, generation_config: Optional[Dict] = None) -> str:
+    """Async Gemini call: awaits the response without holding the event loop"""
+    start = time.perf_counter()
+    with track_outbound("gemini", model):
+        response = await get_model(model).generate_content_async(prompt, **_options(generation_config))
+    record(model, prompt, response.text, getattr(response, "usage_metadata", None), time.perf_counter() - start)
+    return response.text
+
+
+async def astream_text(prompt: str, model: str = DEFAULT_MODEL,
+                       generation_config: Optional[Dict] = None) -> AsyncIterator[str]:
+    """Async Gemini call that yields the response text in chunks as it is generated. Usage is
+    recorded when the stream ends (or is abandoned), from the last chunk's usage_metadata"""
+    start, parts, usage_metadata = time.perf_counter(), [], None
+    try:
+        with track_outbound("gemini", model):
+            response = await get_model(model).generate_content_async(prompt, stream=True,
+                                                                     **_options(generation_config))
+            async for chunk in response:
+                parts.append(chunk.text)
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                yield chunk.text
+    finally:
+        if parts:
+            record(model, prompt, "".join(parts), usage_metadata, time.perf_counter() - start)
+
+
+async def run_blocking(func: Callable[..., T], *args) -> T:
+    """Runs a blocking helper on the bounded pool and awaits its result"""
+    return await asyncio.get_running_loop().run_in_executor(blocking_pool, func, *args)
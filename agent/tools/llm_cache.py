@@ -0,0 +1,110 @@
+# llm_cache.py
+# Cache of Gemini replies keyed by a prompt fingerprint, so a repeat request (same destinations,
+# trip length and travel type) skips the LLM call. The SQLite backend is shared by workers on
+# one host and survives restarts; entries expire after `ttl` seconds and the least recently
+# used ones are evicted past `maxsize` entries or `max_bytes` of stored text.
+# Enable with LLM_CACHE=sqlite (LLM_CACHE_PATH for the file) or memory.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from agent.tools.cache import MISSING, LRUCache
+
+
+def prompt_key(prompt: str, model: str) -> str:
+    """Fingerprint of a prompt for one model; whitespace differences don't count"""
+    return hashlib.sha256(f"{model}\n{' '.join(prompt.split())}".encode()).hexdigest()
+
+
+class SQLiteResponseCache:
+    """LLM replies in a SQLite file; one connection guarded by a lock (like SQLiteSessionStore)"""
+
+    def __init__(self, path: str, maxsize: int = 5000, ttl: Optional[float] = 7 * 86400,
+                 max_bytes: Optional[int] = None):
+        self.path, self.maxsize, self.ttl, self.max_bytes = path, maxsize, ttl, max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                         " size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] >= self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expirations += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return default
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                                 (key, value, len(value.encode()), now, now))
+                if self.ttl is not None:
+                    self.expirations += self._db.execute("DELETE FROM responses WHERE created_at < ?",
+                                                         (now - self.ttl,)).rowcount
+                # Least recently used rows past maxsize, then past max_bytes
+                self.evictions += self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.maxsize,)).rowcount
+                if self.max_bytes is not None:
+                    self.evictions += self._db.execute(
+                        "DELETE FROM responses WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER "
+                        "(ORDER BY accessed_at DESC, key) AS total FROM responses) WHERE total > ?)",
+                        (self.max_bytes,)).rowcount
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._db.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size, stored = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {"size": size, "maxsize": self.maxsize, "bytes": stored, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def make_llm_cache():
+    """Backend from the environment: LLM_CACHE=none (default), memory or sqlite"""
+    kind = os.getenv("LLM_CACHE", "none").lower()
+    ttl = float(os.getenv("LLM_CACHE_TTL", str(7 * 86400)))
+    maxsize = int(os.getenv("LLM_CACHE_MAX", "5000"))
+    if kind == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "llm_cache.db")
+        max_mb = float(os.getenv("LLM_CACHE_MAX_MB", "100"))
+        return SQLiteResponseCache(os.getenv("LLM_CACHE_PATH", default_path), maxsize=maxsize,
+                                   ttl=ttl if ttl > 0 else None, max_bytes=int(max_mb * 1e6) if max_mb > 0 else None)
+    if kind == "memory":
+        return LRUCache(maxsize=maxsize, ttl=ttl if ttl > 0 else None)
+    return None
@@ -0,0 +1,125 @@
+# matcher.py
+# Single-pass slot/intent matcher for free-text trip requests and follow-ups.
+# The vocabulary (data/vocabulary.json) maps slot -> value -> phrases. All phrases are compiled
+# into one regex, factored as a character trie so shared prefixes are walked once instead of
+# trying every phrase at every position, and numbers ("10 days", "day 2 and 3") are part of the
+# same regex: a message is lower-cased once and scanned once, whatever the vocabulary size.
+# Adding phrases only needs a vocabulary edit.
+
+import json
+import os
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+VOCABULARY_PATH = os.getenv("VOCABULARY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             "..", "..", "data", "vocabulary.json"))
+NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+                "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14}
+UNIT_DAYS = {"day": 1, "night": 1, "week": 7}
+BATCH_SEPARATOR = "\x00"  # joins batch texts: not a word character and never part of a phrase
+
+Scan = Dict[str, List[Any]]  # slot -> values in order of first mention
+
+
+def _render(node: Dict) -> str:
+    branches = [(r"\s+" if char == " " else re.escape(char)) + _render(child)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # A phrase ends here but longer ones continue: the greedy `?` tries the longest first
+    return f"(?:{body})?" if "" in node else body
+
+
+def trie_pattern(phrases: Iterable[str]) -> str:
+    """One regex alternation for all phrases, factored by common prefix: be(?:ach(?:es)?|rlin)"""
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _render(trie)
+
+
+def _normalise(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+class PhraseMatcher:
+    """Finds every vocabulary phrase, trip duration and day reference in a text in one regex pass"""
+
+    def __init__(self, vocabulary: Dict[str, Dict[str, List[str]]]):
+        # phrase -> every (slot, value) it signals: "different" is both an edit and a request for another option
+        self.tags: Dict[str, List[Tuple[str, str]]] = {}
+        for slot, values in vocabulary.items():
+            for value, phrases in values.items():
+                for phrase in phrases:
+                    tags = self.tags.setdefault(_normalise(phrase), [])
+                    if (slot, value) not in tags:
+                        tags.append((slot, value))
+
+        number = "|".join([r"\d+"] + list(NUMBER_WORDS))
+        units = "|".join(UNIT_DAYS)
+        self.pattern = re.compile(
+            rf"(?<!\w)(?:(?P<count>{number})[\s-]*(?P<unit>{units})s?"  # "10 days", "two-week"
+            rf"|days?\s*(?P<days>\d+(?:\s*(?:,|and|&)\s*\d+)*)"  # "day 2", "days 2 and 3"
+            rf"|(?P<phrase>{trie_pattern(self.tags)}))(?!\w)")
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def _collect(self, match: "re.Match", found: Scan) -> None:
+        kind = match.lastgroup
+        if kind == "unit":
+            count = match.group("count")
+            days = (int(count) if count.isdigit() else NUMBER_WORDS[count]) * UNIT_DAYS[match.group("unit")]
+            tags = [("duration", f"{days} days")]
+        elif kind == "days":
+            tags = [("day", int(n)) for n in re.findall(r"\d+", match.group("days"))]
+        else:
+            phrase = match.group("phrase")
+            tags = self.tags.get(phrase) or self.tags[_normalise(phrase)]
+        for slot, value in tags:
+            values = found.setdefault(slot, [])
+            if value not in values:
+                values.append(value)
+
+    def scan(self, text: str) -> Scan:
+        """Slot -> values found in `text`, e.g. {"interest": ["beach"], "duration": ["10 days"], "day": [2]}"""
+        found: Scan = {}
+        for match in self.pattern.finditer(text.lower()):
+            self._collect(match, found)
+        return found
+
+    def scan_batch(self, texts: Sequence[str]) -> List[Scan]:
+        """scan() for many texts with a single regex pass over all of them"""
+        lowered = [text.lower().replace(BATCH_SEPARATOR, " ") for text in texts]
+        starts, offset = [], 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + len(BATCH_SEPARATOR)
+        results: List[Scan] = [{} for _ in texts]
+        for match in self.pattern.finditer(BATCH_SEPARATOR.join(lowered)):
+            self._collect(match, results[bisect_right(starts, match.start()) - 1])
+        return results
+
+
+def load_vocabulary(path: str = VOCABULARY_PATH) -> Dict[str, Dict[str, List[str]]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def get_matcher(path: str = VOCABULARY_PATH) -> PhraseMatcher:
+    """The compiled matcher for a vocabulary file, built once per process"""
+    return PhraseMatcher(load_vocabulary(path))
+
+
+@lru_cache(maxsize=256)
+def scan_message(text: str) -> Scan:
+    """get_matcher().scan(text), cached: the nodes of one turn share a single pass over the message.
+    The result is shared, treat it as read-only."""
+    return get_matcher().scan(text)
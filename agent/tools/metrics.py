@@ -0,0 +1,182 @@
+# metrics.py
+# In-process counters and latency histograms for the agent service, rendered in the
+# Prometheus text format by main.py's /metrics. Kept dependency-free and thread-safe:
+# nodes run on the event loop and on the blocking pool at the same time.
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (-65536, -4096, -256, 0, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+TOKEN_BUCKETS = (64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 131072)
+SAMPLE_ITEMS = 32  # long lists are sized from their first items, so measuring stays O(1)-ish
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._series: Dict[LabelValues, List[float]] = {}  # per-bucket counts, then sum, then count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1  # cumulative: counted in every bucket it fits
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series[-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = _labels(self.label_names, labels, f'le="{_number(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {_number(count)}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-2])}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {_number(series[-1])}")
+        return lines
+
+
+node_duration = Histogram("agent_node_duration_seconds", "Wall time of each graph node run.", ["node"])
+node_errors = Counter("agent_node_errors_total", "Graph node runs that raised.", ["node", "error"])
+node_state_delta = Histogram("agent_node_state_delta_bytes", "Approximate change in JSON state size per node run.",
+                             ["node"], buckets=SIZE_BUCKETS)
+outbound_duration = Histogram("agent_outbound_duration_seconds", "Wall time of outbound Gemini/HTTP calls.",
+                              ["service", "target"])
+outbound_errors = Counter("agent_outbound_errors_total", "Outbound Gemini/HTTP calls that failed.",
+                          ["service", "target", "error"])
+request_duration = Histogram("agent_http_request_duration_seconds", "Wall time of API requests.",
+                             ["method", "path", "status"])
+coalesced_requests = Counter("agent_coalesced_requests_total",
+                             "Calls that waited on an identical in-flight call instead of making their own.", ["name"])
+llm_tokens = Counter("agent_llm_tokens_total", "LLM tokens used, by direction (prompt or response).",
+                     ["model", "node", "direction"])
+llm_cost = Counter("agent_llm_cost_usd_total", "Estimated LLM spend in US dollars.", ["model", "node"])
+llm_prompt_tokens = Histogram("agent_llm_prompt_tokens", "Prompt tokens per LLM call.", ["node"], buckets=TOKEN_BUCKETS)
+llm_budget_trims = Counter("agent_llm_budget_trims_total",
+                           "Prompts sent in their compact form to stay within the request's token budget.", ["node"])
+
+METRICS = [node_duration, node_errors, node_state_delta, outbound_duration, outbound_errors, request_duration,
+           coalesced_requests, llm_tokens, llm_cost, llm_prompt_tokens, llm_budget_trims]
+_caches: Dict[str, object] = {}  # name -> object with stats() (see cache.LRUCache)
+_gauges: Dict[str, Tuple[str, Callable[[], Dict[str, float]]]] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """Exposes a cache's stats() (hits, misses, hit ratio, ...) on every scrape"""
+    _caches[name] = cache
+
+
+def register_gauges(prefix: str, help: str, read: Callable[[], Dict[str, float]]) -> None:
+    """Exposes read() -> {name: value} as gauges named prefix_name, evaluated at scrape time"""
+    _gauges[prefix] = (help, read)
+
+
+def estimate_bytes(value) -> int:
+    """JSON size of a state value; lists longer than SAMPLE_ITEMS are extrapolated from a sample"""
+    if isinstance(value, list) and len(value) > SAMPLE_ITEMS:
+        return len(value) * estimate_bytes(value[:SAMPLE_ITEMS]) // SAMPLE_ITEMS
+    try:
+        return len(orjson.dumps(value, default=lambda o: dict(o) if hasattr(o, "keys") else str(o)))
+    except TypeError:
+        return len(str(value))
+
+
+@contextmanager
+def track_outbound(service: str, target: str) -> Iterator[None]:
+    """Times an outbound call and counts it as failed if the block raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        outbound_errors.inc(service, target, type(e).__name__)
+        raise
+    finally:
+        outbound_duration.observe(time.perf_counter() - start, service, target)
+
+
+def render() -> str:
+    """Every metric, cache and gauge in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    stats = {name: cache.stats() for name, cache in _caches.items()}
+    for key, kind, help in (("hits", "counter", "Cache lookups that found an entry."),
+                            ("misses", "counter", "Cache lookups that found nothing."),
+                            ("evictions", "counter", "Entries dropped to stay within maxsize."),
+                            ("expirations", "counter", "Entries dropped because their TTL ran out."),
+                            ("size", "gauge", "Entries currently cached."),
+                            ("hit_ratio", "gauge", "Hits / lookups since start.")):
+        name = f"agent_cache_{key}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for cache, values in sorted(stats.items()):
+            lines.append(f'{name}{{cache="{_escape(cache)}"}} {_number(values.get(key, 0))}')
+
+    for prefix, (help, read) in sorted(_gauges.items()):
+        for key, value in sorted(read().items()):
+            lines += [f"# HELP {prefix}_{key} {help}", f"# TYPE {prefix}_{key} gauge",
+                      f"{prefix}_{key} {_number(value)}"]
+    return "\n".join(lines) + "\n"
+
+
+def observe_node(name: str, seconds: float, error: Optional[BaseException], delta_bytes: int) -> None:
+    """Default node hook: feeds the node histograms and error counter"""
+    node_duration.observe(seconds, name)
+    node_state_delta.observe(delta_bytes, name)
+    if error is not None:
+        node_errors.inc(name, type(error).__name__)
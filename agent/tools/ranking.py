@@ -0,0 +1,114 @@
+# ranking.py
+# Scores every destination against the preferences in one vectorised pass instead of
+# dropping a destination as soon as one preference misses.
+# The catalog is laid out as NumPy columns (region codes, budget codes scored by tier,
+# travel type codes, tag bitsets) and the best k are picked with argpartition rather than a full sort.
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# How much each satisfied preference adds to a destination's score
+DEFAULT_WEIGHTS = {"preferred_city": 3.0, "travel_style": 2.0, "budget": 1.5, "travel_type": 1.0}
+
+# Ordered budget tiers, so a "moderate" place still scores for a "low" budget (just less)
+BUDGET_TIERS = {"low": 0, "budget": 0, "moderate": 1, "mid-range": 1, "medium": 1, "high": 2, "luxury": 2}
+
+
+def _encode(values: Iterable[str], vocab: Dict[str, int]) -> np.ndarray:
+    return np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int32)
+
+
+class DestinationRanker:
+    """Column-oriented view of the catalog used for weighted top-k scoring."""
+
+    def __init__(self, records: Iterable[Dict]):
+        records = list(records)
+        self.size = len(records)
+
+        self.region_vocab: Dict[str, int] = {}
+        self.region_codes = _encode((r.get("region", "").lower() for r in records), self.region_vocab)
+
+        self.budget_vocab: Dict[str, int] = {}
+        self.budget_codes = _encode((r.get("budget", "").lower() for r in records), self.budget_vocab)
+
+        self.travel_type_vocab: Dict[str, int] = {}
+        self.travel_type_codes = _encode((r.get("travel_type", "").lower() for r in records), self.travel_type_vocab)
+
+        # One bit per distinct tag, packed into as many uint64 words as the vocabulary needs
+        self.tag_vocab: Dict[str, int] = {}
+        tag_counts = np.zeros(self.size, dtype=np.int64)
+        tag_codes = []
+        for idx, record in enumerate(records):
+            tags = record.get("tags", [])
+            tag_counts[idx] = len(tags)
+            tag_codes.extend(self.tag_vocab.setdefault(t.lower(), len(self.tag_vocab)) for t in tags)
+        tag_codes = np.array(tag_codes, dtype=np.int64)
+        rows = np.repeat(np.arange(self.size), tag_counts)
+        self.tag_bits = np.zeros((self.size, max(1, (len(self.tag_vocab) + 63) // 64)), dtype=np.uint64)
+        np.bitwise_or.at(self.tag_bits, (rows, tag_codes >> 6), np.left_shift(np.uint64(1), (tag_codes & 63).astype(np.uint64)))
+
+    @classmethod
+    def from_columns(cls, region_vocab: Dict[str, int], region_codes: np.ndarray,
+                     budget_vocab: Dict[str, int], budget_codes: np.ndarray,
+                     travel_type_vocab: Dict[str, int], travel_type_codes: np.ndarray,
+                     tag_vocab: Dict[str, int], tag_bits: np.ndarray) -> "DestinationRanker":
+        """Wraps already coded columns (vocab keys lowercased, codes indexing them) without a pass over records"""
+        ranker = cls.__new__(cls)
+        ranker.size = len(region_codes)
+        ranker.region_vocab, ranker.region_codes = region_vocab, region_codes
+        ranker.budget_vocab, ranker.budget_codes = budget_vocab, budget_codes
+        ranker.travel_type_vocab, ranker.travel_type_codes = travel_type_vocab, travel_type_codes
+        ranker.tag_vocab, ranker.tag_bits = tag_vocab, tag_bits
+        return ranker
+
+    def score(self, preferences: Dict, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Weighted match score of every destination (higher is better)"""
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        scores = np.zeros(self.size, dtype=np.float32)
+
+        # Coded columns are scored through a small per-value table (weight folded in), so each
+        # preference costs one gather over the column instead of several full-length temporaries
+        if "preferred_city" in preferences:
+            needle = preferences["preferred_city"].lower()
+            table = [weights["preferred_city"] if needle in region else 0.0 for region in self.region_vocab]
+            scores += np.array(table or [0.0], dtype=np.float32)[self.region_codes]
+
+        if "travel_style" in preferences:
+            code = self.tag_vocab.get(preferences["travel_style"].lower())
+            if code is not None:
+                has_tag = (self.tag_bits[:, code >> 6] & np.uint64(1 << (code & 63))) != 0
+                scores += np.float32(weights["travel_style"]) * has_tag
+
+        if "budget" in preferences:
+            budget = preferences["budget"].lower()
+            tier = BUDGET_TIERS.get(budget)
+            table = []
+            for value in self.budget_vocab:
+                if value == budget:
+                    table.append(1.0)
+                elif tier is not None and value in BUDGET_TIERS:
+                    # Half credit per tier away: low vs moderate = 0.5, low vs high = 0
+                    table.append(max(0.0, 1.0 - 0.5 * abs(BUDGET_TIERS[value] - tier)))
+                else:
+                    table.append(0.0)
+            scores += np.array(table or [0.0], dtype=np.float32)[self.budget_codes] * np.float32(weights["budget"])
+
+        if "travel_type" in preferences:
+            travel_type = preferences["travel_type"].lower()
+            table = [weights["travel_type"] if value == travel_type else 0.0 for value in self.travel_type_vocab]
+            scores += np.array(table or [0.0], dtype=np.float32)[self.travel_type_codes]
+
+        return scores
+
+    def top_k(self, preferences: Dict, k: int = 5, weights: Optional[Dict[str, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and scores of the k best-scoring destinations with a positive score, best first"""
+        scores = self.score(preferences, weights)
+        k = min(k, self.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        best = np.argpartition(-scores, k - 1)[:k] if k < self.size else np.arange(self.size)
+        best = best[np.lexsort((best, -scores[best]))]  # best first, equal scores in catalog order
+        best = best[scores[best] > 0]
+        return best, scores[best]
@@ -0,0 +1,162 @@
+# sessions.py
+# Server-side conversation sessions: the AgentState of each conversation, kept between
+# /recommend calls so follow-ups see earlier preferences, suggestions and itinerary.
+# Two backends with the same interface: in-memory (per process) and SQLite (shared by
+# workers on one host, survives restarts). Both evict least-recently-used sessions past
+# `maxsize`, drop sessions idle for longer than `ttl` seconds and cap the stored history.
+
+import copy
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import fields
+from typing import Any, Dict, Optional
+
+import orjson
+
+from agent.state import AgentState
+from agent.tools.cache import MISSING, LRUCache
+
+SKIPPED_FIELDS = ("timings",)  # per-run data, never carried into the next turn
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if hasattr(value, "keys"):
+        return dict(value)  # catalog snapshot views become plain dicts
+    raise TypeError(f"can't store {type(value).__name__} in a session")
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and "$date" in value:
+            return datetime.date.fromisoformat(value["$date"])
+        if len(value) == 1 and "$datetime" in value:
+            return datetime.datetime.fromisoformat(value["$datetime"])
+        return {key: _decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(item) for item in value]
+    return value
+
+
+def encode_state(state: AgentState) -> bytes:
+    values = {f.name: getattr(state, f.name) for f in fields(state) if f.name not in SKIPPED_FIELDS}
+    return orjson.dumps(values, default=_encode_value, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+def decode_state(data: bytes) -> AgentState:
+    values = _decode_value(orjson.loads(data))
+    known = {f.name for f in fields(AgentState)}  # ignore fields from an older/newer AgentState
+    return AgentState(**{key: value for key, value in values.items() if key in known})
+
+
+def trim_state(state: AgentState, history_limit: int) -> AgentState:
+    """Copy of the state as it is stored: per-run fields reset, history capped to the last turns.
+    Top-level containers are copied so a stored session never shares them with a running turn."""
+    values = {f.name: copy.copy(getattr(state, f.name)) for f in fields(state) if f.name not in SKIPPED_FIELDS}
+    values["chat_history"] = list(state.chat_history[-history_limit:]) if history_limit else []
+    return AgentState(**values)
+
+
+class MemorySessionStore:
+    """Sessions in this process only, on top of the LRU/TTL cache"""
+
+    def __init__(self, maxsize: int = 1000, ttl: Optional[float] = 1800, history_limit: int = 20):
+        self.history_limit = history_limit
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)  # every turn re-puts, so the TTL is an idle timeout
+
+    def get(self, session_id: str) -> Optional[AgentState]:
+        state = self._cache.get(session_id)
+        return None if state is MISSING else trim_state(state, self.history_limit)  # callers get their own copy
+
+    def put(self, session_id: str, state: AgentState) -> None:
+        self._cache.put(session_id, trim_state(state, self.history_limit))
+
+    def delete(self, session_id: str) -> None:
+        self._cache.delete(session_id)
+
+    def stats(self) -> Dict[str, float]:
+        return self._cache.stats()
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite file, serialised as JSON; one connection guarded by a lock"""
+
+    def __init__(self, path: str, maxsize: int = 10000, ttl: Optional[float] = 1800, history_limit: int = 20):
+        self.path, self.maxsize, self.ttl, self.history_limit = path, maxsize, ttl, history_limit
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state BLOB NOT NULL,"
+                         " accessed_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_accessed_at ON sessions (accessed_at)")
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, session_id: str) -> Optional[AgentState]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT state, accessed_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] >= self.ttl:
+                self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self.expirations += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE sessions SET accessed_at = ? WHERE id = ?", (now, session_id))
+            self.hits += 1
+        return decode_state(row[0])
+
+    def put(self, session_id: str, state: AgentState) -> None:
+        data = encode_state(trim_state(state, self.history_limit))
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("INSERT INTO sessions (id, state, accessed_at) VALUES (?, ?, ?) ON CONFLICT(id) "
+                                 "DO UPDATE SET state = excluded.state, accessed_at = excluded.accessed_at",
+                                 (session_id, data, now))
+                if self.ttl is not None:
+                    self.expirations += self._db.execute("DELETE FROM sessions WHERE accessed_at < ?",
+                                                         (now - self.ttl,)).rowcount
+                # Least recently used rows past maxsize
+                self.evictions += self._db.execute(
+                    "DELETE FROM sessions WHERE id IN "
+                    "(SELECT id FROM sessions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.maxsize,)).rowcount
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {"size": size, "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def make_session_store():
+    """Backend from the environment: SESSION_BACKEND=memory (default) or sqlite"""
+    ttl = float(os.getenv("SESSION_TTL", "1800"))
+    limits = {"maxsize": int(os.getenv("SESSION_MAX", "1000")), "ttl": ttl if ttl > 0 else None,
+              "history_limit": int(os.getenv("SESSION_HISTORY_LIMIT", "20"))}
+    if os.getenv("SESSION_BACKEND", "memory").lower() == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "sessions.db")
+        return SQLiteSessionStore(os.getenv("SESSION_DB_PATH", default_path), **limits)
+    return MemorySessionStore(**limits)
@@ -0,0 +1,77 @@
+# singleflight.py
+# Coalesces identical concurrent calls: the first caller for a key runs the work and callers that
+# arrive while it is in flight wait for its result (or its exception) instead of repeating it.
+# Sync callers (graph.invoke on worker threads) and async callers (graph.ainvoke on the event loop)
+# share one table, so a burst of identical requests makes one call whichever path serves them.
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+from agent.tools.metrics import coalesced_requests
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Tuple[Future, int]] = {}  # key -> (result, thread the leader runs on)
+
+    def _join(self, key: str) -> Tuple[Future, int, bool]:
+        """(the call's future, its leader's thread, whether this caller leads)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call[0], call[1], False
+            future = Future()
+            self._calls[key] = (future, threading.get_ident())
+            return future, threading.get_ident(), True
+
+    def _finish(self, key: str, future: Future, result=None, error: BaseException = None) -> None:
+        with self._lock:
+            del self._calls[key]  # later callers start a new call (or hit a cache this one filled)
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # The leader was cancelled or interrupted: waiters get an error, not the cancellation
+            future.set_exception(RuntimeError(f"coalesced call aborted: {type(error).__name__}"))
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        """func() once for all concurrent callers with this key; blocks until it is done"""
+        future, leader_thread, leader = self._join(key)
+        if not leader:
+            if leader_thread == threading.get_ident():
+                # The leader is a coroutine on this thread's event loop: blocking here would stall it
+                return func()
+            coalesced_requests.inc(self.name)
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: str, afunc: Callable[[], Awaitable[T]]) -> T:
+        """Async do(): awaits the in-flight call without blocking the event loop"""
+        future, _, leader = self._join(key)
+        if not leader:
+            coalesced_requests.inc(self.name)
+            # shield: a waiter being cancelled must not cancel the shared call
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            result = await afunc()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
@@ -0,0 +1,332 @@
+# snapshot.py
+# Compiles destinations.json into a compact binary snapshot and maps it back in zero-copy.
+#
+# Build:   python -m agent.tools.snapshot [data/destinations.json] [data/destinations.snapshot]
+#          (shards next to the source, e.g. destinations-*.jsonl, are merged in)
+#
+# Layout (little-endian): a fixed header, a section table, then 8-byte aligned NumPy arrays:
+#   strings        interned UTF-8 string table (uint32 offsets + one blob)
+#   name           uint32 string id per record
+#   region         uint32 code into region_enum
+#   budget         uint16 code into budget_enum
+#   travel_type    uint16 code into travel_type_enum
+#   latitude/longitude   float32 (NaN when the record has no coordinates)
+#   tag_bits       uint64 bitset per record over tag_enum
+# Budget, travel type and tags are stored lowercased (filters compare them case-insensitively)
+# and tags come back in tag-table order;
+# fields other than the seven above are not carried into the snapshot.
+# Every worker that mmaps the same file shares its pages through the OS page cache.
+
+import math
+import mmap
+import os
+from array import array
+import struct
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from agent.tools.catalog import DestinationCatalog, ids_to_bitmap
+from agent.tools.geo import GeoIndex
+from agent.tools.ranking import DestinationRanker
+
+MAGIC = b"DESTSNP1"
+HEADER = struct.Struct("<8sIII")  # magic, record count, uint64 words per tag bitset, section count
+SECTION = struct.Struct("<QQ")  # byte offset, element count
+SECTIONS = [
+    ("string_offsets", np.uint32),
+    ("string_data", np.uint8),
+    ("name", np.uint32),
+    ("region", np.uint32),
+    ("budget", np.uint16),
+    ("travel_type", np.uint16),
+    ("latitude", np.float32),
+    ("longitude", np.float32),
+    ("tag_bits", np.uint64),
+    ("region_enum", np.uint32),
+    ("budget_enum", np.uint32),
+    ("travel_type_enum", np.uint32),
+    ("tag_enum", np.uint32),
+]
+
+
+def _coordinate(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def build_snapshot(records: Iterable[Dict], path: str) -> int:
+    """Writes the records to a snapshot file (atomically replaced). Returns the record count."""
+    strings: Dict[str, int] = {}
+    enums: Dict[str, Dict[str, int]] = {"region": {}, "budget": {}, "travel_type": {}, "tag": {}}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    def code(enum: str, value: str) -> int:
+        return enums[enum].setdefault(value, len(enums[enum]))
+
+    # Typed arrays rather than lists, so streaming a huge catalog in keeps a small footprint
+    names, regions, budgets, travel_types = array("I"), array("I"), array("I"), array("I")
+    lats, lons = array("f"), array("f")
+    tag_rows, tag_codes = array("I"), array("I")
+    for record in records:
+        row = len(names)
+        names.append(intern(record.get("name", "")))
+        regions.append(code("region", record.get("region", "")))
+        budgets.append(code("budget", record.get("budget", "").lower()))
+        travel_types.append(code("travel_type", record.get("travel_type", "").lower()))
+        lats.append(_coordinate(record.get("latitude")))
+        lons.append(_coordinate(record.get("longitude")))
+        for tag in record.get("tags", []):
+            tag_rows.append(row)
+            tag_codes.append(code("tag", tag.lower()))
+
+    count = len(names)
+    words = max(1, (len(enums["tag"]) + 63) // 64)
+    tag_bits = np.zeros((count, words), dtype=np.uint64)
+    rows = np.frombuffer(tag_rows, dtype=np.uint32).astype(np.int64)
+    flat = np.frombuffer(tag_codes, dtype=np.uint32).astype(np.int64)
+    np.bitwise_or.at(tag_bits, (rows, flat >> 6), np.left_shift(np.uint64(1), (flat & 63).astype(np.uint64)))
+
+    enum_ids = {name: [intern(value) for value in enum] for name, enum in enums.items()}
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    arrays = {
+        "string_offsets": offsets,
+        "string_data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "name": names,
+        "region": regions,
+        "budget": budgets,
+        "travel_type": travel_types,
+        "latitude": lats,
+        "longitude": lons,
+        "tag_bits": tag_bits.ravel(),
+        "region_enum": enum_ids["region"],
+        "budget_enum": enum_ids["budget"],
+        "travel_type_enum": enum_ids["travel_type"],
+        "tag_enum": enum_ids["tag"],
+    }
+
+    table_end = HEADER.size + SECTION.size * len(SECTIONS)
+    offset = table_end
+    blobs, table = [], []
+    for name, dtype in SECTIONS:
+        blob = np.asarray(arrays[name], dtype=dtype).tobytes()
+        offset += -offset % 8
+        table.append(SECTION.pack(offset, len(blob) // np.dtype(dtype).itemsize))
+        blobs.append((offset, blob))
+        offset += len(blob)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, count, words, len(SECTIONS)))
+        f.write(b"".join(table))
+        for start, blob in blobs:
+            f.write(b"\0" * (start - f.tell()))
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return count
+
+
+class Destination(Mapping):
+    """Read-only view of one snapshot record. Behaves like the destination dict it was built from."""
+
+    __slots__ = ("_snapshot", "_idx")
+    FIELDS = ("name", "region", "tags", "budget", "travel_type", "latitude", "longitude")
+
+    def __init__(self, snapshot: "CatalogSnapshot", idx: int):
+        self._snapshot = snapshot
+        self._idx = idx
+
+    @property
+    def name(self) -> str:
+        return self._snapshot.string(self._snapshot.name[self._idx])
+
+    @property
+    def region(self) -> str:
+        return self._snapshot.enum("region", self._snapshot.region[self._idx])
+
+    @property
+    def budget(self) -> str:
+        return self._snapshot.enum("budget", self._snapshot.budget[self._idx])
+
+    @property
+    def travel_type(self) -> str:
+        return self._snapshot.enum("travel_type", self._snapshot.travel_type[self._idx])
+
+    @property
+    def tags(self) -> List[str]:
+        return self._snapshot.tags(self._idx)
+
+    @property
+    def latitude(self) -> Optional[float]:
+        value = float(self._snapshot.latitude[self._idx])
+        return None if value != value else round(value, 5)  # float32 keeps ~5 decimals of a degree
+
+    @property
+    def longitude(self) -> Optional[float]:
+        value = float(self._snapshot.longitude[self._idx])
+        return None if value != value else round(value, 5)
+
+    def _present(self):
+        snap, idx = self._snapshot, self._idx
+        if math.isnan(snap.latitude[idx]) or math.isnan(snap.longitude[idx]):
+            return self.FIELDS[:5]
+        return self.FIELDS
+
+    def __getitem__(self, key: str):
+        if key not in self._present():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._present())
+
+    def __len__(self) -> int:
+        return len(self._present())
+
+    def to_dict(self) -> Dict:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"Destination({self.to_dict()!r})"
+
+
+class CatalogSnapshot:
+    """Memory-mapped snapshot. Column arrays are NumPy views straight onto the mapped file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, words, n_sections = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or n_sections != len(SECTIONS):
+            raise ValueError(f"{path} is not a destination snapshot (or was built by another version)")
+        self.size = count
+        self.tag_words = words
+
+        for i, (name, dtype) in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            setattr(self, name, np.frombuffer(self._mmap, dtype=dtype, count=length, offset=offset))
+        self.tag_bits = self.tag_bits.reshape(count, words)
+
+        # Decoded strings are interned on first use and shared by every view
+        self._strings: List[Optional[str]] = [None] * (len(self.string_offsets) - 1)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, idx: int) -> Destination:
+        if not -self.size <= idx < self.size:
+            raise IndexError(idx)
+        return Destination(self, idx % self.size if self.size else idx)
+
+    def __iter__(self):
+        return (Destination(self, idx) for idx in range(self.size))
+
+    def string(self, string_id) -> str:
+        string_id = int(string_id)
+        value = self._strings[string_id]
+        if value is None:
+            start, end = int(self.string_offsets[string_id]), int(self.string_offsets[string_id + 1])
+            value = self._strings[string_id] = self.string_data[start:end].tobytes().decode("utf-8")
+        return value
+
+    def enum(self, field: str, code) -> str:
+        return self.string(getattr(self, f"{field}_enum")[code])
+
+    def enum_values(self, field: str) -> List[str]:
+        return [self.string(string_id) for string_id in getattr(self, f"{field}_enum")]
+
+    def tags(self, idx: int) -> List[str]:
+        tags = []
+        for word_idx, word in enumerate(self.tag_bits[idx].tolist()):
+            while word:
+                low = word & -word
+                tags.append(self.enum("tag", word_idx * 64 + low.bit_length() - 1))
+                word ^= low
+        return tags
+
+
+def _group_bitmaps(codes: np.ndarray, keys: List[str], size: int) -> Dict[str, int]:
+    """Bitmap per key from a coded column, merging codes whose keys coincide"""
+    bitmaps: Dict[str, int] = {}
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+    for code, key in enumerate(keys):
+        ids = order[bounds[code]:bounds[code + 1]]
+        if len(ids):
+            bitmaps[key] = bitmaps.get(key, 0) | ids_to_bitmap(ids, size)
+    return bitmaps
+
+
+class SnapshotCatalog(DestinationCatalog):
+    """Catalog served from a snapshot. Indexes are built from the coded columns, never from dicts."""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        super().__init__()
+        self.snapshot = snapshot
+        self.records = snapshot  # lazily created Destination views
+
+    def add(self, record: Dict) -> int:
+        raise TypeError("snapshot catalogs are read-only; rebuild the snapshot instead")
+
+    def _build_bitmaps(self) -> Dict[str, Dict[str, int]]:
+        snap = self.snapshot
+        tags = {}
+        for code, tag in enumerate(snap.enum_values("tag")):
+            bit = np.uint64(1 << (code & 63))
+            tags[tag] = ids_to_bitmap(np.flatnonzero(snap.tag_bits[:, code >> 6] & bit), snap.size)
+        return {
+            "region": _group_bitmaps(snap.region, [r.lower() for r in snap.enum_values("region")], snap.size),
+            "tag": tags,
+            "budget": _group_bitmaps(snap.budget, snap.enum_values("budget"), snap.size),
+            "travel_type": _group_bitmaps(snap.travel_type, snap.enum_values("travel_type"), snap.size),
+        }
+
+    def _build_ranker(self) -> DestinationRanker:
+        snap = self.snapshot
+        region_vocab: Dict[str, int] = {}
+        remap = np.array([region_vocab.setdefault(r.lower(), len(region_vocab)) for r in snap.enum_values("region")] or [0],
+                         dtype=np.int32)
+
+        def vocab(field):
+            return {value: code for code, value in enumerate(snap.enum_values(field))}
+
+        return DestinationRanker.from_columns(
+            region_vocab, remap[snap.region],
+            vocab("budget"), snap.budget,
+            vocab("travel_type"), snap.travel_type,
+            vocab("tag"), snap.tag_bits,
+        )
+
+    def _build_geo(self) -> GeoIndex:
+        snap = self.snapshot
+        ids = np.flatnonzero(~(np.isnan(snap.latitude) | np.isnan(snap.longitude)))
+        return GeoIndex(snap.latitude[ids], snap.longitude[ids], ids=ids)
+
+
+def main(argv: List[str]) -> None:
+    from agent.tools.destination_db import DATA_PATH, SNAPSHOT_PATH
+    from agent.tools.ingest import IngestReport, iter_shards, shard_paths
+
+    source = argv[0] if argv else DATA_PATH
+    target = argv[1] if len(argv) > 1 else SNAPSHOT_PATH
+    report = IngestReport()
+    # Records are streamed from every shard straight into the column arrays
+    count = build_snapshot(iter_shards(shard_paths(source), report), target)
+    for error in report.errors:
+        print(f"⚠️ skipped {error}")
+    print(f"✅ Wrote {count} destinations to {target} ({os.path.getsize(target):,} bytes)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,153 @@
+# usage.py
+# Token and cost accounting for every LLM call. Each call records its prompt and response tokens
+# (the backend's usage_metadata, or an estimate when it reports none, like the test stubs) and its
+# latency, labelled with the graph node it ran in. Totals feed the /metrics counters; calls made
+# inside usage_scope() also add up per request and, with a session id, per session in `ledger`.
+# A request's token budget (LLM_TOKEN_BUDGET, or the request's own) is checked by the prompt
+# builders with fits(): over budget they switch to their compact templates.
+
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from agent.tools.cache import LRUCache
+from agent.tools.metrics import llm_budget_trims, llm_cost, llm_prompt_tokens, llm_tokens
+
+CHARS_PER_TOKEN = 4  # estimate for backends that don't report usage
+TOKEN_BUDGET = int(os.getenv("LLM_TOKEN_BUDGET", "0"))  # tokens per request; 0: no budget
+# USD per million (prompt, response) tokens; LLM_PRICE_INPUT / LLM_PRICE_OUTPUT override them
+PRICES: Dict[str, Tuple[float, float]] = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+FIELDS = ("calls", "prompt_tokens", "response_tokens", "cost_usd", "seconds")
+
+current_node: ContextVar[str] = ContextVar("llm_node", default="")
+current_request: ContextVar[Optional["RequestUsage"]] = ContextVar("llm_request", default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def prices(model: str) -> Tuple[float, float]:
+    prompt_price, response_price = PRICES.get(model, PRICES["gemini-2.5-flash"])
+    return (float(os.getenv("LLM_PRICE_INPUT", prompt_price)), float(os.getenv("LLM_PRICE_OUTPUT", response_price)))
+
+
+def _add(totals: Dict[str, float], call: Dict[str, float]) -> None:
+    for field in FIELDS:
+        totals[field] = totals.get(field, 0) + call[field]
+
+
+class Usage:
+    """Totals of some LLM calls, with a per-node breakdown"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = dict.fromkeys(FIELDS, 0)
+        self.nodes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, node: str, call: Dict[str, float]) -> None:
+        with self._lock:
+            _add(self.totals, call)
+            _add(self.nodes.setdefault(node, {}), call)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**{key: round(value, 6) for key, value in self.totals.items()},
+                    "nodes": {node: {key: round(value, 6) for key, value in totals.items()}
+                              for node, totals in self.nodes.items()}}
+
+
+class RequestUsage(Usage):
+    def __init__(self, session_id: str = "", budget: int = 0):
+        super().__init__()
+        self.session_id, self.budget = session_id, budget
+
+    def fits(self, tokens: int) -> bool:
+        used = self.totals["prompt_tokens"] + self.totals["response_tokens"]
+        return not self.budget or used + tokens <= self.budget
+
+    def summary(self) -> Dict[str, Any]:
+        return {**super().summary(), "budget": self.budget}
+
+
+class UsageLedger:
+    """Per-session Usage; bounded and expiring like the other in-process caches"""
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = 86400):
+        self._sessions = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, node: str, call: Dict[str, float]) -> None:
+        with self._lock:
+            usage = self._sessions.get(session_id, None)
+            if usage is None:
+                usage = Usage()
+                self._sessions.put(session_id, usage)
+        usage.add(node, call)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        usage = self._sessions.get(session_id, None)
+        return usage.summary() if usage is not None else None
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.delete(session_id)
+
+
+ledger = UsageLedger(maxsize=int(os.getenv("LLM_USAGE_SESSIONS", "10000")))
+
+
+@contextmanager
+def usage_scope(session_id: str = "", budget: Optional[int] = None) -> Iterator[RequestUsage]:
+    """Accounts the LLM calls made inside (and in the tasks and copied contexts started from it)
+    to one request, with a token budget (default LLM_TOKEN_BUDGET; 0: none)"""
+    token = current_request.set(RequestUsage(session_id, TOKEN_BUDGET if budget is None else int(budget)))
+    try:
+        yield current_request.get()
+    finally:
+        current_request.reset(token)
+
+
+@contextmanager
+def node_scope(node: str) -> Iterator[None]:
+    """Labels the LLM calls made inside with a node name (graph nodes get theirs from graph.as_node)"""
+    token = current_node.set(node)
+    try:
+        yield
+    finally:
+        current_node.reset(token)
+
+
+def record(model: str, prompt: str, text: str, usage_metadata: Any, seconds: float) -> Dict[str, float]:
+    """Accounts one LLM call; returns its tokens, cost and time"""
+    prompt_tokens = getattr(usage_metadata, "prompt_token_count", 0) or estimate_tokens(prompt)
+    response_tokens = getattr(usage_metadata, "candidates_token_count", 0) or estimate_tokens(text)
+    prompt_price, response_price = prices(model)
+    call = {"calls": 1, "prompt_tokens": prompt_tokens, "response_tokens": response_tokens,
+            "cost_usd": (prompt_tokens * prompt_price + response_tokens * response_price) / 1e6, "seconds": seconds}
+    node = current_node.get() or "-"
+    llm_tokens.inc(model, node, "prompt", amount=prompt_tokens)
+    llm_tokens.inc(model, node, "response", amount=response_tokens)
+    llm_cost.inc(model, node, amount=call["cost_usd"])
+    llm_prompt_tokens.observe(prompt_tokens, node)
+    request = current_request.get()
+    if request is not None:
+        request.add(node, call)
+        if request.session_id:
+            ledger.add(request.session_id, node, call)
+    return call
+
+
+def fits(*prompts: str) -> bool:
+    """Whether sending these prompts keeps the current request within its token budget"""
+    request = current_request.get()
+    return request is None or request.fits(sum(estimate_tokens(prompt) for prompt in prompts))
+
+
+def count_trim() -> None:
+    llm_budget_trims.inc(current_node.get() or "-")
@@ -2,8 +2,12 @@
 import streamlit as st
 import requests
 import datetime
+import json
 import google.generativeai as genai
 from agent.nodes.itinerary_creator import create_itinerary
+from agent.tools.llm import generate_text
+from agent.tools.usage import node_scope, usage_scope
+from agent.tools.destination_db import get_catalog
 from amadeus import Client
 
 # --------------Audio Library ----------------
@@ -26,8 +30,7 @@ Money_Exchange_RATE_API_KEY = os.getenv("MONEY_EXCHANGE_RATE_API_KEY")
 
 
 # ------------------ Gemini Setup ------------------
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-2.5-flash")
+genai.configure(api_key=GEMINI_API_KEY)  # generate_text uses Gemini, or the offline fake with LLM_PROVIDER=fake
 
 
 # ------------------ TRIP COST ESTIMATOR (Enhanced Version) ------------------
@@ -608,6 +611,15 @@ def format_popularity(rate):
     elif rate == "3" or rate == "3h": return "⭐⭐⭐ High (Tourist Favorite)"
     else: return "❔ Not Rated"
 
+# Popularity choice -> OpenTripMap rates that satisfy it
+POPULARITY_RATES = {"most popular": ["3", "3h"], "moderate": ["2", "2h"], "less crowded": ["1", "1h"]}
+
+# The local catalog only answers when it has at least this many places near the city
+MIN_LOCAL_MATCHES = int(os.getenv("MIN_LOCAL_MATCHES", "5"))
+
+def matches_popularity(rate, popularity):
+    return not popularity or popularity not in POPULARITY_RATES or str(rate) in POPULARITY_RATES[popularity]
+
 def find_destinations(state: AgentState) -> AgentState:
     city = state.preferences.get("preferred_city", "")
     interest = state.preferences.get("interest", "").lower()
@@ -684,6 +696,20 @@ def find_destinations(state: AgentState) -> AgentState:
         print("Geo Error:", e)
         return state
 
+    # Answer from the local catalog's spatial index before spending an OpenTripMap radius call
+    try:
+        nearby = get_catalog().within_radius(float(lat), float(lon), 10)  # same 10 km radius as below
+        # Places in the city, not the city's own record, filtered like the OpenTripMap results
+        nearby = [d for d in nearby if d["name"].split(",")[0].strip().lower() != city.lower()]
+        if interest:
+            nearby = [d for d in nearby if any(tag.lower() in interest for tag in d.get("tags", []))]
+        nearby = [d for d in nearby if matches_popularity(d.get("rate", ""), popularity)]
+        if len(nearby) >= MIN_LOCAL_MATCHES:  # too few: OpenTripMap has more to offer
+            state.suggested_destinations = [{**d, "source": "catalog"} for d in nearby]
+            return state
+    except Exception as e:
+        print("Local catalog lookup error:", e)
+
     places_url = "https://api.opentripmap.com/0.1/en/places/radius"
     places_params = {
         "radius": "10000",
@@ -703,13 +729,8 @@ def find_destinations(state: AgentState) -> AgentState:
         for item in results:
             if item.get("name"):
                 rate = str(item.get("rate", ""))
-                if popularity:
-                    if popularity == "most popular" and rate not in ["3", "3h"]:
-                        continue
-                    elif popularity == "moderate" and rate not in ["2", "2h"]:
-                        continue
-                    elif popularity == "less crowded" and rate not in ["1", "1h"]:
-                        continue
+                if not matches_popularity(rate, popularity):
+                    continue
 
                 suggestions.append({
                     "name": item.get("name"),
@@ -739,6 +760,19 @@ def get_image_url(destination_name):
         print("Image fetch error:", e)
         return None
     
+def iter_sse(response):
+    """(event, data) pairs from a text/event-stream response, as they arrive"""
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:  # a blank line ends the event
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
 # ------------------ Main App ------------------
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["🧳 AI Travel Chat", "🧭 Destination Finder",  "📌 Trip Planning Essentials", "💰 Cost Estimator", "✈️ Flight & Deals"])
 
@@ -761,11 +795,15 @@ with tab1:
         if user_input.strip():
             with st.spinner("Thinking..."):
                 try:
-                    response = model.generate_content(user_input)
-                    answer = response.text
+                    # Accounted like the agent's calls: /metrics under node "chat", and shown below
+                    with usage_scope() as usage, node_scope("chat"):
+                        answer = generate_text(user_input)
                     st.session_state.chat_history.append({"question": user_input, "answer": answer})
                     st.success("Here is a suggestion:")
                     st.markdown(answer)
+                    spent = usage.summary()
+                    st.caption(f"🪙 {spent['prompt_tokens'] + spent['response_tokens']} tokens "
+                               f"(~${spent['cost_usd']:.5f}) in {spent['seconds']:.1f}s")
                 except Exception as e:
                     st.error(f"Gemini Error: {e}")
         else:
@@ -865,7 +903,8 @@ with tab2:
                     except:
                         st.markdown("ℹ️ No extra details available.")
 
-                st.markdown(f"**Region:** {dest['region']}")
+                if dest.get("region"):  # optional in the catalog (see agent/tools/ingest.py)
+                    st.markdown(f"**Region:** {dest['region']}")
                 map_link = f"https://www.google.com/maps/search/?api=1&query={dest['name'].replace(' ', '+')}"
                 st.markdown(f'<a href="{map_link}" target="_blank" class="map-button">📍 View on Map</a>', unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
@@ -884,41 +923,54 @@ with tab2:
             if not selected_places:
                 st.warning("Please select at least one place for the itinerary.")
             else:
-                with st.spinner("Creating your personalized itinerary via Agent Backend..."):
-                    
-                    # 1. Configuration
-                    BACKEND_URL = "https://travel-planner-ai-agent-v2-0-2.onrender.com"
-                    ENDPOINT = "/recommend" 
-                    
-                    # Calculate trip days (ensure this is a positive number)
-                    num_days = (end_date - start_date).days + 1 if (end_date - start_date).days >= 0 else 1
-                    
-                    # 2. Prepare Payload for FastAPI's /recommend endpoint
-                    payload = {
-                        "trip_type": travel_type, 
-                        "region": city, 
-                        "budget": "mid-range", # Assuming a default budget 
-                        "days": num_days,
-                        "places": selected_places # Pass the list of selected places
-                    }
-                    
-                    try:
-                        # 3. Send Request to the Deployed Agent (using a timeout)
-                        response = requests.post(f"{BACKEND_URL}{ENDPOINT}", json=payload, timeout=120) 
+                # 1. Configuration
+                BACKEND_URL = "https://travel-planner-ai-agent-v2-0-2.onrender.com"
+                ENDPOINT = "/recommend/stream"  # Server-Sent Events: days are shown as the agent writes them
+
+                # 2. Prepare Payload for FastAPI's /recommend/stream endpoint
+                payload = {
+                    "trip_type": travel_type, 
+                    "region": city, 
+                    "budget": "mid-range", # Assuming a default budget 
+                    "start_date": start_date.isoformat(),
+                    "end_date": max(start_date, end_date).isoformat(),
+                    "places": selected_places # Pass the list of selected places
+                }
+
+                status = st.empty()
+                status.info("🧠 Planning your trip via Agent Backend...")
+                days_shown, streamed_days = st.empty(), []
+                try:
+                    # 3. Stream the itinerary: connect timeout 10s, then up to 120s between events
+                    with requests.post(f"{BACKEND_URL}{ENDPOINT}", json=payload, stream=True, timeout=(10, 120)) as response:
                         response.raise_for_status() # Raise exception for 4xx/5xx errors
-                        
-                        # 4. Process Response
-                        backend_result = response.json()
-                        final_response = backend_result.get("result", "⚠️ Agent returned an empty or malformed response.")
-                        
-                        # 5. Store Result in a new session state variable
+
+                        # 4. Render each event as it arrives
+                        final_response = None
+                        for event, data in iter_sse(response):
+                            if event == "destinations":
+                                status.info("🗓️ Writing your itinerary for " + ", ".join(d["name"] for d in data) + "...")
+                            elif event == "day":
+                                streamed_days.append(f"📅 **{data.get('date') or ''}**\n\n{data['activities']}")
+                                days_shown.markdown("\n\n".join(streamed_days))
+                            elif event == "error":
+                                st.error(f"❌ The agent failed: {data.get('error')}")
+                            elif event == "done":
+                                final_response = data.get("result")
+
+                    # 5. Store Result in a new session state variable (shown in full below)
+                    status.empty()
+                    days_shown.empty()
+                    if final_response:
                         st.session_state.itinerary_output = final_response
                         st.session_state.itinerary_generated = True
-                        
-                    except requests.exceptions.RequestException as e:
-                        st.error(f"❌ Connection Error: Could not reach the agent backend. Detail: {e}")
-                    except Exception as e:
-                        st.error(f"An unexpected error occurred: {e}")
+
+                except requests.exceptions.RequestException as e:
+                    status.empty()
+                    st.error(f"❌ Connection Error: Could not reach the agent backend. Detail: {e}")
+                except Exception as e:
+                    status.empty()
+                    st.error(f"An unexpected error occurred: {e}")
         # --------------------------------------------------------------------------------------------------
         # END OF REPLACEMENT: The new display logic follows.
         # --------------------------------------------------------------------------------------------------
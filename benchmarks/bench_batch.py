@@ -0,0 +1,45 @@
+# bench_batch.py
+# A mailing list's worth of trip requests: one POST /recommend per item vs. POST /recommend/batch.
+# Goes through the real FastAPI app (in-process TestClient), so HTTP parsing, JSON and session
+# handling are part of the cost; messages repeat the way form-built requests do.
+# Run from the repo root:  python -m benchmarks.bench_batch --items 2000
+
+import argparse
+import random
+import time
+
+from fastapi.testclient import TestClient
+
+import main as api
+from benchmarks.synthetic import BUDGETS, REGIONS, TAGS
+
+
+def make_items(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    return [{"trip_type": rng.choice(TAGS[:10]), "region": rng.choice(list(REGIONS)), "budget": rng.choice(BUDGETS[0])}
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    with TestClient(api.app) as client:
+        start = time.perf_counter()
+        for item in items:
+            client.post("/recommend", json=item)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        body = client.post("/recommend/batch", json=items).json()
+        batch = time.perf_counter() - start
+
+    print(f"{args.items} requests ({body['unique']} distinct)")
+    print(f"  one call each  {single:7.2f} s  {args.items / single:8.1f} items/s")
+    print(f"  one batch      {batch:7.2f} s  {args.items / batch:8.1f} items/s  ({single / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
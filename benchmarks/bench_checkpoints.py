@@ -0,0 +1,80 @@
+# bench_checkpoints.py
+# What durable checkpoints cost: serialising a full AgentState (encode/decode time and size per
+# serializer), and whole graph runs without a checkpointer vs. in-memory vs. SQLite checkpoints.
+# Uses a stubbed Gemini with no latency, so the checkpoint overhead isn't hidden behind it.
+# Run from the repo root:  python -m benchmarks.bench_checkpoints --runs 200
+
+import argparse
+import os
+import pickle
+import statistics
+import tempfile
+import time
+from dataclasses import fields
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from agent.graph import build_graph
+from agent.tools import llm
+from agent.tools.checkpoints import CompactSerializer, SQLiteCheckpointSaver
+from benchmarks.bench_concurrency import StubModel, make_state
+
+
+class PickleSerializer:
+    def dumps_typed(self, obj):
+        return "pickle", pickle.dumps(obj)
+
+    def loads_typed(self, data):
+        return pickle.loads(data[1])
+
+
+def codec_costs(values: dict, repeats: int):
+    print(f"full state ({len(values)} channels), per checkpoint:")
+    for label, serde in (("compact msgpack", CompactSerializer()), ("langgraph jsonplus", JsonPlusSerializer()),
+                         ("pickle", PickleSerializer())):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            blobs = [serde.dumps_typed(value) for value in values.values()]
+        encode = (time.perf_counter() - start) / repeats * 1e6
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for blob in blobs:
+                serde.loads_typed(blob)
+        decode = (time.perf_counter() - start) / repeats * 1e6
+        size = sum(len(blob[1]) for blob in blobs)
+        print(f"  {label:<20} encode {encode:7.1f} µs  decode {decode:7.1f} µs  {size:6,} bytes")
+
+
+def run_costs(runs: int):
+    print(f"graph.invoke, {runs} runs (5 nodes, 3-day itinerary, stubbed Gemini):")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, checkpointer in (("no checkpoints", None), ("in-memory", InMemorySaver(serde=CompactSerializer())),
+                                    ("sqlite", SQLiteCheckpointSaver(os.path.join(tmp, "checkpoints.db")))):
+            graph = build_graph(checkpointer=checkpointer)
+            samples = []
+            for i in range(runs):
+                start = time.perf_counter()
+                graph.invoke(make_state(), {"configurable": {"thread_id": f"run-{i}"}})
+                samples.append((time.perf_counter() - start) * 1000)
+            checkpoints = len(list(checkpointer.list({"configurable": {"thread_id": "run-0"}}))) if checkpointer else 0
+            print(f"  {label:<15} p50 {statistics.median(samples):6.2f} ms  ({checkpoints} checkpoints per run)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--history", type=int, default=20, help="chat turns in the serialised state")
+    args = parser.parse_args()
+
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: StubModel(0.0)
+    result = build_graph().invoke(make_state())
+    result["chat_history"] = [{"user": "Something cheaper please", "assistant": "🔄 Here are some new options"}
+                              ] * args.history
+    values = {f.name: result[f.name] for f in fields(make_state())}
+    codec_costs(values, repeats=2000)
+    run_costs(args.runs)
+
+
+if __name__ == "__main__":
+    main()
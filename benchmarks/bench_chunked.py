@@ -0,0 +1,49 @@
+# bench_chunked.py
+# Long trips planned in one prompt vs. in concurrently generated day ranges (ITINERARY_CHUNK_DAYS),
+# against the fake Gemini, whose generation time grows with the reply's length like the real one.
+# Reports wall time per trip length for each chunk size.
+# Run from the repo root:  python -m benchmarks.bench_chunked --tokens-per-s 150
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from agent.nodes import itinerary_creator
+from agent.state import AgentState
+from agent.tools import llm
+from agent.tools.fake_gemini import FakeGeminiModel
+
+
+def make_trip(days: int) -> AgentState:
+    start = date(2026, 7, 1)
+    return AgentState(suggested_destinations=[{"name": "Nice, France"}, {"name": "Rome, Italy"},
+                                              {"name": "Interlaken, Switzerland"}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=days - 1),
+                                   "travel_type": "couple"})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[7, 14, 21])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[0, 7, 4], help="ITINERARY_CHUNK_DAYS values")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake Gemini time to first token (s)")
+    parser.add_argument("--tokens-per-s", type=float, default=150.0)
+    args = parser.parse_args()
+
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: FakeGeminiModel(latency=args.latency, tokens_per_s=args.tokens_per_s)
+    itinerary_creator.response_cache = None
+    print(f"acreate_itinerary wall time; fake Gemini {args.latency}s to first token, {args.tokens_per_s:g} tokens/s")
+    print("  days  " + "".join(f"{'one prompt' if size == 0 else f'{size}-day ranges':>16}" for size in args.chunks))
+    for days in args.lengths:
+        cells = []
+        for size in args.chunks:
+            itinerary_creator.CHUNK_DAYS = size
+            start = time.perf_counter()
+            asyncio.run(itinerary_creator.acreate_itinerary(make_trip(days)))
+            cells.append(f"{time.perf_counter() - start:14.2f} s")
+        print(f"  {days:4}  " + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# bench_concurrency.py
+# N simultaneous /recommend-style requests against a stubbed Gemini with fixed latency.
+# "blocking" is the old handler (graph.invoke inside an async endpoint): every request holds
+# the event loop for the whole LLM call, so they run one after another. "async" awaits
+# graph.ainvoke, so the LLM waits overlap.
+# Run from the repo root:  python -m benchmarks.bench_concurrency --concurrency 1 10 50 --latency 0.2
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from agent.graph import get_graph
+from agent.state import AgentState
+from agent.tools import llm
+
+ITINERARY = "\n".join(f"**Day {d}: Exploring**\n- Morning: Walk\n- Afternoon: Museum\n- Evening: Dinner"
+                      for d in range(1, 4))
+
+
+class StubResponse:
+    text = ITINERARY
+
+
+class StubModel:
+    """Stands in for genai.GenerativeModel: fixed latency, canned itinerary"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return StubResponse()
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(self.latency)
+        return StubResponse()
+
+
+def make_state() -> AgentState:
+    start = date(2026, 7, 1)
+    return AgentState(chat_history=[{"user": "I want a beach trip in Europe on a low budget"}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=2)})
+
+
+async def blocking_request(graph):
+    return graph.invoke(make_state())
+
+
+async def async_request(graph):
+    return await graph.ainvoke(make_state())
+
+
+async def run(handler, concurrency: int):
+    graph = get_graph()
+    latencies = []
+
+    async def timed():
+        # Latency counts from when all requests arrived, so time spent queued behind a blocked loop shows
+        result = await handler(graph)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert result["itinerary"], "stub itinerary missing"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return concurrency / wall, statistics.median(latencies), latencies[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.2, help="stubbed Gemini latency in seconds")
+    args = parser.parse_args()
+
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: StubModel(args.latency)
+    get_graph().invoke(make_state())  # compile + load the catalog outside the timings
+
+    print(f"stub LLM latency: {args.latency * 1000:.0f} ms")
+    for concurrency in args.concurrency:
+        for mode, handler in (("blocking", blocking_request), ("async", async_request)):
+            throughput, p50, worst = asyncio.run(run(handler, concurrency))
+            print(f"  {mode:<8} x{concurrency:<4} {throughput:8.1f} req/s  p50 {p50:8.1f} ms  max {worst:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_followups.py
+# LLM calls and prompt size per conversation turn: strict chain (every node, every turn) vs. the
+# routed graph (suggestion-only follow-ups skip the itinerary, edits regenerate only the days
+# they touch, unchanged days are reused).
+# Uses a stubbed Gemini and the repo's destination data.
+# Run from the repo root:  python -m benchmarks.bench_followups
+
+import re
+from datetime import date, timedelta
+
+from agent.graph import build_graph
+from agent.nodes import itinerary_creator
+from agent.state import AgentState
+from agent.tools import llm
+
+TRIP_START = date(2026, 7, 1)
+
+# (message, preference changes the form would send with it)
+CONVERSATION = [
+    ("I want a beach trip in Europe", {}),
+    ("Can you change day 2 to something more relaxing?", {}),
+    ("Let's stay two more days", {"end_date": TRIP_START + timedelta(days=4)}),
+    ("Something cheaper in the evening", {}),
+    ("Can we go a week later?", {"start_date": TRIP_START + timedelta(days=7),
+                                 "end_date": TRIP_START + timedelta(days=11)}),
+    ("Show me another option", {}),
+    ("Something cheaper please", {}),
+    ("Mountain trip instead", {}),
+    ("Swap day 3 for a food tour", {}),
+]
+
+
+class CountingModel:
+    """Stub model that records prompts and answers with the days it was asked for"""
+
+    def __init__(self):
+        self.calls, self.prompt_chars, self.days_generated = 0, 0, 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        full = re.search(r"Create a detailed (\d+)-day", prompt)
+        scope = re.search(r"(?:Write only|In) ((?:Day \d+(?:, )?)+)", prompt)
+        days = range(1, int(full.group(1)) + 1) if full else [int(n) for n in re.findall(r"\d+", scope.group(1))]
+        self.days_generated += len(days)
+        self.text = "\n".join(f"**Day {d}: Plan**\n- Morning: Walk\n- Evening: Dinner" for d in days)
+        return self
+
+
+def run_conversation(graph) -> CountingModel:
+    model = CountingModel()
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: model
+    state = AgentState(preferences={"preferred_city": "Europe", "travel_style": "beach",
+                                    "start_date": TRIP_START, "end_date": TRIP_START + timedelta(days=2)})
+    for message, changes in CONVERSATION:
+        state.chat_history = state.chat_history + [{"user": message}]
+        state.preferences = {**state.preferences, **changes}
+        result = graph.invoke(state)
+        state = AgentState(**{key: value for key, value in result.items() if key != "timings"})
+    return model
+
+
+def main():
+    print(f"{len(CONVERSATION)}-turn conversation")
+    for label, routed, incremental in (("strict, full plans", False, False), ("routed, full plans", True, False),
+                                       ("routed, incremental", True, True)):
+        itinerary_creator.INCREMENTAL = incremental
+        model = run_conversation(build_graph(routed))
+        print(f"  {label:<20} {model.calls} LLM calls ({model.calls / len(CONVERSATION):.2f}/turn), "
+              f"{model.days_generated:3d} days generated, {model.prompt_chars:,} prompt chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# bench_geo.py
+# Compares the grid spatial index against a brute-force vectorised haversine scan.
+# Run from the repo root:  python -m benchmarks.bench_geo --size 1000000
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from agent.tools.geo import GeoIndex, haversine_km
+
+
+def timed(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(*query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--km", type=float, default=50.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, args.size)))
+    lons = rng.uniform(-180, 180, args.size)
+    queries = list(zip(np.degrees(np.arcsin(rng.uniform(-1, 1, args.queries))), rng.uniform(-180, 180, args.queries)))
+
+    start = time.perf_counter()
+    index = GeoIndex(lats, lons)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    def brute_radius(lat, lon):
+        distances = haversine_km(lat, lon, lats, lons)
+        hits = np.flatnonzero(distances <= args.km)
+        return hits[np.argsort(distances[hits])]
+
+    def brute_nearest(lat, lon):
+        distances = haversine_km(lat, lon, lats, lons)
+        best = np.argpartition(distances, args.k - 1)[:args.k]
+        return best[np.argsort(distances[best])]
+
+    for lat, lon in queries[:10]:
+        assert set(index.within_radius(lat, lon, args.km)[0]) == set(brute_radius(lat, lon))
+        assert list(index.nearest(lat, lon, args.k)[0]) == list(brute_nearest(lat, lon))
+
+    print(f"points            : {args.size:,}")
+    print(f"grid build        : {build_ms:.1f} ms")
+    for label, fn in [
+        (f"within {args.km:g} km  grid ", lambda lat, lon: index.within_radius(lat, lon, args.km)),
+        (f"within {args.km:g} km  brute", brute_radius),
+        (f"nearest {args.k}     grid ", lambda lat, lon: index.nearest(lat, lon, args.k)),
+        (f"nearest {args.k}     brute", brute_nearest),
+    ]:
+        p50, p99 = timed(fn, queries if "grid" in label else queries[:20])
+        print(f"{label}: p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
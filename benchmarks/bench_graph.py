@@ -0,0 +1,39 @@
+# bench_graph.py
+# Per-run node timings for the strict serial chain vs. the routed graph, with a stubbed Gemini.
+# "critical path" is the longest dependency chain of node times (the run's latency floor);
+# "sum" is what the same nodes cost back to back.
+# Run from the repo root:  python -m benchmarks.bench_graph --runs 50 --latency 0.05
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from agent.graph import DEPENDENCIES, SERIAL_DEPENDENCIES, build_graph, critical_path_ms
+from agent.tools import llm
+from benchmarks.bench_concurrency import StubModel, make_state
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="stubbed Gemini latency in seconds")
+    args = parser.parse_args()
+
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: StubModel(args.latency)
+    for label, routed, dependencies in (("serial", False, SERIAL_DEPENDENCIES), ("routed", True, DEPENDENCIES)):
+        graph = build_graph(routed)
+        graph.invoke(make_state())  # load the catalog outside the timings
+        walls, paths, sums = [], [], []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            timings = asyncio.run(graph.ainvoke(make_state()))["timings"]
+            walls.append((time.perf_counter() - start) * 1000)
+            paths.append(critical_path_ms(timings, dependencies))
+            sums.append(sum(timings.values()))
+        print(f"{label:<8} wall p50 {statistics.median(walls):8.2f} ms | critical path p50 "
+              f"{statistics.median(paths):8.2f} ms | node sum p50 {statistics.median(sums):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# bench_ingest.py
+# Peak Python heap while importing a large catalog: json.load of the whole document vs.
+# streaming records straight into the catalog indexes / the snapshot builder.
+# Run from the repo root:  python -m benchmarks.bench_ingest --size 200000
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from agent.tools.catalog import DestinationCatalog
+from agent.tools.ingest import iter_shards, load_catalog_streaming
+from agent.tools.snapshot import build_snapshot
+from benchmarks.synthetic import generate_destinations
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28}: {elapsed * 1000:7.0f} ms  peak heap {peak / 1e6:7.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "destinations.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(generate_destinations(args.size), f)
+        print(f"{args.size:,} destinations, {os.path.getsize(path) / 1e6:.1f} MB of JSON")
+
+        def json_load():
+            with open(path, encoding="utf-8") as f:
+                return DestinationCatalog(json.load(f))
+
+        measure("json.load + catalog", json_load)
+        measure("streamed into catalog", lambda: load_catalog_streaming([path]))
+        measure("streamed into snapshot", lambda: build_snapshot(iter_shards([path]), path + ".snapshot"))
+
+
+if __name__ == "__main__":
+    main()
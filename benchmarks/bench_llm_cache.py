@@ -0,0 +1,57 @@
+# bench_llm_cache.py
+# What the itinerary response cache saves: create_itinerary for repeat trips (same destinations,
+# length and travel type, different dates) with no cache vs. the in-memory and SQLite backends.
+# The stubbed Gemini sleeps --latency per call; --unique trips are cycled through --runs times.
+# Run from the repo root:  python -m benchmarks.bench_llm_cache --runs 200 --unique 20
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from agent.nodes import itinerary_creator
+from agent.state import AgentState
+from agent.tools import llm
+from agent.tools.cache import LRUCache
+from agent.tools.llm_cache import SQLiteResponseCache
+from benchmarks.bench_concurrency import StubModel
+
+
+def make_trip(i: int, unique: int) -> AgentState:
+    start = date(2026, 7, 1) + timedelta(days=i)  # a different start date every run
+    return AgentState(suggested_destinations=[{"name": f"City {i % unique}"}, {"name": "Nice, France"}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=2),
+                                   "travel_type": "couple"})
+
+
+def measure(cache, runs: int, unique: int):
+    itinerary_creator.response_cache = cache
+    samples = []
+    for i in range(runs):
+        start = time.perf_counter()
+        itinerary_creator.create_itinerary(make_trip(i, unique))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), sum(samples) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--unique", type=int, default=20, help="distinct trips among the runs")
+    parser.add_argument("--latency", type=float, default=0.05, help="stubbed Gemini seconds per call")
+    args = parser.parse_args()
+
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: StubModel(args.latency)
+    print(f"create_itinerary, {args.runs} runs over {args.unique} distinct trips, {args.latency}s per Gemini call")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, cache in (("no cache", None), ("in-memory", LRUCache(maxsize=5000)),
+                             ("sqlite", SQLiteResponseCache(os.path.join(tmp, "llm_cache.db")))):
+            p50, total = measure(cache, args.runs, args.unique)
+            hits = f"  hit ratio {cache.stats()['hit_ratio']:.0%}" if cache is not None else ""
+            print(f"  {label:<10} p50 {p50:7.2f} ms  total {total:6.2f} s{hits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# bench_matcher.py
+# Slot/intent matching cost per message as the vocabulary grows to thousands of phrases:
+#   substring  - one `phrase in message` check per phrase (the old extractor, scaled up)
+#   flat regex - one alternation of every phrase, longest first
+#   trie regex - the PhraseMatcher: phrases factored by common prefix, one pass per message
+#   batch      - PhraseMatcher.scan_batch over all messages at once
+# Run from the repo root:  python -m benchmarks.bench_matcher --terms 100 1000 5000 20000
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from agent.tools.matcher import PhraseMatcher, load_vocabulary
+from benchmarks.synthetic import generate_messages
+
+SYLLABLES = ["ka", "lo", "mi", "san", "ta", "ri", "po", "vel", "an", "dor", "bel", "um", "ko", "sa", "ne", "ti"]
+
+
+def grow_vocabulary(terms: int, seed: int = 3) -> Dict[str, Dict[str, List[str]]]:
+    """The repo vocabulary plus synthetic place names (1-3 made-up words) up to `terms` phrases"""
+    rng = random.Random(seed)
+    vocabulary = load_vocabulary()
+    vocabulary["place"] = places = {}
+    phrases = {p for values in vocabulary.values() for group in values.values() for p in group}
+    while len(phrases) < terms:
+        phrase = " ".join("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(rng.randint(1, 3)))
+        if phrase not in phrases:
+            phrases.add(phrase)
+            places[phrase] = [phrase]
+    return vocabulary
+
+
+def per_message_us(run, messages: List[str], repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for message in messages:
+            run(message)
+    return (time.perf_counter() - start) / (repeats * len(messages)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--terms", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    messages = generate_messages(args.messages)
+    print(f"{args.messages} messages, mean {sum(map(len, messages)) / len(messages):.0f} chars; µs per message")
+    print(f"{'terms':>7} {'build ms':>9} {'substring':>10} {'flat regex':>11} {'trie regex':>11} {'batch':>8}")
+    for terms in args.terms:
+        vocabulary = grow_vocabulary(terms)
+        start = time.perf_counter()
+        matcher = PhraseMatcher(vocabulary)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        phrases = list(matcher.tags)
+        flat = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+                          + r")(?!\w)")
+        substring = per_message_us(lambda m: (lambda text: [p for p in phrases if p in text])(m.lower()), messages, 1)
+        flat_us = per_message_us(lambda m: flat.findall(m.lower()), messages, args.repeats)
+        trie_us = per_message_us(matcher.scan, messages, args.repeats)
+        batch_us = per_message_us(lambda _: matcher.scan_batch(messages), [None], args.repeats) / len(messages)
+        print(f"{len(matcher):>7} {build_ms:>9.1f} {substring:>10.1f} {flat_us:>11.1f} {trie_us:>11.1f} {batch_us:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# bench_parsing.py
+# Cost of reading an itinerary reply: the markdown parser and the incremental JSON parser, both
+# fed the whole reply and fed Gemini-sized streamed chunks (the JSON parser also builds each day's
+# markdown), against a full orjson.loads of the JSON reply for reference. Replies come from the
+# fake Gemini so both formats describe the same plan.
+# Run from the repo root:  python -m benchmarks.bench_parsing --days 14
+
+import argparse
+import random
+import time
+
+import orjson
+
+from agent.nodes.itinerary_creator import ReplyStream, _parse_reply
+from agent.tools.fake_gemini import CHARS_PER_TOKEN, CHUNK_TOKENS, fake_reply
+
+PROMPT = "Create a detailed {days}-day itinerary for couple travelers visiting: Nice, France, Rome, Italy.\n"
+
+
+def timed(func, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def streamed(text: str) -> None:
+    size, stream = CHUNK_TOKENS * CHARS_PER_TOKEN, ReplyStream()
+    for i in range(0, len(text), size):
+        stream.feed(text[i:i + size])
+    stream.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    prompt = PROMPT.format(days=args.days)
+    markdown, structured = fake_reply(prompt, random.Random(1)), fake_reply(prompt, random.Random(1), structured=True)
+    print(f"{args.days}-day reply: markdown {len(markdown):,} chars, JSON {len(structured):,} chars; µs per reply")
+    for label, func in (("markdown, whole reply", lambda: _parse_reply(markdown)),
+                        ("markdown, streamed", lambda: streamed(markdown)),
+                        ("JSON, whole reply", lambda: _parse_reply(structured)),
+                        ("JSON, streamed", lambda: streamed(structured)),
+                        ("orjson.loads only", lambda: orjson.loads(structured))):
+        print(f"  {label:<24} {timed(func, args.repeats):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# bench_pipeline.py
+# End-to-end load test of the graph (graph.ainvoke, what /recommend runs) against the offline
+# fake Gemini: --requests trips at --concurrency, with the fake's time to first token, token rate
+# and error rate configurable. Reports throughput, p50/p99 latency, Gemini calls, fallbacks and
+# tokens and cost per request; --token-budget shows what the compact prompts save.
+# Run from the repo root:  python -m benchmarks.bench_pipeline --requests 200 --concurrency 20
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from agent.graph import get_graph
+from agent.state import AgentState
+from agent.tools import llm
+from agent.tools.fake_gemini import FakeGeminiModel
+from agent.tools.metrics import llm_budget_trims
+from agent.tools.usage import usage_scope
+
+MESSAGES = ["I want a beach trip in Europe on a low budget", "Mountains and hiking for a couple",
+            "A family trip somewhere with nature", "City tours and food with friends"]
+
+
+def make_state(i: int, distinct: int) -> AgentState:
+    start = date(2026, 7, 1) + timedelta(days=i)
+    length = 2 + i % distinct  # trips of different lengths make different prompts
+    return AgentState(chat_history=[{"user": MESSAGES[i % len(MESSAGES)]}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=length - 1)})
+
+
+async def run(requests: int, concurrency: int, distinct: int, budget: int):
+    graph, slots, samples, fallbacks, spent = get_graph(), asyncio.Semaphore(concurrency), [], 0, []
+
+    async def one(i: int):
+        nonlocal fallbacks
+        async with slots:
+            start = time.perf_counter()
+            with usage_scope(budget=budget) as usage:
+                result = await graph.ainvoke(make_state(i, distinct))
+            samples.append(time.perf_counter() - start)
+            spent.append(usage.summary())
+            fallbacks += any(item["activities"].startswith("Day ") for item in result["itinerary"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start, sorted(samples), fallbacks, spent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--distinct", type=int, default=50, help="distinct trip lengths among the requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake Gemini time to first token (s)")
+    parser.add_argument("--tokens-per-s", type=float, default=150.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--token-budget", type=int, default=0, help="tokens per request; 0: none")
+    args = parser.parse_args()
+
+    model = FakeGeminiModel(latency=args.latency, tokens_per_s=args.tokens_per_s, error_rate=args.error_rate,
+                            seed=args.seed)
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: model
+    get_graph().invoke(AgentState())  # compile and load the catalog outside the timings
+    elapsed, samples, fallbacks, spent = asyncio.run(run(args.requests, args.concurrency, args.distinct,
+                                                         args.token_budget))
+    print(f"{args.requests} requests at concurrency {args.concurrency}; fake Gemini {args.latency}s to first token, "
+          f"{args.tokens_per_s:g} tokens/s, {args.error_rate:.0%} errors")
+    print(f"  throughput {args.requests / elapsed:6.1f} req/s  p50 {statistics.median(samples):5.2f} s  "
+          f"p99 {samples[int(len(samples) * 0.99) - 1]:5.2f} s")
+    print(f"  gemini calls {model.calls}  fallback itineraries {fallbacks}")
+    prompt_tokens = sum(usage["prompt_tokens"] for usage in spent) / len(spent)
+    response_tokens = sum(usage["response_tokens"] for usage in spent) / len(spent)
+    print(f"  per request: {prompt_tokens:.0f} prompt + {response_tokens:.0f} response tokens, "
+          f"${sum(usage['cost_usd'] for usage in spent) / len(spent):.5f}; "
+          f"compact prompts {llm_budget_trims.value('create_itinerary'):.0f}")
+
+
+if __name__ == "__main__":
+    main()
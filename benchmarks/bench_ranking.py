@@ -0,0 +1,40 @@
+# bench_ranking.py
+# Times one vectorised scoring pass plus argpartition top-k over a large synthetic catalog.
+# Run from the repo root:  python -m benchmarks.bench_ranking --size 1000000
+
+import argparse
+import statistics
+import time
+
+from agent.tools.ranking import DestinationRanker
+from benchmarks.synthetic import generate_destinations, generate_queries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    destinations = generate_destinations(args.size)
+    queries = generate_queries(args.queries)
+
+    start = time.perf_counter()
+    ranker = DestinationRanker(destinations)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    samples = []
+    for preferences in queries:
+        start = time.perf_counter()
+        ranker.top_k(preferences, args.k)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+
+    print(f"catalog size : {args.size:,}")
+    print(f"column build : {build_ms:.1f} ms (once per catalog version)")
+    print(f"top-{args.k} query : p50 {statistics.median(samples):.2f} ms  max {samples[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bench_singleflight.py
+# A campaign spike: --burst concurrent create_itinerary calls for the same trip (graph.ainvoke path),
+# with and without coalescing identical prompts. Reports Gemini calls made and p50/p99 latency.
+# The response cache is off so every request would otherwise reach the (stubbed) model.
+# Run from the repo root:  python -m benchmarks.bench_singleflight --burst 200 --latency 0.5
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from agent.nodes import itinerary_creator
+from agent.state import AgentState
+from agent.tools import llm
+from agent.tools.singleflight import SingleFlight
+from benchmarks.bench_concurrency import StubModel
+
+
+class QuotaStub(StubModel):
+    """StubModel that counts calls and serves at most `limit` at a time, like a rate-limited quota"""
+
+    def __init__(self, latency: float, limit: int):
+        super().__init__(latency)
+        self.calls, self.slots = 0, asyncio.Semaphore(limit)
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        async with self.slots:
+            return await super().generate_content_async(prompt)
+
+
+class NoFlight(SingleFlight):
+    async def ado(self, key, afunc):
+        return await afunc()
+
+
+def make_trip() -> AgentState:
+    start = date(2026, 7, 1)
+    return AgentState(suggested_destinations=[{"name": "Nice, France"}, {"name": "Rome, Italy"}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=4),
+                                   "travel_type": "couple"})
+
+
+async def burst(size: int):
+    async def one():
+        start = time.perf_counter()
+        await itinerary_creator.acreate_itinerary(make_trip())
+        return time.perf_counter() - start
+    samples = sorted(await asyncio.gather(*(one() for _ in range(size))))
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="stubbed Gemini seconds per call")
+    parser.add_argument("--quota", type=int, default=20, help="Gemini calls served concurrently")
+    args = parser.parse_args()
+
+    itinerary_creator.response_cache = None
+    print(f"{args.burst} identical concurrent requests, {args.latency}s per call, {args.quota} calls at a time")
+    for label, flights in (("no coalescing", NoFlight("bench")), ("single-flight", SingleFlight("bench"))):
+        model = QuotaStub(args.latency, args.quota)
+        llm.get_model = lambda name=llm.DEFAULT_MODEL: model
+        itinerary_creator.flights = flights
+        p50, p99 = asyncio.run(burst(args.burst))
+        print(f"  {label:<14} gemini calls {model.calls:4}  p50 {p50:5.2f} s  p99 {p99:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
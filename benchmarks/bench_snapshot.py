@@ -0,0 +1,70 @@
+# bench_snapshot.py
+# Cold start and per-worker memory: JSON catalog vs. memory-mapped snapshot.
+# Each mode runs in a fresh interpreter (like a new uvicorn worker) that loads the catalog,
+# answers one filter and one ranked query, then reports its RSS split into private (anon)
+# and file-backed pages. File-backed snapshot pages are shared by every worker on the host.
+# Run from the repo root:  python -m benchmarks.bench_snapshot --size 100000
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from agent.tools.snapshot import build_snapshot
+from benchmarks.synthetic import generate_destinations
+
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+from agent.tools.catalog import DestinationCatalog
+from agent.tools.snapshot import CatalogSnapshot, SnapshotCatalog
+mode, path = sys.argv[1], sys.argv[2]
+if mode == "json":
+    with open(path, encoding="utf-8") as f:
+        catalog = DestinationCatalog(json.load(f))
+else:
+    catalog = SnapshotCatalog(CatalogSnapshot(path))
+catalog.query({"preferred_city": "Europe", "budget": "low"})
+catalog.rank({"travel_style": "beach", "travel_type": "solo"})
+elapsed = (time.perf_counter() - start) * 1000
+status = dict(line.split(":", 1) for line in open("/proc/self/status") if line.startswith(("VmRSS", "RssAnon", "RssFile")))
+print(json.dumps({"ms": elapsed, **{k: int(v.split()[0]) for k, v in status.items()}}))
+"""
+
+
+def run_worker(mode, path):
+    out = subprocess.run([sys.executable, "-c", WORKER, mode, path], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        destinations = generate_destinations(args.size)
+        json_path = os.path.join(tmp, "destinations.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(destinations, f)
+
+        start = time.perf_counter()
+        snapshot_path = os.path.join(tmp, "destinations.snapshot")
+        build_snapshot(destinations, snapshot_path)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"catalog size   : {args.size:,}")
+        print(f"json file      : {os.path.getsize(json_path) / 1e6:.1f} MB")
+        print(f"snapshot file  : {os.path.getsize(snapshot_path) / 1e6:.1f} MB (built in {build_ms:.0f} ms)")
+        for mode, path in (("json", json_path), ("snapshot", snapshot_path)):
+            result = run_worker(mode, path)
+            print(f"{mode:<9}: cold start {result['ms']:7.0f} ms | RSS {result['VmRSS'] / 1024:6.1f} MB "
+                  f"(private {result['RssAnon'] / 1024:6.1f} MB, file-backed {result['RssFile'] / 1024:5.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
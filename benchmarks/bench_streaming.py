@@ -0,0 +1,80 @@
+# bench_streaming.py
+# Time to first useful content for an itinerary: waiting for the whole Gemini reply (ainvoke,
+# what /recommend does) vs. streaming it and receiving each day as it is finished (astream with
+# stream_mode "custom" and the stream_days flag, what /recommend/stream does). The stub writes one
+# day every --day-latency.
+# Run from the repo root:  python -m benchmarks.bench_streaming --days 5 --day-latency 0.4
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from agent.graph import get_graph
+from agent.nodes.itinerary_creator import STREAM_DAYS
+from agent.state import AgentState
+from agent.tools import llm
+
+
+class StreamingStub:
+    """Writes a plan day by day, `latency` seconds per day, streamed or in one reply"""
+
+    def __init__(self, days: int, latency: float):
+        self.days, self.latency = days, latency
+
+    def _sections(self):
+        yield "### Itinerary\nOverview\n\n---\n\n"
+        for d in range(1, self.days + 1):
+            yield f"**Day {d}: Exploring**\n- Morning: Walk\n- Afternoon: Museum\n- Evening: Dinner\n\n"
+        yield "---\n\n**Key Recommendations:**\n- Must-try activity: Boat trip\n"
+
+    async def generate_content_async(self, prompt, stream=False):
+        if not stream:
+            await asyncio.sleep(self.latency * self.days)
+            return type("Response", (), {"text": "".join(self._sections())})()
+
+        async def chunks():
+            for section in self._sections():
+                if section.startswith("**Day"):
+                    await asyncio.sleep(self.latency)
+                yield type("Chunk", (), {"text": section})()
+        return chunks()
+
+
+def make_state(days: int) -> AgentState:
+    start = date(2026, 7, 1)
+    return AgentState(chat_history=[{"user": "I want a beach trip in Europe on a low budget"}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=days - 1)})
+
+
+async def measure(days: int):
+    graph = get_graph()
+    start = time.perf_counter()
+    await graph.ainvoke(make_state(days))
+    blocking = time.perf_counter() - start
+
+    start, first_day, arrivals = time.perf_counter(), None, 0
+    async for event in graph.astream(make_state(days), {"configurable": {STREAM_DAYS: True}}, stream_mode="custom"):
+        if event.get("event") == "day":
+            arrivals += 1
+            first_day = first_day or time.perf_counter() - start
+    streamed = time.perf_counter() - start
+    return blocking, first_day, streamed, arrivals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--day-latency", type=float, default=0.4, help="stubbed Gemini seconds per day written")
+    args = parser.parse_args()
+
+    llm.get_model = lambda name=llm.DEFAULT_MODEL: StreamingStub(args.days, args.day_latency)
+    get_graph().invoke(AgentState())  # compile and load the catalog outside the timings
+    blocking, first_day, streamed, arrivals = asyncio.run(measure(args.days))
+    print(f"{args.days}-day itinerary, {args.day_latency}s per day")
+    print(f"  full reply (ainvoke)   first content {blocking:6.2f} s")
+    print(f"  streamed (astream)     first day     {first_day:6.2f} s, all {arrivals} days {streamed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# suite.py
+# Benchmark suite for the destination subsystem, with stored baselines and a regression check.
+#
+#   python -m benchmarks.suite                      # run 1k + 100k and print results
+#   python -m benchmarks.suite --sizes 1k 100k 1m   # include the 1M catalog (~5 min, ~1 GB RAM)
+#   python -m benchmarks.suite --save               # record results as the new baseline
+#   python -m benchmarks.suite --check              # exit 1 if anything regressed vs. the baseline
+#
+# Every operation reports latency percentiles and throughput from an untraced run, and
+# peak Python heap (tracemalloc) from a separate traced run, so tracing never skews timings.
+# Baselines are machine-specific: re-save them when moving to different hardware.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from agent.nodes.destination_finder import find_destinations
+from agent.nodes.preference_extractor import extract_preferences
+from agent.state import AgentState
+from agent.tools import destination_db
+from agent.tools.ingest import load_catalog_streaming
+from agent.tools.snapshot import CatalogSnapshot, SnapshotCatalog, build_snapshot
+from benchmarks.synthetic import SIZES, generate_messages, generate_queries, iter_destinations
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+QUERY_COUNT = 500
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def measure(run: Callable[[object], None], inputs: List, setup: Callable[[], None] = None) -> Dict[str, float]:
+    """Times run(x) for every input, then repeats one call under tracemalloc for peak heap"""
+    samples = []
+    for x in inputs:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run(x)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    run(inputs[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(percentile(samples, 0.95), 4),
+        "p99_ms": round(percentile(samples, 0.99), 4),
+        "ops_per_s": round(len(samples) / (sum(samples) / 1000), 1) if sum(samples) else 0.0,
+        "peak_mb": round(peak / 1e6, 2),
+    }
+
+
+def bench_size(size: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    repeats = max(1, min(20, 300_000 // size))  # more samples where loads are cheap and noisy
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "destinations.jsonl")
+        with open(json_path, "w", encoding="utf-8") as f:
+            for record in iter_destinations(size):
+                f.write(json.dumps(record) + "\n")
+        snapshot_path = os.path.join(tmp, "destinations.snapshot")
+        build_snapshot(iter_destinations(size), snapshot_path)
+
+        results["load_json"] = measure(lambda _: load_catalog_streaming([json_path]).warm(), [None] * repeats)
+        results["load_snapshot"] = measure(lambda _: SnapshotCatalog(CatalogSnapshot(snapshot_path)).warm(),
+                                           [None] * repeats)
+
+        catalog = load_catalog_streaming([json_path]).warm()
+        queries = generate_queries(QUERY_COUNT)
+        results["filter"] = measure(catalog.query, queries)
+        results["rank"] = measure(lambda q: catalog.rank(q, 10), queries[:100])
+
+        # extract_preferences -> find_destinations as the graph runs them, with a cold query cache.
+        # The synthetic catalog is only installed for this measurement; the process's own comes back after
+        previous = destination_db.catalog_manager.current()
+        destination_db.catalog_manager.swap(catalog)
+        try:
+            messages = generate_messages(QUERY_COUNT)
+            results["extract_find"] = measure(
+                lambda m: find_destinations(extract_preferences(AgentState(chat_history=[{"user": m}]))),
+                messages, setup=destination_db.query_cache.clear)
+        finally:
+            destination_db.catalog_manager.swap(previous)
+            destination_db.query_cache.clear()
+    return results
+
+
+def check(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions: median latency or peak heap above baseline * (1 + tolerance).
+    Tail percentiles are reported but not gated; on shared machines they are mostly scheduler noise."""
+    problems = []
+    for size, operations in results.items():
+        for op, metrics in operations.items():
+            base = baseline.get(size, {}).get(op)
+            if not base:
+                continue
+            for metric in ("p50_ms", "peak_mb"):
+                # Sub-0.5 ms / 1 MB baselines are noise-dominated: compare against a floor
+                floor = 1.0 if metric == "peak_mb" else 0.5
+                limit = max(base[metric], floor) * (1 + tolerance)
+                if metrics[metric] > limit:
+                    problems.append(f"{size} {op} {metric}: {metrics[metric]} > {limit:.4g} (baseline {base[metric]})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], help=", ".join(SIZES) + " or a number")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail when results regress against the baseline")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed growth, 1.0 = up to 2x the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    results = {}
+    for label in args.sizes:
+        size = SIZES.get(label.lower()) or int(label)
+        results[label] = bench_size(size)
+        print(f"\n== {size:,} destinations")
+        for op, m in results[label].items():
+            print(f"  {op:<14} p50 {m['p50_ms']:9.3f} ms  p95 {m['p95_ms']:9.3f} ms  p99 {m['p99_ms']:9.3f} ms"
+                  f"  {m['ops_per_s']:10.1f} ops/s  peak {m['peak_mb']:8.2f} MB")
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n✅ Baseline saved to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = check(results, baseline, args.tolerance)
+        for label in results:
+            if label not in baseline:
+                print(f"\n⚠️ No baseline for {label}: not gated (record one with --sizes {label} --save)")
+        if problems:
+            print("\n❌ Regressions:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
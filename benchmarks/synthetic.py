@@ -0,0 +1,116 @@
+# synthetic.py
+# Deterministic synthetic destination catalogs for benchmarks.
+# Distributions are skewed the way real travel catalogs are: a few regions hold most places,
+# tag popularity follows a Zipf curve, coordinates cluster around region centres.
+#
+# Write a catalog:  python -m benchmarks.synthetic --size 100000 --out /tmp/destinations.jsonl
+
+import argparse
+import json
+import random
+from typing import Dict, Iterator, List
+
+# region -> (share of catalog, centre latitude, centre longitude, spread in degrees)
+REGIONS = {
+    "Europe": (0.32, 48.0, 10.0, 8.0),
+    "Asia": (0.24, 25.0, 100.0, 15.0),
+    "North America": (0.14, 40.0, -100.0, 12.0),
+    "South America": (0.08, -15.0, -60.0, 12.0),
+    "Africa": (0.07, 0.0, 20.0, 15.0),
+    "Oceania": (0.05, -25.0, 140.0, 10.0),
+    "Middle East": (0.05, 28.0, 45.0, 6.0),
+    "Caribbean": (0.05, 18.0, -72.0, 4.0),
+}
+TAGS = ["beach", "mountain", "city", "culture", "food", "nature", "adventure", "relaxation", "history",
+        "hiking", "nightlife", "island", "shopping", "wildlife", "romantic", "museums", "architecture",
+        "wine", "skiing", "diving", "festival", "desert", "lake", "countryside", "spa", "surfing",
+        "camping", "photography", "temples", "markets", "cycling", "sailing", "volcano", "rainforest",
+        "glacier", "safari", "castles", "art", "music", "street food"]
+TAG_WEIGHTS = [1 / (rank + 1) ** 0.9 for rank in range(len(TAGS))]  # Zipf-like popularity
+TAGS_PER_PLACE = ([1, 2, 3, 4], [0.35, 0.35, 0.2, 0.1])
+BUDGETS = (["low", "moderate", "high"], [0.4, 0.4, 0.2])
+TRAVEL_TYPES = (["solo", "couple", "family", "friends"], [0.3, 0.3, 0.25, 0.15])
+SEASONS = ["summer", "winter", "spring", "autumn"]
+PLACE_WORDS = ["Port", "San", "Lake", "Mount", "Old", "New", "Cape", "Bay", "Villa", "Saint", "Little", "Grand"]
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def iter_destinations(size: int, seed: int = 42) -> Iterator[Dict]:
+    """Yields `size` destination records, identical for the same (size, seed)"""
+    rng = random.Random(seed)
+    region_names = list(REGIONS)
+    region_weights = [REGIONS[r][0] for r in region_names]
+    for i in range(size):
+        region = rng.choices(region_names, region_weights)[0]
+        _, lat, lon, spread = REGIONS[region]
+        tags = set()
+        for tag in rng.choices(TAGS, TAG_WEIGHTS, k=rng.choices(*TAGS_PER_PLACE)[0]):
+            tags.add(tag)
+        yield {
+            "name": f"{rng.choice(PLACE_WORDS)} {region.split()[0]} {i}",
+            "region": region,
+            "tags": sorted(tags),
+            "budget": rng.choices(*BUDGETS)[0],
+            "travel_type": rng.choices(*TRAVEL_TYPES)[0],
+            "latitude": f"{max(-89.9, min(89.9, rng.gauss(lat, spread))):.4f}",
+            "longitude": f"{(rng.gauss(lon, spread * 1.5) + 180) % 360 - 180:.4f}",
+        }
+
+
+def generate_destinations(size: int, seed: int = 42) -> List[Dict]:
+    return list(iter_destinations(size, seed))
+
+
+def generate_queries(count: int, seed: int = 7) -> List[Dict]:
+    """Preference dicts as the Streamlit form / extractor produce them: 1-4 keys, mixed case"""
+    rng = random.Random(seed)
+    region_names = list(REGIONS)
+    queries = []
+    for _ in range(count):
+        candidates = {
+            "preferred_city": rng.choice(region_names),
+            "travel_style": rng.choices(TAGS, TAG_WEIGHTS)[0].title(),
+            "budget": rng.choices(*BUDGETS)[0],
+            "travel_type": rng.choices(*TRAVEL_TYPES)[0].title(),
+        }
+        keys = rng.sample(list(candidates), rng.randint(1, 4))
+        queries.append({key: candidates[key] for key in keys})
+    return queries
+
+
+def generate_messages(count: int, seed: int = 11) -> List[str]:
+    """Free-text trip requests in the shape /recommend builds them"""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        parts = [f"I want a {rng.choices(TAGS, TAG_WEIGHTS)[0]} trip"]
+        if rng.random() < 0.7:
+            parts.append(f"in {rng.choice(list(REGIONS))}")
+        if rng.random() < 0.5:
+            parts.append(f"on a {rng.choices(*BUDGETS)[0]} budget")
+        if rng.random() < 0.4:
+            parts.append(f"for {rng.randint(2, 14)} days in {rng.choice(SEASONS)}")
+        messages.append(" ".join(parts) + ".")
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="100k", help="record count or one of " + ", ".join(SIZES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True, help=".json writes an array, anything else JSONL")
+    args = parser.parse_args()
+
+    size = SIZES.get(args.size.lower()) or int(args.size)
+    with open(args.out, "w", encoding="utf-8") as f:
+        if args.out.endswith(".json"):
+            json.dump(generate_destinations(size, args.seed), f)
+        else:
+            for record in iter_destinations(size, args.seed):
+                f.write(json.dumps(record) + "\n")
+    print(f"✅ Wrote {size:,} destinations to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,53 @@
 # Fast API File : 
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+import os
+import time
+import uuid
+import weakref
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import orjson
 from fastapi.middleware.cors import CORSMiddleware     #allowing frontend apps from other origins to communicate with this API
 from agent.state import AgentState
-from agent.graph import build_graph
+from agent.graph import get_durable_graph, get_graph, warm_graph
+from agent.nodes.itinerary_creator import STREAM_DAYS
+from agent.tools.destination_db import catalog_manager
+from agent.tools import metrics
+from agent.tools.llm import run_blocking
+from agent.tools.sessions import make_session_store
+from agent.tools.usage import ledger, usage_scope
 
-app = FastAPI()
+# Conversation state between /recommend calls (SESSION_BACKEND=memory|sqlite, see sessions.py)
+session_store = make_session_store()
+metrics.register_cache("sessions", session_store)
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# /recommend/batch limits: items per request, and graph runs in flight per batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+NO_ANSWER = "⚠️ Sorry, I couldn’t find anything."
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", "86400"))  # interrupted turns older than this are dropped
+MAX_TRIP_DAYS = int(os.getenv("MAX_TRIP_DAYS", "60"))  # longer trips are a 422: every day costs LLM tokens
+DAY_EVENT_KEYS = ("day", "date", "activities", "title", "slots")  # what a streamed `day` event carries
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    catalog_manager.start()  # loads the catalog in the background, then picks up destinations.json edits
+    stats = await asyncio.to_thread(warm_graph)  # compile once + dry run before taking traffic
+    print(f"🚀 Graph compiled in {stats['build_ms']} ms, warm-up run {stats['warm_ms']} ms")
+    checkpointer = get_durable_graph().checkpointer
+    if hasattr(checkpointer, "prune"):
+        print(f"🧹 Dropped {await run_blocking(checkpointer.prune, CHECKPOINT_TTL)} stale checkpoint threads")
+    yield
+    catalog_manager.stop()
+    if hasattr(session_store, "close"):
+        session_store.close()
+    if hasattr(checkpointer, "close"):
+        checkpointer.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow frontend access (CORS)
 app.add_middleware(
@@ -15,20 +58,203 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")  # the route template, so ids in paths don't explode label counts
+    metrics.request_duration.observe(time.perf_counter() - start, request.method,
+                                     route.path if route else "unmatched", str(response.status_code))
+    return response
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Node/LLM latency histograms, error counters and cache hit ratios for Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def trip_request_text(data: dict) -> str:
+    """A free-text follow-up ("something cheaper", "change day 2") or the form fields of a new search"""
+    return data.get("message") or \
+        f"I want a {data.get('trip_type')} trip in {data.get('region')} with a {data.get('budget')} budget."
+
+def trip_dates(data: dict) -> dict:
+    """start_date/end_date (ISO dates) or a number of days from today, as the itinerary node reads them"""
+    try:
+        if data.get("start_date"):
+            start = date.fromisoformat(data["start_date"])
+            end = date.fromisoformat(data["end_date"]) if data.get("end_date") else start
+        elif data.get("days"):
+            start = date.today()
+            end = start + timedelta(days=min(max(1, int(data["days"])), MAX_TRIP_DAYS + 1) - 1)
+        else:
+            return {}
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(422, "start_date/end_date must be YYYY-MM-DD and days a number")
+    if (end - start).days + 1 > MAX_TRIP_DAYS:
+        raise HTTPException(422, f"trips can be at most {MAX_TRIP_DAYS} days")
+    return {"start_date": start, "end_date": max(start, end)}
+
+async def start_turn(session_id: str, data: dict):
+    """(the text of this turn, the session's state with the turn appended)"""
+    user_input = trip_request_text(data)
+    dates = trip_dates(data)
+    # Earlier turns' preferences, suggestions and itinerary, so follow-ups only redo what changed
+    state = await run_blocking(session_store.get, session_id) or AgentState()
+    state.chat_history = state.chat_history + [{"user": user_input}]
+    state.turn += 1
+    if dates:
+        state.preferences = {**state.preferences, **dates}
+    return user_input, state
+
+def turn_config(session_id: str, state: AgentState) -> dict:
+    """One checkpoint thread per conversation turn, so a retried turn finds the run it interrupted.
+    Numbered by state.turn: chat_history is capped to SESSION_HISTORY_LIMIT, so its length stops growing"""
+    return {"configurable": {"thread_id": f"{session_id}:{state.turn}"}}
+
+async def turn_input(graph, state: AgentState, config: dict):
+    """What to run: None (resume from the last checkpoint) when this same turn was cut short
+    earlier, e.g. by a worker restart, else the new state"""
+    if graph.checkpointer is None:
+        return state
+    saved = await graph.aget_state(config)
+    if saved.next and saved.values.get("chat_history", [])[-1:] == state.chat_history[-1:]:
+        print(f"♻️ Resuming {config['configurable']['thread_id']} at {', '.join(saved.next)}")
+        return None
+    return state
+
+async def finish_turn(session_id: str, user_input: str, result: dict, graph, config: dict) -> str:
+    final_response = result.get("final_response") or NO_ANSWER
+    final_state = AgentState(**result)
+    final_state.chat_history[-1] = {"user": user_input, "assistant": final_response}
+    await run_blocking(session_store.put, session_id, final_state)
+    if graph.checkpointer is not None:  # the session store has the finished turn now
+        await graph.checkpointer.adelete_thread(config["configurable"]["thread_id"])
+    return final_response
+
 @app.post("/recommend")
 async def recommend(request: Request):
     data = await request.json()
-    trip_type = data.get("trip_type")
-    region = data.get("region")
-    budget = data.get("budget")
+    session_id = data.get("session_id") or uuid.uuid4().hex
+
+    lock = _session_locks.setdefault(session_id, asyncio.Lock())
+    async with lock:  # turns of one conversation run one at a time
+        user_input, state = await start_turn(session_id, data)
+        graph, config = get_durable_graph(), turn_config(session_id, state)
+        # shared compiled graph; never blocks the event loop
+        with usage_scope(session_id, token_budget(data)) as usage:
+            result = await graph.ainvoke(await turn_input(graph, state, config), config)
+        final_response = await finish_turn(session_id, user_input, result, graph, config)
+
+    return {"result": final_response, "session_id": session_id, **itinerary_data(result),
+            "usage": usage.summary()}
+
+def token_budget(data: dict):
+    """The request's own token budget ("token_budget"), else None for LLM_TOKEN_BUDGET"""
+    if data.get("token_budget") is None:
+        return None
+    try:
+        return max(0, int(data["token_budget"]))
+    except (TypeError, ValueError):
+        raise HTTPException(422, "token_budget must be a number of tokens")
+
+def itinerary_data(result) -> dict:
+    """The typed itinerary (days with title and slots) and its notes, so clients needn't parse markdown"""
+    return {"itinerary": result.get("itinerary") or [], "notes": result.get("itinerary_notes") or {}}
+
+def sse(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+
+@app.post("/recommend/stream")
+async def recommend_stream(request: Request):
+    """/recommend as Server-Sent Events: `destinations` once the search is done, a `day` event for
+    every itinerary day as soon as Gemini has written it, then `done` with the full response"""
+    data = await request.json()
+    session_id = data.get("session_id") or uuid.uuid4().hex
+    trip_dates(data)  # bad dates or budget are a 422 before the stream starts
+    budget = token_budget(data)
+
+    async def events():
+        lock = _session_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            user_input, state = await start_turn(session_id, data)
+            graph, config = get_durable_graph(), turn_config(session_id, state)
+            result = None
+            try:
+                run = await turn_input(graph, state, config)
+                # The node tasks start while the stream is iterated, so the scope spans the loop
+                with usage_scope(session_id, budget) as usage:
+                    days_config = {**config, "configurable": {**config["configurable"], STREAM_DAYS: True}}
+                    async for mode, chunk in graph.astream(run, days_config,
+                                                           stream_mode=["custom", "updates", "values"]):
+                        if mode == "custom" and chunk.get("event") == "day":
+                            yield sse("day", {key: chunk[key] for key in DAY_EVENT_KEYS if key in chunk})
+                        elif mode == "updates" and "suggested_destinations" in (chunk.get("find_destinations") or {}):
+                            destinations = chunk["find_destinations"]["suggested_destinations"]
+                            yield sse("destinations",
+                                      [{"name": d["name"], "region": d.get("region")} for d in destinations])
+                        elif mode == "values":
+                            result = chunk  # the state after each step; the last one is the final state
+                final_response = await finish_turn(session_id, user_input, result, graph, config)
+            except Exception as e:
+                yield sse("error", {"error": f"{type(e).__name__}: {e}", "session_id": session_id})
+                return
+        yield sse("done", {"result": final_response, "session_id": session_id, **itinerary_data(result),
+                           "usage": usage.summary()})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/recommend/batch")
+async def recommend_batch(request: Request):
+    """Many one-off trip requests in one call: [{"trip_type", "region", "budget"} | {"message"}, ...]
+    or {"items": [...], "concurrency": n}. Items are stateless (no sessions); identical ones run once.
+    Results come back in item order, each {"result": ...} or {"error": ...}, with the batch's LLM usage."""
+    data = await request.json()
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise HTTPException(422, "expected a JSON array of trip requests or {\"items\": [...]}")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(413, f"at most {BATCH_MAX_ITEMS} items per batch")
+    try:
+        concurrency = int(data.get("concurrency", BATCH_CONCURRENCY)) if isinstance(data, dict) else BATCH_CONCURRENCY
+    except (TypeError, ValueError):
+        raise HTTPException(422, "concurrency must be an integer")
+    concurrency = max(1, min(concurrency, BATCH_CONCURRENCY))  # callers may lower the limit, never raise it
+
+    # Identical requests (same text sent to the graph) share one run
+    texts = [trip_request_text(item) if isinstance(item, dict) else None for item in items]
+    outcomes = dict.fromkeys(text for text in texts if text is not None)
+
+    async def answer(text: str) -> dict:
+        try:
+            result = await get_graph().ainvoke(AgentState(chat_history=[{"user": text}]))
+            return {"result": result.get("final_response") or NO_ANSWER}
+        except Exception as e:  # one bad item doesn't fail the batch
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    async def worker(pending):
+        for text in pending:  # workers share the iterator, so at most `concurrency` graph runs at a time
+            outcomes[text] = await answer(text)
 
-    user_input = f"I want a {trip_type} trip in {region} with a {budget} budget."
+    pending = iter(list(outcomes))
+    # One account for the whole batch; no token budget, which is per request
+    with usage_scope(budget=0) as usage:
+        await asyncio.gather(*(worker(pending) for _ in range(min(concurrency, len(outcomes)))))
 
-    # Setup agent state
-    state = AgentState(chat_history=[{"user": user_input}])
-    graph = build_graph()
-    result = graph.invoke(state)
+    invalid = {"error": "expected an object with trip_type/region/budget or message"}
+    return {"results": [outcomes[text] if text is not None else invalid for text in texts],
+            "unique": len(outcomes), "usage": usage.summary()}
 
-    final_response = result.get("final_response", "⚠️ Sorry, I couldn’t find anything.")
+@app.delete("/sessions/{session_id}")
+async def end_session(session_id: str):
+    await run_blocking(session_store.delete, session_id)
+    ledger.delete(session_id)
+    return {"deleted": session_id}
 
-    return {"result": final_response}
+@app.get("/sessions/{session_id}/usage")
+async def session_usage(session_id: str):
+    """LLM calls, tokens, cost and time of a session's turns so far, in total and per node"""
+    usage = ledger.get(session_id)
+    if usage is None:
+        raise HTTPException(404, f"no LLM usage recorded for session {session_id}")
+    return {"session_id": session_id, **usage}
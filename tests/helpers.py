@@ -0,0 +1,67 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+from agent.state import AgentState
+
+ITINERARY = "\n".join(f"**Day {d}: Exploring**\n- Morning: Walk\n- Afternoon: Museum\n- Evening: Dinner"
+                      for d in range(1, 4))
+
+NICE, ROME = {"name": "Nice, France"}, {"name": "Rome, Italy"}
+
+# Catalog filters the index must answer like the linear scan (test_catalog, test_snapshot)
+QUERIES = [
+    {},
+    {"budget": "low"},
+    {"budget": "LOW", "travel_type": "Solo"},
+    {"travel_style": "Mountain"},
+    {"preferred_city": "eur"},
+    {"preferred_city": "America", "travel_style": "hiking", "budget": "moderate", "travel_type": "solo"},
+    {"preferred_city": "Atlantis"},
+    {"travel_style": "beach", "budget": "high"},
+]
+
+
+class StubResponse:
+    text = ITINERARY
+
+
+class StubModel:
+    """Stands in for genai.GenerativeModel: fixed latency, canned three-day itinerary"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return StubResponse()
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(self.latency)
+        return StubResponse()
+
+
+class CountingStub(StubModel):
+    """StubModel that counts its calls across instances; reset `calls` before use"""
+    calls = 0
+
+    def generate_content(self, prompt):
+        CountingStub.calls += 1
+        return super().generate_content(prompt)
+
+    async def generate_content_async(self, prompt):
+        CountingStub.calls += 1
+        return await super().generate_content_async(prompt)
+
+
+def make_state() -> AgentState:
+    """A first turn asking for a three-day beach trip"""
+    start = date(2026, 7, 1)
+    return AgentState(chat_history=[{"user": "I want a beach trip in Europe on a low budget"}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=2)})
+
+
+def trip(destinations, start, end) -> AgentState:
+    """State for itinerary nodes called directly: destinations already found"""
+    return AgentState(suggested_destinations=list(destinations),
+                      preferences={"start_date": start, "end_date": end, "travel_type": "couple"})
@@ -17,4 +17,4 @@ final_state = travel_agent.invoke(initial_state)
 
 # Print the final response from the agent
 print("----- Final Agent Response -----")
-print(final_state.final_response)
+print(final_state["final_response"])  # invoke() returns the state values as a dict
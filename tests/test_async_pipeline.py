@@ -0,0 +1,47 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+from agent.graph import get_graph
+from agent.state import AgentState
+from agent.tools import llm
+
+
+class SlowModel:
+    text = "**Day 1: Arrival**\n- Morning: Beach\n**Day 2: Old town**\n- Evening: Tapas"
+
+    def generate_content(self, prompt):
+        time.sleep(0.2)
+        return self
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(0.2)
+        return self
+
+
+def make_state():
+    start = date(2026, 7, 1)
+    return AgentState(chat_history=[{"user": "I want a beach trip in Europe"}],
+                      preferences={"start_date": start, "end_date": start + timedelta(days=1)})
+
+
+def test_ainvoke_overlaps_llm_calls(monkeypatch):
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: SlowModel())
+    graph = get_graph()
+
+    async def burst():
+        return await asyncio.gather(*(graph.ainvoke(make_state()) for _ in range(5)))
+
+    start = time.perf_counter()
+    results = asyncio.run(burst())
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.6  # five 0.2 s calls run concurrently, not back to back
+    for result in results:
+        assert [day["date"] for day in result["itinerary"]] == ["2026-07-01", "2026-07-02"]
+        assert "Itinerary Plan" in result["final_response"]
+
+
+def test_sync_and_async_paths_agree(monkeypatch):
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: SlowModel())
+    graph = get_graph()
+    assert graph.invoke(make_state())["final_response"] == asyncio.run(graph.ainvoke(make_state()))["final_response"]
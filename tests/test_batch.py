@@ -0,0 +1,47 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+class FakeGraph:
+    """Records graph runs and the most that were in flight at once"""
+
+    def __init__(self):
+        self.runs, self.in_flight, self.peak = [], 0, 0
+
+    async def ainvoke(self, state):
+        text = state.chat_history[-1]["user"]
+        self.runs.append(text)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if "boom" in text:
+            raise RuntimeError("boom")
+        return {"final_response": f"answer to {text}"}
+
+
+def test_batch_dedupes_limits_concurrency_and_keeps_order(monkeypatch):
+    graph = FakeGraph()
+    monkeypatch.setattr(main, "get_graph", lambda: graph)
+    items = [{"message": f"trip {i % 5}"} for i in range(20)] + [{"message": "boom"}, "not an object",
+                                                                  {"trip_type": "beach", "region": "Europe"}]
+    with TestClient(main.app) as client:
+        body = client.post("/recommend/batch", json={"items": items, "concurrency": 3}).json()
+
+    results = body["results"]
+    assert body["unique"] == 7 and len(graph.runs) == 7 and graph.peak == 3
+    assert [r["result"] for r in results[:20]] == [f"answer to trip {i % 5}" for i in range(20)]
+    assert results[20] == {"error": "RuntimeError: boom"} and "error" in results[21]
+    assert results[22]["result"] == "answer to I want a beach trip in Europe with a None budget."
+
+
+def test_batch_rejects_bad_payloads(monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_ITEMS", 2)
+    with TestClient(main.app) as client:
+        assert client.post("/recommend/batch", json={"items": "nope"}).status_code == 422
+        assert client.post("/recommend/batch", json=[{}, {}, {}]).status_code == 413
+        real = client.post("/recommend/batch", json=[{"trip_type": "beach", "region": "Europe", "budget": "low"}])
+        assert real.status_code == 200 and "Nice" in real.json()["results"][0]["result"]
@@ -0,0 +1,42 @@
+from collections import Counter
+
+from benchmarks import suite
+from benchmarks.suite import check
+from benchmarks.synthetic import generate_destinations, generate_messages, generate_queries
+from agent.tools import destination_db
+from agent.tools.ingest import validate_record
+
+
+def test_generator_is_deterministic_and_valid():
+    first = generate_destinations(2_000)
+    assert first == generate_destinations(2_000)
+    assert first != generate_destinations(2_000, seed=1)
+    assert all(validate_record(record) is None for record in first)
+    assert len({record["name"] for record in first}) == 2_000
+    assert generate_queries(50) == generate_queries(50) and generate_messages(5) == generate_messages(5)
+
+
+def test_generator_distributions_are_skewed():
+    records = generate_destinations(5_000)
+    regions = Counter(record["region"] for record in records)
+    tags = Counter(tag for record in records for tag in record["tags"])
+    assert regions.most_common(1)[0][0] == "Europe" and regions["Europe"] > 4 * regions["Caribbean"]
+    assert tags["beach"] > 5 * tags["street food"]
+
+
+def test_regression_check():
+    baseline = {"1k": {"filter": {"p50_ms": 1.0, "p95_ms": 2.0, "peak_mb": 10.0},
+                       "tiny": {"p50_ms": 0.01, "p95_ms": 0.02, "peak_mb": 0.01}}}
+    ok = {"1k": {"filter": {"p50_ms": 1.4, "p95_ms": 9.0, "peak_mb": 10.0},
+                 "tiny": {"p50_ms": 0.7, "p95_ms": 1.0, "peak_mb": 1.2},
+                 "new_op": {"p50_ms": 9}}}
+    assert check(ok, baseline, tolerance=0.5) == []
+    slow = {"1k": {"filter": {"p50_ms": 1.6, "p95_ms": 2.0, "peak_mb": 16.0}}}
+    assert [p.split(":")[0] for p in check(slow, baseline, tolerance=0.5)] == ["1k filter p50_ms", "1k filter peak_mb"]
+
+
+def test_bench_size_restores_the_live_catalog(monkeypatch):
+    monkeypatch.setattr(suite, "QUERY_COUNT", 20)
+    live = destination_db.catalog_manager.current()
+    assert set(suite.bench_size(200)) == {"load_json", "load_snapshot", "filter", "rank", "extract_find"}
+    assert destination_db.catalog_manager.current() is live
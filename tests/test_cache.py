@@ -0,0 +1,41 @@
+import time
+
+from agent.tools import destination_db
+from agent.tools.cache import LRUCache
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b", None) is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_ttl_expiry():
+    cache = LRUCache(ttl=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a", None) is None
+    assert cache.expirations == 1 and len(cache) == 0
+
+
+def test_filter_cache_is_keyed_on_normalised_preferences_and_version():
+    destination_db.query_cache.clear()
+    hits = destination_db.query_cache.hits
+    first = destination_db.filter_destinations({"budget": "low", "start_date": "2025-01-01"})
+    second = destination_db.filter_destinations({"budget": "LOW", "interest": "beach"})
+    assert first == second and first is not second
+    assert destination_db.query_cache.hits == hits + 1
+
+    catalog = destination_db.get_catalog()
+    catalog.version += 1  # what a reload does
+    try:
+        destination_db.filter_destinations({"budget": "low"})
+        assert destination_db.query_cache.hits == hits + 1
+    finally:
+        catalog.version -= 1
@@ -0,0 +1,46 @@
+from agent.tools.catalog import DestinationCatalog, bitmap_to_ids, ids_to_bitmap
+from agent.tools.destination_db import filter_destinations, get_catalog, load_destinations
+from tests.helpers import QUERIES
+
+
+def linear_filter(destinations, preferences):
+    # The original scan that the catalog replaces, kept as the reference behaviour
+    filtered = []
+    for dest in destinations:
+        match = True
+        if "preferred_city" in preferences and preferences["preferred_city"].lower() not in dest.get("region", "").lower():
+            match = False
+        if "travel_style" in preferences and preferences["travel_style"].lower() not in [t.lower() for t in dest.get("tags", [])]:
+            match = False
+        if "budget" in preferences and preferences["budget"].lower() != dest.get("budget", "").lower():
+            match = False
+        if "travel_type" in preferences and preferences["travel_type"].lower() != dest.get("travel_type", "").lower():
+            match = False
+        if match:
+            filtered.append(dest)
+    return filtered
+
+
+def test_catalog_matches_linear_scan():
+    destinations = load_destinations()
+    catalog = DestinationCatalog(destinations)
+    for preferences in QUERIES:
+        assert catalog.query(preferences) == linear_filter(destinations, preferences), preferences
+
+
+def test_catalog_is_loaded_once():
+    assert get_catalog() is get_catalog()
+    assert [d["name"] for d in filter_destinations({"budget": "low"})] == ["Nice, France", "Bali, Indonesia"]
+
+
+def test_add_invalidates_region_lookup():
+    catalog = DestinationCatalog([{"name": "A", "region": "Europe", "tags": ["beach"]}])
+    assert len(catalog.query({"preferred_city": "euro"})) == 1
+    catalog.add({"name": "B", "region": "Eastern Europe", "tags": ["Beach", "beach"]})
+    assert [d["name"] for d in catalog.query({"preferred_city": "euro", "travel_style": "beach"})] == ["A", "B"]
+
+
+def test_bitmap_to_ids_sparse_and_dense():
+    # Both unpacking paths (sparse byte scan, dense numpy unpack) give the same sorted ids
+    for ids in ([], [0], [7, 8, 4095], list(range(0, 10_000, 3)), list(range(1, 10_000))):
+        assert bitmap_to_ids(ids_to_bitmap(ids, 10_000)) == ids
@@ -0,0 +1,63 @@
+import json
+import os
+import time
+
+from agent.tools.catalog import CatalogManager, DestinationCatalog
+
+
+def write(path, records, bump=0):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))  # coarse mtime clocks
+
+
+def make_manager(path, **kwargs):
+    def loader():
+        with open(path, encoding="utf-8") as f:
+            return DestinationCatalog(json.load(f))
+    return CatalogManager(loader, [str(path)], **kwargs)
+
+
+def test_reload_swaps_and_bumps_version(tmp_path):
+    path = tmp_path / "destinations.json"
+    write(path, [{"name": "A", "budget": "low"}])
+    manager = make_manager(path)
+
+    old = manager.current()
+    assert old.version == 1 and not manager.check_for_changes()
+
+    write(path, [{"name": "A", "budget": "low"}, {"name": "B", "budget": "low"}], bump=10**9)
+    assert manager.check_for_changes()
+    new = manager.current()
+    assert new.version == 2 and len(new.query({"budget": "low"})) == 2
+    # a caller still holding the old catalog keeps a consistent view
+    assert [d["name"] for d in old.query({"budget": "low"})] == ["A"]
+
+
+def test_broken_file_keeps_serving_old_catalog(tmp_path):
+    path = tmp_path / "destinations.json"
+    write(path, [{"name": "A"}])
+    manager = make_manager(path)
+    manager.current()
+
+    path.write_text('[{"name": "half written"', encoding="utf-8")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert not manager.check_for_changes()
+    assert manager.version == 1 and len(manager.current()) == 1
+
+
+def test_background_watcher(tmp_path):
+    path = tmp_path / "destinations.json"
+    write(path, [{"name": "A"}])
+    manager = make_manager(path, poll_seconds=0.01)
+    manager.current()
+    manager.start()
+    try:
+        write(path, [{"name": "A"}, {"name": "B"}], bump=10**9)
+        deadline = time.time() + 5
+        while manager.version < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(manager.current()) == 2
+    finally:
+        manager.stop()
@@ -0,0 +1,79 @@
+from datetime import date, datetime
+from types import MappingProxyType
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent import graph as graph_module
+from agent.graph import build_graph
+from agent.state import AgentState
+from agent.tools import llm
+from agent.tools.checkpoints import CompactSerializer, SQLiteCheckpointSaver
+from tests.helpers import CountingStub, StubModel, make_state
+
+
+class Crash(BaseException):
+    """Stands in for the worker dying mid-run (not caught by the itinerary's fallback)"""
+
+
+class CrashingModel:
+    def generate_content(self, prompt):
+        raise Crash()
+
+    async def generate_content_async(self, prompt):
+        raise Crash()
+
+
+def test_compact_serializer_round_trip():
+    serde = CompactSerializer()
+    value = {"start_date": date(2026, 7, 1), "at": datetime(2026, 7, 1, 9, 30),
+             "suggested": [MappingProxyType({"name": "Nice, France"})], "timings": {"a": 1.5}}
+    kind, data = serde.dumps_typed(value)
+    assert kind == "compact" and serde.loads_typed((kind, data)) == {**value, "suggested": [{"name": "Nice, France"}]}
+    state = AgentState(preferences={"start_date": date(2026, 7, 1)})
+    assert serde.loads_typed(serde.dumps_typed(state)) == state  # non-plain values fall back to LangGraph's serde
+
+
+def test_interrupted_run_resumes_from_the_last_node(tmp_path, monkeypatch):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db"))
+    graph = build_graph(checkpointer=saver)
+    config = {"configurable": {"thread_id": "s1:1"}}
+
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: CrashingModel())
+    with pytest.raises(Crash):
+        graph.invoke(make_state(), config)
+
+    # A fresh saver on the same file, as after a restart
+    graph = build_graph(checkpointer=SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db")))
+    saved = graph.get_state(config)
+    assert saved.next == ("create_itinerary",) and saved.values["preferences"]["start_date"] == date(2026, 7, 1)
+    ran = []
+    monkeypatch.setattr(graph_module, "node_hooks", [lambda name, *_: ran.append(name)])
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: StubModel(0))
+    result = graph.invoke(None, config)
+    assert ran == ["create_itinerary", "generate_response"] and len(result["itinerary"]) == 3
+
+    saver.delete_thread("s1:1")
+    assert saver.get_tuple(config) is None
+
+
+def test_recommend_resumes_an_interrupted_turn(tmp_path, monkeypatch):
+    import main
+    durable = build_graph(checkpointer=SQLiteCheckpointSaver(str(tmp_path / "checkpoints.db")))
+    monkeypatch.setattr(graph_module, "_durable_graph", durable)
+    payload = {"session_id": "s2", "message": "A beach trip in Europe", "start_date": "2026-07-01",
+               "end_date": "2026-07-03"}
+
+    # The first attempt died in create_itinerary, after the other nodes were checkpointed
+    state = AgentState(chat_history=[{"user": payload["message"]}], turn=1,
+                       preferences={"start_date": date(2026, 7, 1), "end_date": date(2026, 7, 3)})
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: CrashingModel())
+    with pytest.raises(Crash):
+        durable.invoke(state, main.turn_config("s2", state))
+
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: CountingStub(0))
+    with TestClient(main.app) as client:
+        body = client.post("/recommend", json=payload).json()
+        assert CountingStub.calls == 1 and "Nice" in body["result"]
+        assert len(main.session_store.get("s2").itinerary) == 3
+        assert durable.checkpointer.get_tuple(main.turn_config("s2", state)) is None  # dropped once stored
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from datetime import date
+
+from agent.nodes import itinerary_creator
+from agent.nodes.itinerary_creator import _astream_ranges, _day_ranges, _itinerary_job
+from agent.tools import llm
+from agent.tools.fake_gemini import FakeGeminiModel
+from agent.tools.llm_cache import SQLiteResponseCache
+from tests.helpers import NICE, ROME, trip
+
+
+class FailingRange(FakeGeminiModel):
+    """Fails every prompt for the days from Day 8 on"""
+
+    def _reply(self, prompt, generation_config=None):
+        if "Plan Days 8-" in prompt:
+            raise RuntimeError("truncated")
+        return super()._reply(prompt, generation_config)
+
+
+def two_weeks():
+    return trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 14))
+
+
+def test_day_ranges_are_even():
+    assert _day_ranges(14, 7) == [(1, 7), (8, 14)]
+    assert _day_ranges(10, 7) == [(1, 5), (6, 10)]
+    assert _day_ranges(5, 7) == _day_ranges(5, 0) == [(1, 5)]
+
+
+def test_long_trip_ranges_run_concurrently_and_stitch_in_order(monkeypatch):
+    model = FakeGeminiModel(latency=0.3, tokens_per_s=1e9, seed=3)
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    monkeypatch.setattr(itinerary_creator, "response_cache", None)
+    prompts = _itinerary_job(two_weeks()).prompt
+    assert len(prompts) == 2 and "- Day 8 to Day 14: Rome, Italy" in prompts[1]
+
+    for run in (itinerary_creator.create_itinerary,
+                lambda state: asyncio.run(itinerary_creator.acreate_itinerary(state))):
+        start = time.perf_counter()
+        state = run(two_weeks())
+        assert time.perf_counter() - start < 0.55  # the slowest range, not the sum of both
+        assert [item["date"] for item in state.itinerary][::13] == ["2026-07-01", "2026-07-14"]
+        assert [item["activities"].count("**Day ") for item in state.itinerary] == [1] * 14
+        assert "Rome" in state.itinerary[7]["activities"] and "Travel Tips" in state.itinerary[-1]["activities"]
+    assert model.calls == 4
+
+
+def test_failed_range_falls_back_and_is_not_cached(monkeypatch, tmp_path):
+    model = FailingRange(latency=0, tokens_per_s=1e9)
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    monkeypatch.setattr(itinerary_creator, "response_cache", SQLiteResponseCache(str(tmp_path / "llm.db")))
+    state = itinerary_creator.create_itinerary(two_weeks())
+    assert len(state.itinerary) == 14 and state.itinerary[7]["activities"].startswith("Day 8: Explore")
+    assert "**Day 7" in state.itinerary[6]["activities"]
+    assert itinerary_creator.response_cache.stats()["size"] == 0
+
+
+def test_streamed_ranges_write_days_in_trip_order(monkeypatch):
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: FakeGeminiModel(latency=0, tokens_per_s=5e4))
+    state, events = two_weeks(), []
+    text, complete = asyncio.run(_astream_ranges(state, _itinerary_job(state).prompt, events.append, None))
+    assert complete and [event["day"] for event in events] == list(range(1, 15))
+    assert events[7]["date"] == "2026-07-08" and text.count("**Day ") == 14
+
+
+class PeakModel(FakeGeminiModel):
+    """Records the most calls in flight at once"""
+
+    def __init__(self):
+        super().__init__(latency=0.02, tokens_per_s=1e9, seed=5)
+        self.in_flight = self.peak = 0
+
+    async def generate_content_async(self, prompt, stream=False, generation_config=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        if not stream:
+            try:
+                return await super().generate_content_async(prompt, stream, generation_config)
+            finally:
+                self.in_flight -= 1
+        response = await super().generate_content_async(prompt, stream, generation_config)
+
+        async def chunks():
+            try:
+                async for chunk in response:
+                    yield chunk
+            finally:
+                self.in_flight -= 1
+        return chunks()
+
+
+def test_async_ranges_are_bounded_like_the_chunk_pool(monkeypatch):
+    monkeypatch.setattr(itinerary_creator, "response_cache", None)
+    monkeypatch.setattr(itinerary_creator, "CHUNK_DAYS", 2)
+    monkeypatch.setattr(itinerary_creator, "CHUNK_WORKERS", 3)
+    for streamed in (False, True):
+        state, model = trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 20)), PeakModel()  # 10 ranges
+        monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+        if streamed:
+            prompts, events = _itinerary_job(state).prompt, []
+            text, complete = asyncio.run(_astream_ranges(state, prompts, events.append, None))
+            assert complete and [event["day"] for event in events] == list(range(1, 21))
+        else:
+            result = asyncio.run(itinerary_creator.acreate_itinerary(state))
+            assert len(result.itinerary) == 20
+        assert model.calls == 10 and model.peak == 3
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import date
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+from agent.nodes import itinerary_creator
+from agent.nodes.itinerary_creator import _itinerary_prompt, _split_days, _update_prompt
+from agent.tools import llm
+from agent.tools.fake_gemini import FakeGeminiModel
+from tests.helpers import NICE, ROME, trip
+
+
+def test_fake_plans_parse_like_gemini_replies():
+    model = FakeGeminiModel(latency=0, tokens_per_s=1e9, seed=1)
+    state = trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 4))
+    response = model.generate_content(_itinerary_prompt(state))
+    preamble, days, notes = _split_days(response.text)
+    assert sorted(days) == [1, 2, 3, 4] and "Nice" in days[1] and "Rome" in days[4]
+    assert "**Selected Destinations:** Nice, France, Rome, Italy" in preamble
+    assert notes["tips"][0] == "Buy a regional rail pass" and response.usage_metadata.candidates_token_count > 0
+    assert FakeGeminiModel(latency=0, tokens_per_s=1e9, seed=1).generate_content(
+        _itinerary_prompt(state)).text == response.text  # seeded: repeatable
+
+    state.itinerary = [{"date": d, "activities": f"**Day {i}: Day {i}**\n- Morning: M{i}\n- Afternoon: A{i}\n"
+                                                 f"- Evening: E{i}"} for i, d in enumerate(("a", "b", "c", "d"), 1)]
+    update = model.generate_content(_update_prompt(state, [2, 4], ["evening"])).text
+    # Whole days back: the other lines as quoted, only the evenings rewritten
+    assert sorted(_split_days(update)[1]) == [2, 4] and "**Day 2: Day 2**\n- Morning: M2\n- Afternoon: A2\n" in update
+    assert "- Afternoon: A4\n- Evening: " in update and "E2" not in update and "E4" not in update
+
+
+def test_fake_streams_and_fails_on_request():
+    model = FakeGeminiModel(latency=0, tokens_per_s=1e9, seed=7)
+    prompt = _itinerary_prompt(trip([NICE], date(2026, 7, 1), date(2026, 7, 2)))
+
+    async def stream():
+        return [chunk.text async for chunk in await model.generate_content_async(prompt, stream=True)]
+
+    chunks = asyncio.run(stream())
+    whole = FakeGeminiModel(latency=0, tokens_per_s=1e9, seed=7).generate_content(prompt).text
+    assert len(chunks) > 1 and "".join(chunks) == whole and "**Day 2" in whole
+    with pytest.raises(ResourceExhausted):
+        FakeGeminiModel(latency=0, error_rate=1.0).generate_content(prompt)
+
+
+def test_llm_provider_fake_runs_the_itinerary_offline(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_PROVIDER", "fake")
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "0")
+    monkeypatch.setenv("FAKE_LLM_TOKENS_PER_S", "1e9")
+    monkeypatch.setattr(itinerary_creator, "response_cache", None)
+    llm.get_model.cache_clear()
+    try:
+        assert isinstance(llm.get_model(), FakeGeminiModel)
+        state = itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 3)))
+        assert len(state.itinerary) == 3 and "Rome" in state.itinerary[2]["activities"]
+        monkeypatch.setattr(llm, "LLM_PROVIDER", "openai")
+        llm.get_model.cache_clear()
+        with pytest.raises(ValueError):
+            llm.get_model()
+    finally:
+        llm.get_model.cache_clear()
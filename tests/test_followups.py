@@ -0,0 +1,161 @@
+import re
+from datetime import date, timedelta
+
+from agent.graph import build_graph
+from agent.nodes.followup_handler import cheaper_budget
+from agent.state import AgentState
+from agent.tools import llm
+
+PLAN = ("### Riviera Itinerary\nA slow trip.\n\n---\n\n"
+        + "\n\n".join(f"**Day {d}: Day {d} title**\n- Morning: Walk {d}\n- Afternoon: Museum {d}\n- Evening: Dinner {d}"
+                      for d in range(1, 4))
+        + "\n\n---\n\n**Key Recommendations:**\n- Best restaurant: Chez X\n")
+SCOPE = re.compile(r"(?:Write only|In) ((?:Day \d+(?:, )?)+)")
+
+
+class CountingModel:
+    """Full plans for full prompts; for update prompts, exactly the days it was asked for"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        scope = SCOPE.search(prompt)
+        if prompt.strip().startswith("Update") and scope:
+            days = [int(n) for n in re.findall(r"\d+", scope.group(1))]
+            self.text = "\n".join(f"**Day {d}: Updated {d}**\n- Evening: Cheap eats" for d in days)
+        else:
+            self.text = PLAN
+        return self
+
+
+def next_turn(result, message, **preferences):
+    """The previous turn's state plus a new user message (timings are per run)"""
+    values = {key: value for key, value in result.items() if key != "timings"}
+    values["chat_history"] = result["chat_history"] + [{"user": message}]
+    values["preferences"] = {**result["preferences"], **preferences}
+    return AgentState(**values)
+
+
+def test_cheaper_budget_steps_down_one_tier():
+    assert [cheaper_budget(b) for b in ("high", "luxury", "moderate", "low", "unknown")] == \
+        ["moderate", "moderate", "low", "low", "low"]
+
+
+def test_followup_turns_skip_or_narrow_llm_calls(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    graph = build_graph()
+    start = date(2026, 7, 1)
+
+    first = graph.invoke(AgentState(chat_history=[{"user": "I want a beach trip in Europe"}],
+                                    preferences={"preferred_city": "Europe", "travel_style": "beach",
+                                                 "start_date": start, "end_date": start + timedelta(days=2)}))
+    assert len(model.prompts) == 1 and len(first["itinerary"]) == 3 and first["intent"] is None
+
+    # One day changed: only that day is re-planned, no new search
+    replanned = graph.invoke(next_turn(first, "Can you change day 2 to something relaxing?"))
+    assert len(model.prompts) == 2 and "Write only Day 2." in model.prompts[-1]
+    assert replanned["itinerary"][1]["activities"] == "**Day 2: Updated 2**\n- Evening: Cheap eats"
+    assert replanned["itinerary"][0] == first["itinerary"][0] and replanned["itinerary"][2] == first["itinerary"][2]
+    assert "find_destinations" not in replanned["timings"]
+
+    # New suggestions only: no itinerary call, already-shown places are excluded
+    other = graph.invoke(next_turn(replanned, "Show me another option"))
+    assert len(model.prompts) == 2 and other["intent"] == "another"
+    shown = {d["name"] for d in first["suggested_destinations"]}
+    assert shown <= set(other["preferences"]["exclude"])
+    assert not shown & {d["name"] for d in other["suggested_destinations"]}
+    assert other["final_response"].startswith("🔄") and "create_itinerary" not in other["timings"]
+
+    cheaper = graph.invoke(next_turn(other, "Something cheaper please"))
+    assert len(model.prompts) == 2 and cheaper["intent"] == "cheaper"
+    assert cheaper["preferences"]["budget"] == cheaper_budget(other["suggested_destinations"][0]["budget"])
+
+
+def test_exclusions_only_last_through_another_turns(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    graph = build_graph()
+    start = date(2026, 7, 1)
+
+    first = graph.invoke(AgentState(chat_history=[{"user": "I want a beach trip in Europe"}],
+                                    preferences={"preferred_city": "Europe", "travel_style": "beach",
+                                                 "start_date": start, "end_date": start + timedelta(days=2)}))
+    other = graph.invoke(next_turn(first, "Show me another option"))
+    more = graph.invoke(next_turn(other, "Show me another option"))
+    shown = {d["name"] for d in first["suggested_destinations"] + other["suggested_destinations"]}
+    assert more["intent"] == "another" and shown <= set(more["preferences"]["exclude"])
+
+    # A new search starts from scratch: the places hidden by "another" can be suggested again
+    fresh = graph.invoke(next_turn(more, "I want a beach trip in Europe"))
+    assert fresh["intent"] is None and "exclude" not in fresh["preferences"]
+    assert {d["name"] for d in fresh["suggested_destinations"]} == {d["name"] for d in first["suggested_destinations"]}
+
+    # So does a change of intent
+    again = graph.invoke(next_turn(fresh, "Show me another option"))
+    cheaper = graph.invoke(next_turn(again, "Something cheaper please"))
+    assert cheaper["intent"] == "cheaper" and "exclude" not in cheaper["preferences"]
+
+
+def test_unrouted_graph_runs_every_node(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    start = date(2026, 7, 1)
+    graph = build_graph(routed=False)
+    first = graph.invoke(AgentState(chat_history=[{"user": "I want a beach trip in Europe"}],
+                                    preferences={"start_date": start, "end_date": start + timedelta(days=2)}))
+    graph.invoke(next_turn(first, "Show me another option"))
+    assert len(model.prompts) == 2
+
+
+def test_itinerary_updates_scale_with_the_change(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    graph = build_graph()
+    start = date(2026, 7, 1)
+    first = graph.invoke(AgentState(chat_history=[{"user": "I want a beach trip in Europe"}],
+                                    preferences={"preferred_city": "Europe", "travel_style": "beach", "budget": "high",
+                                                 "start_date": start, "end_date": start + timedelta(days=2)}))
+
+    # Same trip again: every day is reused, no call
+    same = graph.invoke(next_turn(first, "Sounds good, show me the plan again"))
+    assert len(model.prompts) == 1 and same["itinerary"] == first["itinerary"]
+
+    # Two more days: only Days 4-5 are generated, dates stay consecutive
+    longer = graph.invoke(next_turn(same, "Let's stay two more days", end_date=start + timedelta(days=4)))
+    assert len(model.prompts) == 2 and "Write only Day 4, Day 5." in model.prompts[-1]
+    assert [day["date"] for day in longer["itinerary"]] == [f"2026-07-0{d}" for d in range(1, 6)]
+    assert longer["itinerary"][:3] == first["itinerary"]
+
+    # Trip moved a week later: days kept by position, dates follow, no call
+    moved = graph.invoke(next_turn(longer, "Can we go a week later?", start_date=start + timedelta(days=7),
+                                   end_date=start + timedelta(days=11)))
+    assert len(model.prompts) == 2
+    assert [day["date"] for day in moved["itinerary"]][0] == "2026-07-08"
+    assert [day["activities"] for day in moved["itinerary"]] == [day["activities"] for day in longer["itinerary"]]
+
+    # Cheaper evenings: every day, evening lines only, one smaller prompt
+    evenings = graph.invoke(next_turn(moved, "Something cheaper in the evening"))
+    assert evenings["intent"] == "replan" and evenings["replan_slots"] == ["evening"]
+    assert evenings["preferences"]["budget"] == "moderate"
+    assert "rewrite only the evening activities" in model.prompts[-1]
+    # The reply only had evening lines: each day keeps its other lines (and Day 1 its overview, Day 3
+    # the recommendations) byte for byte, with just the evening swapped
+    for before, after in zip(moved["itinerary"], evenings["itinerary"]):
+        assert after["activities"] == re.sub(r"- Evening: .*", "- Evening: Cheap eats", before["activities"])
+    assert evenings["itinerary"][0]["activities"].startswith("### Riviera Itinerary\nA slow trip.")
+    assert "- Morning: Walk 1\n- Afternoon: Museum 1\n- Evening: Cheap eats" in evenings["itinerary"][0]["activities"]
+    assert evenings["itinerary"][2]["activities"].endswith("**Key Recommendations:**\n- Best restaurant: Chez X")
+    assert evenings["itinerary"][0]["slots"][0] == {"time": "Morning", "activity": "Walk 1"}
+
+    # A whole-day edit of Day 1 keeps the trip overview in front of it
+    day_one = graph.invoke(next_turn(evenings, "Can you change day 1 to something relaxing?"))
+    assert day_one["itinerary"][0]["activities"].startswith(
+        "### Riviera Itinerary\nA slow trip.\n\n---\n\n**Day 1: Updated 1**")
+    assert day_one["itinerary"][1:] == evenings["itinerary"][1:]
+
+    # Full plan for a different travel type
+    graph.invoke(next_turn(day_one, "Make it a family trip", travel_type="family"))
+    assert model.prompts[-1].strip().startswith("Create a detailed 5-day itinerary for family travelers")
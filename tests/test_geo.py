@@ -0,0 +1,43 @@
+import numpy as np
+
+from agent.tools.destination_db import get_catalog
+from agent.tools.geo import GeoIndex, haversine_km
+
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))  # uniform over the sphere
+    lons = rng.uniform(-180, 180, n)
+    return lats, lons
+
+
+def test_haversine_known_distance():
+    # Paris -> London is ~344 km
+    assert abs(haversine_km(48.8566, 2.3522, np.array([51.5074]), np.array([-0.1278]))[0] - 343.5) < 1.0
+
+
+def test_within_radius_matches_brute_force():
+    lats, lons = random_points(20_000)
+    index = GeoIndex(lats, lons, cell_deg=2.0)
+    # includes antimeridian and polar queries
+    for lat, lon, km in [(0, 0, 500), (10, 179.5, 800), (-20, -179.9, 1500), (88, 40, 700), (-89.5, 0, 300), (45, 90, 25_000)]:
+        ids, distances = index.within_radius(lat, lon, km)
+        brute = haversine_km(lat, lon, lats, lons)
+        assert set(ids.tolist()) == set(np.flatnonzero(brute <= km).tolist())
+        assert np.all(np.diff(distances) >= 0)
+
+
+def test_nearest_matches_brute_force():
+    lats, lons = random_points(5_000, seed=1)
+    index = GeoIndex(lats, lons)
+    for lat, lon in [(0, 0), (60, -179.99), (-75, 120)]:
+        ids, distances = index.nearest(lat, lon, 7)
+        brute = haversine_km(lat, lon, lats, lons)
+        assert np.allclose(distances, np.sort(brute)[:7])
+    assert len(index.nearest(0, 0, 10_000)[0]) == 5_000
+
+
+def test_catalog_geo_queries():
+    catalog = get_catalog()
+    assert [d["name"] for d in catalog.nearest(46.0, 7.5, 2)] == ["Interlaken, Switzerland", "Nice, France"]
+    assert [d["name"] for d in catalog.within_radius(43.7, 7.26, 10)] == ["Nice, France"]
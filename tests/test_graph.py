@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from agent import graph as graph_module
+from agent.state import AgentState
+
+
+def test_graph_compiled_once_across_threads(monkeypatch):
+    calls = []
+    real_build = graph_module.build_graph
+
+    def counting_build():
+        calls.append(1)
+        return real_build()
+
+    monkeypatch.setattr(graph_module, "build_graph", counting_build)
+    monkeypatch.setattr(graph_module, "_graph", None)
+    with ThreadPoolExecutor(8) as pool:
+        graphs = list(pool.map(lambda _: graph_module.get_graph(), range(32)))
+    assert len(calls) == 1 and all(g is graphs[0] for g in graphs)
+    assert graph_module.graph_stats["build_ms"] >= 0
+
+
+def test_warm_graph_dry_run_and_shared_invokes():
+    stats = graph_module.warm_graph()
+    assert {"build_ms", "warm_ms"} <= set(stats)
+
+    graph = graph_module.get_graph()
+    messages = ["I want a beach trip in Europe", "I want a mountain trip"]
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda m: graph.invoke(AgentState(chat_history=[{"user": m}])), messages * 4))
+    assert all(r["final_response"] for r in results)
+    assert [r["chat_history"][0]["user"] for r in results] == messages * 4  # no state leaks between runs
+
+
+FAN_OUT = {
+    "extract_preferences": [],
+    "check_followup": [],
+    "find_destinations": ["extract_preferences"],
+    "create_itinerary": ["find_destinations"],
+    "generate_response": [("create_itinerary", "check_followup")],
+}
+
+
+def test_parallel_branches_merge_partial_updates(monkeypatch):
+    monkeypatch.setattr(graph_module, "DEPENDENCIES", FAN_OUT)
+    monkeypatch.setattr(graph_module, "ROUTES", {})
+    graph = graph_module.build_graph()
+    state = AgentState(chat_history=[{"user": "Something different: a beach trip in Europe"}])
+    steps = {event["payload"]["name"]: event["step"]
+             for event in graph.stream(state, stream_mode="debug") if event["type"] == "task"}
+    assert steps["extract_preferences"] == steps["check_followup"]  # independent nodes share a step
+    assert steps["generate_response"] == steps["create_itinerary"] + 1  # join waited for both branches
+
+    result = graph.invoke(state)
+    assert result["is_followup"] and result["preferences"]["interest"] == "beach"
+    assert set(result["timings"]) == set(FAN_OUT)
+    assert state.preferences == {}  # nodes work on a fork, never the caller's containers
+
+
+def test_critical_path_shrinks_with_fan_out():
+    timings = {"extract_preferences": 1, "check_followup": 5, "find_destinations": 2,
+               "create_itinerary": 10, "generate_response": 1}
+    assert graph_module.critical_path_ms(timings, graph_module.SERIAL_DEPENDENCIES) == 19
+    assert graph_module.critical_path_ms(timings, FAN_OUT) == 14  # check_followup overlaps the find/itinerary chain
+    assert graph_module.critical_path_ms(timings) == 18  # production graph: check_followup overlaps extraction
+
+
+def test_followup_check_runs_alongside_extraction():
+    graph = graph_module.build_graph()
+    state = AgentState(chat_history=[{"user": "I want a beach trip in Europe"}],
+                       suggested_destinations=[{"name": "Nice, France", "budget": "high"}])
+    cheaper = AgentState(**{**vars(state), "chat_history": [{"user": "Something cheaper please"}]})
+    steps = {event["payload"]["name"]: event["step"]
+             for event in graph.stream(cheaper, stream_mode="debug") if event["type"] == "task"}
+    assert steps["extract_preferences"] == steps["check_followup"] < steps["find_destinations"]
+
+    result = graph.invoke(cheaper)
+    # The delta landed on top of this turn's preferences, and was consumed
+    assert result["intent"] == "cheaper" and result["preferences"]["budget"] == "moderate"
+    assert result["preference_delta"] == {}
@@ -0,0 +1,62 @@
+import io
+import json
+
+import pytest
+
+from agent.nodes.response_generator import generate_response
+from agent.state import AgentState
+from agent.tools.ingest import (IngestReport, iter_file, iter_json_array, load_catalog_streaming,
+                                shard_paths, validate_record)
+
+
+def test_json_array_across_chunk_boundaries():
+    data = [{"name": "A", "tags": ["x", "]"]}, 12.75, -3, "s\\\"", None, [], {"n": 1e-5}]
+    text = json.dumps(data, indent=2)
+    for chunk_size in (1, 2, 5, 4096):
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1, 2", "[1 2]", "[1,]", "[,1]", "[1.]"])
+def test_json_array_rejects_malformed_input(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 2))
+
+
+def test_validation():
+    assert validate_record({"name": "A", "tags": ["beach"], "latitude": "43.1", "longitude": -7}) is None
+    assert validate_record(["A"]) == "not an object"
+    assert validate_record({"name": " "}) == "missing name"
+    assert validate_record({"name": "A", "tags": "beach"}) == "tags must be a list of strings"
+    assert validate_record({"name": "A", "latitude": "north"}) == "latitude is not a number"
+    assert validate_record({"name": "A", "longitude": 181}) == "longitude out of range"
+
+
+def test_shards_are_merged_validated_and_deduplicated(tmp_path):
+    main = tmp_path / "destinations.json"
+    main.write_text(json.dumps([{"name": "Nice", "region": "Europe", "budget": "low"}]), encoding="utf-8")
+    (tmp_path / "destinations-provider.jsonl").write_text(
+        '{"name": "Bali", "region": "Asia", "budget": "low"}\n'
+        '\n'
+        '{"name": "nice", "region": "EUROPE", "budget": "high"}\n'
+        '{"region": "Nowhere"}\n', encoding="utf-8")
+    (tmp_path / "destinations-extra.json").write_text('﻿ [{"name": "Goa", "region": "Asia"}]', encoding="utf-8")
+
+    paths = shard_paths(str(main))
+    assert [p.split("/")[-1] for p in paths] == ["destinations.json", "destinations-extra.json",
+                                                 "destinations-provider.jsonl"]
+    assert next(iter_file(paths[1]))["name"] == "Goa"
+
+    report = IngestReport()
+    catalog = load_catalog_streaming(paths, report)
+    assert [d["name"] for d in catalog.query({"budget": "low"})] == ["Nice", "Bali"]
+    assert (report.loaded, report.skipped, report.duplicates) == (3, 1, 1)
+    assert report.errors == ["destinations-provider.jsonl[2]: missing name"]
+
+
+def test_records_without_a_region_can_be_answered():
+    record = {"name": "Nowhere", "tags": ["beach"]}
+    assert validate_record(record) is None  # region is optional
+    state = generate_response(AgentState(suggested_destinations=[record]))
+    assert state.final_response.startswith("🌍 Here's your trip to **Nowhere**:")
+    state = generate_response(AgentState(suggested_destinations=[record], intent="cheaper"))
+    assert "- **Nowhere**\n" in state.final_response
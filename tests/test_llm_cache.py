@@ -0,0 +1,46 @@
+import asyncio
+from datetime import date
+
+from agent.nodes import itinerary_creator
+from agent.tools import llm, llm_cache
+from agent.tools.cache import MISSING
+from agent.tools.llm_cache import SQLiteResponseCache, prompt_key
+from tests.helpers import NICE, ROME, CountingStub, trip
+
+
+def test_sqlite_cache_expires_and_evicts(tmp_path, monkeypatch):
+    cache = SQLiteResponseCache(str(tmp_path / "llm.db"), maxsize=2, ttl=60, max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # now the most recently used
+    cache.put("c", "cccc")  # 12 bytes stored: evicts "b", the least recently used
+    assert cache.get("b") is MISSING and cache.get("c") == "cccc"
+
+    now = llm_cache.time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 61)
+    assert cache.get("a", None) is None
+    assert cache.stats()["expirations"] == 1 and cache.stats()["evictions"] == 1
+
+    reopened = SQLiteResponseCache(str(tmp_path / "llm.db"))
+    assert reopened.get("c") == "cccc"  # survives a restart
+
+
+def test_prompt_key_ignores_whitespace():
+    assert prompt_key("Plan  a\n trip", "m") == prompt_key("Plan a trip", "m") != prompt_key("Plan a trip", "n")
+
+
+def test_cached_plan_is_rebased_onto_new_dates(tmp_path, monkeypatch):
+    monkeypatch.setattr(itinerary_creator, "response_cache", SQLiteResponseCache(str(tmp_path / "llm.db")))
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: CountingStub(0))
+    CountingStub.calls = 0
+
+    first = itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 3)))
+    # Same destinations in another order, same length, other dates: served from the cache
+    second = asyncio.run(itinerary_creator.acreate_itinerary(
+        trip([ROME, NICE], date(2026, 9, 10), date(2026, 9, 12))))
+    assert CountingStub.calls == 1
+    assert [item["date"] for item in second.itinerary] == ["2026-09-10", "2026-09-11", "2026-09-12"]
+    assert [item["activities"] for item in second.itinerary] == [item["activities"] for item in first.itinerary]
+
+    itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 4)))  # longer trip
+    assert CountingStub.calls == 2
@@ -0,0 +1,41 @@
+import re
+
+from agent.nodes.preference_extractor import extract_preferences
+from agent.state import AgentState
+from agent.tools.matcher import PhraseMatcher, get_matcher, trie_pattern
+
+VOCABULARY = {
+    "interest": {"beach": ["beach", "beaches"], "city": ["city", "city break"]},
+    "budget": {"low": ["low budget", "cheap"], "moderate": ["moderate"]},
+    "intent": {"another": ["different"], "edit": ["different", "change"]},
+}
+
+
+def test_trie_pattern_prefers_the_longest_phrase():
+    pattern = re.compile(rf"(?<!\w)(?:{trie_pattern(['be', 'beach', 'beaches', 'bean'])})(?!\w)")
+    assert pattern.findall("beaches be bean beach beachy") == ["beaches", "be", "bean", "beach"]
+
+
+def test_scan_finds_every_slot_in_one_pass():
+    matcher = PhraseMatcher(VOCABULARY)
+    assert matcher.scan("A CITY BREAK, cheap, for 10 days; change day 2 and 3 to a different  beach") == {
+        "interest": ["city", "beach"], "budget": ["low"], "duration": ["10 days"],
+        "intent": ["edit", "another"], "day": [2, 3]}
+    assert matcher.scan("a two-week trip, 3 nights first") == {"duration": ["14 days", "3 days"]}
+    assert matcher.scan("beachside cheapest moderately") == {}  # whole words only
+
+
+def test_scan_batch_matches_scan():
+    matcher = PhraseMatcher(VOCABULARY)
+    texts = ["beach on a low budget", "", "day 4\x00city", "ÖSTERREICH İstanbul city"]
+    assert matcher.scan_batch(texts) == [matcher.scan(text.replace("\x00", " ")) for text in texts]
+
+
+def test_extract_preferences_feeds_the_catalog_filters():
+    state = AgentState(chat_history=[{"user": "A family beach trip to Bali on a low budget for 7 days in July"}],
+                       preferences={"start_date": "2026-07-01"})
+    preferences = extract_preferences(state).preferences
+    assert preferences == {"start_date": "2026-07-01", "interest": "beach", "travel_style": "beach",
+                           "region": "asia", "preferred_city": "asia", "budget": "low", "season": "summer",
+                           "duration": "7 days", "travel_type": "family"}
+    assert len(get_matcher()) > 100  # the shipped vocabulary
@@ -0,0 +1,60 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from agent import graph as graph_module
+from agent.state import AgentState
+from agent.tools import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test.", ["op"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "a\"b")
+    lines = histogram.render()
+    assert 'test_seconds_bucket{op="a\\"b",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{op="a\\"b",le="1"} 2' in lines
+    assert 'test_seconds_bucket{op="a\\"b",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{op="a\\"b"} 3' in lines
+
+
+def test_outbound_errors_counted():
+    before = metrics.outbound_errors.value("gemini", "test-model", "TimeoutError")
+    with pytest.raises(TimeoutError):
+        with metrics.track_outbound("gemini", "test-model"):
+            raise TimeoutError()
+    assert metrics.outbound_errors.value("gemini", "test-model", "TimeoutError") == before + 1
+    assert metrics.outbound_duration.count("gemini", "test-model") >= 1
+
+
+def test_node_hooks_see_time_errors_and_state_growth(monkeypatch):
+    seen = []
+    monkeypatch.setattr(graph_module, "node_hooks", graph_module.node_hooks + [lambda *event: seen.append(event)])
+
+    def grow(state):
+        state.suggested_destinations = [{"name": "Nice", "region": "Europe"}] * 3
+        return state
+
+    def boom(state):
+        raise ValueError("bad input")
+
+    graph_module.as_node("grow", grow).invoke(AgentState())
+    with pytest.raises(ValueError):
+        graph_module.as_node("boom", boom).invoke(AgentState())
+
+    (name, seconds, error, delta), (bad_name, _, bad_error, bad_delta) = seen
+    assert name == "grow" and error is None and seconds >= 0 and delta > 60
+    assert bad_name == "boom" and isinstance(bad_error, ValueError) and bad_delta == 0
+    assert metrics.node_errors.value("boom", "ValueError") >= 1
+
+
+def test_metrics_endpoint():
+    import main
+    with TestClient(main.app) as client:
+        client.post("/recommend", json={"trip_type": "beach", "region": "Europe", "budget": "low"})
+        response = client.get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'agent_node_duration_seconds_count{node="find_destinations"}' in body
+    assert 'agent_http_request_duration_seconds_count{method="POST",path="/recommend",status="200"}' in body
+    assert 'agent_cache_hit_ratio{cache="destination_query"}' in body
+    assert "agent_graph_build_ms" in body
@@ -0,0 +1,39 @@
+import numpy as np
+
+from agent.state import AgentState
+from agent.nodes.destination_finder import find_destinations
+from agent.tools.destination_db import load_destinations
+from agent.tools.ranking import DestinationRanker
+
+
+def test_scores_partial_matches():
+    ranker = DestinationRanker(load_destinations())
+    # Nice, France: low / solo / beach / Europe
+    scores = ranker.score({"preferred_city": "Europe", "travel_style": "beach", "budget": "low", "travel_type": "solo"})
+    assert scores[0] == 3.0 + 2.0 + 1.5 + 1.0
+    # Interlaken: Europe only, budget is two tiers away
+    assert scores[1] == 3.0
+    # Queenstown: solo + moderate budget (one tier away)
+    assert scores[2] == 1.0 + 0.75
+
+
+def test_top_k_orders_and_drops_zero_scores():
+    ranker = DestinationRanker(load_destinations())
+    ids, scores = ranker.top_k({"travel_style": "mountain", "budget": "high"}, k=3)
+    assert ids.tolist() == [1, 2, 4]  # Interlaken, then the two moderate mountain spots in catalog order
+    assert np.all(np.diff(scores) <= 0)
+    ids, _ = ranker.top_k({"travel_style": "scuba"}, k=3)
+    assert len(ids) == 0
+
+
+def test_custom_weights_and_many_tags():
+    records = [{"name": str(i), "tags": [f"tag{i}"], "budget": "low"} for i in range(130)]
+    ranker = DestinationRanker(records)
+    assert ranker.tag_bits.shape == (130, 3)
+    ids, _ = ranker.top_k({"travel_style": "TAG129", "budget": "low"}, k=2, weights={"budget": 0.1})
+    assert ids.tolist() == [129, 0]
+
+
+def test_find_destinations_falls_back_to_closest_match():
+    state = find_destinations(AgentState(preferences={"preferred_city": "Asia", "travel_style": "mountain"}))
+    assert state.suggested_destinations[0]["name"] == "Bali, Indonesia"
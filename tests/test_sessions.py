@@ -0,0 +1,85 @@
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent.state import AgentState
+from agent.tools.sessions import MemorySessionStore, SQLiteSessionStore, decode_state, encode_state
+
+
+def make_state(turns):
+    return AgentState(preferences={"budget": "low", "start_date": date(2026, 7, 1)},
+                      suggested_destinations=[{"name": "Nice, France", "region": "Europe"}],
+                      chat_history=[{"user": f"turn {i}"} for i in range(turns)], timings={"x": 1.0})
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**limits):
+        if request.param == "memory":
+            return MemorySessionStore(**limits)
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"), **limits)
+    return make
+
+
+def test_round_trip_caps_history_and_drops_timings(make_store):
+    store = make_store(history_limit=3)
+    store.put("a", make_state(turns=5))
+    state = store.get("a")
+    assert [turn["user"] for turn in state.chat_history] == ["turn 2", "turn 3", "turn 4"]
+    assert state.preferences["start_date"] == date(2026, 7, 1) and state.timings == {}
+    assert store.get("missing") is None
+
+
+def test_lru_eviction_and_idle_ttl(make_store):
+    store = make_store(maxsize=2, ttl=0.2)
+    store.put("a", make_state(1))
+    time.sleep(0.01)
+    store.put("b", make_state(1))
+    time.sleep(0.01)
+    store.get("a")  # a is now the most recently used
+    store.put("a", store.get("a"))
+    time.sleep(0.01)
+    store.put("c", make_state(1))
+    assert store.get("b") is None and store.get("a") is not None
+    time.sleep(0.25)
+    assert store.get("c") is None  # idle past the TTL
+    assert store.stats()["evictions"] >= 1
+
+
+def test_codec_keeps_dates_and_flattens_mappings():
+    from types import MappingProxyType
+    state = make_state(1)
+    state.suggested_destinations = [MappingProxyType({"name": "Nice, France"})]
+    decoded = decode_state(encode_state(state))
+    assert decoded.suggested_destinations == [{"name": "Nice, France"}]
+    assert decoded.preferences["start_date"] == date(2026, 7, 1)
+
+
+def test_recommend_keeps_state_across_turns():
+    import main
+    with TestClient(main.app) as client:
+        first = client.post("/recommend", json={"trip_type": "beach", "region": "Europe", "budget": "low"}).json()
+        session_id = first["session_id"]
+        second = client.post("/recommend", json={"session_id": session_id, "message": "Show me another option"}).json()
+        assert second["session_id"] == session_id and second["result"] != first["result"]
+        state = main.session_store.get(session_id)
+        assert [turn["user"] for turn in state.chat_history][-1] == "Show me another option"
+        assert state.intent == "another" and state.preferences["exclude"]
+        assert client.delete(f"/sessions/{session_id}").status_code == 200
+        assert main.session_store.get(session_id) is None
+
+
+def test_turns_keep_their_own_checkpoint_thread_past_the_history_cap(monkeypatch):
+    import main
+    monkeypatch.setattr(main, "session_store", MemorySessionStore(history_limit=0))
+    threads = []
+    real_turn_config = main.turn_config
+    monkeypatch.setattr(main, "turn_config", lambda *args: threads.append(real_turn_config(*args)) or threads[-1])
+    with TestClient(main.app) as client:
+        payload = {"session_id": "capped", "trip_type": "beach", "region": "Europe", "budget": "low"}
+        for _ in range(3):
+            client.post("/recommend", json=payload)
+    assert [config["configurable"]["thread_id"] for config in threads] == ["capped:1", "capped:2", "capped:3"]
+    assert main.session_store.get("capped").chat_history == [] and main.session_store.get("capped").turn == 3
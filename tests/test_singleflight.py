@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from agent.nodes import itinerary_creator
+from agent.tools import llm
+from agent.tools.metrics import coalesced_requests
+from agent.tools.singleflight import SingleFlight
+from tests.helpers import NICE, ROME, CountingStub, trip
+
+
+def test_threads_share_one_call():
+    flight, calls = SingleFlight("test_threads"), []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return "plan"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: flight.do("k", work), range(5)))
+    assert results == ["plan"] * 5 and len(calls) == 1
+    assert coalesced_requests.value("test_threads") == 4 and flight.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_the_next_call_retries():
+    flight, calls = SingleFlight("test_errors"), []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise ValueError("quota exceeded")
+        return "plan"
+
+    async def burst():
+        return await asyncio.gather(*(flight.ado("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert all(isinstance(r, ValueError) for r in results) and len(calls) == 1
+    assert asyncio.run(flight.ado("k", work)) == "plan"
+
+
+def test_sync_caller_waits_on_an_async_leader():
+    flight, calls = SingleFlight("test_mixed"), []
+    started = threading.Event()
+
+    async def work():
+        calls.append(1)
+        started.set()
+        await asyncio.sleep(0.2)
+        return "plan"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        follower = asyncio.get_running_loop().run_in_executor(None, flight.do, "k", lambda: pytest.fail("ran twice"))
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(run()) == ["plan", "plan"] and len(calls) == 1
+
+
+def test_identical_itinerary_requests_make_one_gemini_call(monkeypatch):
+    monkeypatch.setattr(itinerary_creator, "response_cache", None)
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: CountingStub(0.1))
+    CountingStub.calls = 0
+
+    async def burst():
+        trips = [trip([NICE, ROME] if i % 2 else [ROME, NICE], date(2026, 7, 1), date(2026, 7, 3)) for i in range(6)]
+        return await asyncio.gather(*(itinerary_creator.acreate_itinerary(t) for t in trips))
+
+    states = asyncio.run(burst())
+    assert CountingStub.calls == 1 and all(len(state.itinerary) == 3 for state in states)
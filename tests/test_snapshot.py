@@ -0,0 +1,48 @@
+import pytest
+
+from agent.tools.catalog import DestinationCatalog
+from agent.tools.destination_db import load_destinations
+from agent.tools.snapshot import CatalogSnapshot, Destination, SnapshotCatalog, build_snapshot
+from tests.helpers import QUERIES
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "destinations.snapshot")
+    build_snapshot(load_destinations() + [{"name": "Nowhere", "region": "Atlantis", "tags": ["Diving"]}], path)
+    return CatalogSnapshot(path)
+
+
+def names(records):
+    return [d["name"] for d in records]
+
+
+def test_views_behave_like_the_source_dicts(snapshot):
+    nice = snapshot[0]
+    assert isinstance(nice, Destination)
+    assert dict(nice) == {"name": "Nice, France", "region": "Europe", "tags": ["beach"], "budget": "low",
+                          "travel_type": "solo", "latitude": 43.7102, "longitude": 7.262}
+    assert sorted(snapshot[2]["tags"]) == ["adventure", "mountain"]
+    nowhere = snapshot[-1]
+    assert "latitude" not in nowhere and nowhere.get("budget") == "" and nowhere.tags == ["diving"]
+    with pytest.raises(AttributeError):
+        nowhere.extra = 1  # __slots__, no per-view dict
+
+
+def test_snapshot_catalog_answers_like_the_json_catalog(snapshot):
+    records = load_destinations() + [{"name": "Nowhere", "region": "Atlantis", "tags": ["Diving"]}]
+    expected = DestinationCatalog(records)
+    catalog = SnapshotCatalog(snapshot)
+    for preferences in QUERIES + [{"travel_style": "DIVING"}]:
+        assert names(catalog.query(preferences)) == names(expected.query(preferences)), preferences
+        assert names(catalog.rank(preferences)) == names(expected.rank(preferences)), preferences
+    assert names(catalog.nearest(46.0, 7.5, 6)) == names(expected.nearest(46.0, 7.5, 6))
+    with pytest.raises(TypeError):
+        catalog.add({"name": "x"})
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "bogus.snapshot"
+    path.write_bytes(b"not a snapshot at all, just some bytes")
+    with pytest.raises(ValueError):
+        CatalogSnapshot(str(path))
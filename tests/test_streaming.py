@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from agent.graph import get_graph
+from agent.nodes.itinerary_creator import STREAM_DAYS, DayStream
+from agent.tools import llm
+from tests.helpers import make_state
+
+PLAN = ("### Nice Itinerary\nOverview\n\n---\n\n"
+        + "".join(f"**Day {d}: Day {d} title**\n- Morning: Walk\n- Evening: Dinner\n\n" for d in (1, 2, 3))
+        + "---\n\n**Key Recommendations:**\n- Best restaurant: Chez X\n")
+
+
+class StreamingModel:
+    """Replies with PLAN, in small chunks when asked to stream"""
+
+    async def generate_content_async(self, prompt, stream=False):
+        if not stream:
+            return type("Response", (), {"text": PLAN})()
+
+        async def chunks():
+            for i in range(0, len(PLAN), 7):  # chunk edges fall mid-line and mid-header
+                yield type("Chunk", (), {"text": PLAN[i:i + 7]})()
+        return chunks()
+
+
+def test_day_stream_emits_days_once_complete():
+    days = DayStream()
+    finished = [day for i in range(0, len(PLAN), 5) for day in days.feed(PLAN[i:i + 5])] + days.close()
+    assert [day for day, _ in finished] == [1, 2, 3]
+    assert finished[1][1] == "**Day 2: Day 2 title**\n- Morning: Walk\n- Evening: Dinner"
+    assert days.text == PLAN
+
+
+def test_recommend_stream_sends_days_before_done(monkeypatch):
+    import main
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: StreamingModel())
+    payload = {"trip_type": "beach", "region": "Europe", "budget": "low", "start_date": "2026-07-01",
+               "end_date": "2026-07-03"}
+    with TestClient(main.app) as client:
+        with client.stream("POST", "/recommend/stream", json=payload) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = [(block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+                      for block in response.read().decode().strip().split("\n\n")]
+
+        assert [name for name, _ in events] == ["destinations", "day", "day", "day", "done"]
+        assert events[0][1][0]["name"] == "Nice, France"
+        assert [(data["day"], data["date"]) for _, data in events[1:4]] == [
+            (1, "2026-07-01"), (2, "2026-07-02"), (3, "2026-07-03")]
+        state = main.session_store.get(events[-1][1]["session_id"])
+        assert len(state.itinerary) == 3 and "Day 3 title" in events[-1][1]["result"]
+        assert client.post("/recommend/stream", json={**payload, "start_date": "July"}).status_code == 422
+
+
+def test_days_are_only_streamed_when_the_run_asks_for_them(monkeypatch):
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: StreamingModel())
+    state = make_state()
+
+    async def custom_events(config):
+        return [event async for event in get_graph().astream(state, config, stream_mode="custom")]
+
+    assert asyncio.run(custom_events({})) == []
+    events = asyncio.run(custom_events({"configurable": {STREAM_DAYS: True}}))
+    assert [event["day"] for event in events if event["event"] == "day"] == [1, 2, 3]
+
+
+def test_oversized_trips_are_rejected(monkeypatch):
+    import main
+    monkeypatch.setattr(main, "MAX_TRIP_DAYS", 30)
+    with TestClient(main.app) as client:
+        for extra in ({"start_date": "2026-07-01", "end_date": "2026-07-31"}, {"days": 31}, {"days": 10 ** 12}):
+            for path in ("/recommend", "/recommend/stream"):
+                response = client.post(path, json={"message": "A beach trip", **extra})
+                assert response.status_code == 422 and "at most 30 days" in response.text
+    assert main.trip_dates({"start_date": "2026-07-01", "end_date": "2026-07-30"})["end_date"].day == 30
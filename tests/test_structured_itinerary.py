@@ -0,0 +1,72 @@
+import asyncio
+from datetime import date
+
+import orjson
+
+from agent.nodes import itinerary_creator
+from agent.nodes.itinerary_creator import ReplyStream, _parse_reply
+from agent.tools import llm
+from agent.tools.fake_gemini import FakeGeminiModel
+from agent.tools.itinerary_json import GENERATION_CONFIG, JsonItineraryStream
+from tests.helpers import NICE, ROME, trip
+
+PLAN = {"title": "Riviera {and} \"Rome\"", "overview": "Sun, food\\n and ruins",
+        "days": [{"day": 1, "title": "Old town", "slots": [{"time": "Morning", "activity": "Market [flowers]"}]},
+                 {"day": 2, "title": "Rome", "slots": [{"time": "Evening", "activity": "Trastevere \"dinner\""}]}],
+        "recommendations": ["Best restaurant: Da Nonna"], "tips": ["Rail pass"]}
+
+
+def test_days_are_handed_back_as_soon_as_they_close():
+    text, parser, seen = orjson.dumps(PLAN).decode(), JsonItineraryStream(), []
+    for i, char in enumerate(text):  # one character at a time: splits escapes, keys and numbers
+        for day in parser.feed(char):
+            seen.append((day["day"], i))
+    assert [day for day, _ in seen] == [1, 2]
+    assert seen[0][1] < text.index('{"day":2')  # day 1 arrived before day 2 started
+    assert parser.days == PLAN["days"] and parser.objects == 1
+    assert {key: parser.result[key] for key in ("title", "overview", "recommendations", "tips")} == \
+        {key: PLAN[key] for key in ("title", "overview", "recommendations", "tips")}
+
+
+def test_day_range_objects_merge():
+    first = {"title": "Trip", "days": PLAN["days"][:1]}
+    second = {"days": PLAN["days"][1:], "recommendations": ["Hidden gem: X"], "tips": ["Pack layers"]}
+    preamble, days, notes = _parse_reply(orjson.dumps(first).decode() + "\n\n" + orjson.dumps(second).decode())
+    assert preamble == "### Trip" and sorted(days) == [1, 2]
+    assert days[2] == {"activities": '**Day 2: Rome**\n- Evening: Trastevere "dinner"', "title": "Rome",
+                       "slots": [{"time": "Evening", "activity": 'Trastevere "dinner"'}]}
+    assert notes == {"recommendations": ["Hidden gem: X"], "tips": ["Pack layers"]}
+
+
+def test_markdown_fallback_keeps_bullets_out_of_the_notes():
+    text = FakeGeminiModel(latency=0, tokens_per_s=1e9, seed=5).generate_content(
+        itinerary_creator._itinerary_prompt(trip([NICE], date(2026, 7, 1), date(2026, 7, 3)))).text
+    state = itinerary_creator._apply_itinerary(trip([NICE], date(2026, 7, 1), date(2026, 7, 3)), text)
+    last = state.itinerary[-1]
+    assert last["activities"].count("- Morning:") == 1 and last["activities"].count("**Travel Tips:**") == 1
+    assert len(last["slots"]) == 3 and last["title"] and len(state.itinerary_notes["recommendations"]) == 4
+
+
+def test_structured_mode_end_to_end(monkeypatch):
+    monkeypatch.setattr(itinerary_creator, "STRUCTURED", True)
+    monkeypatch.setattr(itinerary_creator, "response_cache", None)
+    model = FakeGeminiModel(latency=0, tokens_per_s=1e6, seed=2)
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+
+    state = itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 4)))
+    assert [item["slots"][0]["time"] for item in state.itinerary] == ["Morning"] * 4
+    assert state.itinerary[0]["activities"].startswith("### Nice Itinerary")
+    assert state.itinerary_notes["tips"][0] == "Buy a regional rail pass"
+
+    state, events = trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 2)), []
+    text = asyncio.run(itinerary_creator._astream_days(
+        state, itinerary_creator._itinerary_prompt(state), events.append, GENERATION_CONFIG))
+    assert text.startswith("{") and [event["day"] for event in events] == [1, 2]
+    assert events[1]["activities"].startswith("**Day 2: ") and len(events[1]["slots"]) == 3
+
+
+def test_reply_stream_reads_markdown_when_json_was_asked_for():
+    stream = ReplyStream()
+    finished = stream.feed("\n**Day 1: Beach**\n- Morning: Swim\n") + stream.feed("**Day 2: Hills**\n") + stream.close()
+    assert [day for day, _ in finished] == [1, 2]
+    assert stream.typed[1] == {"title": "Beach", "slots": [{"time": "Morning", "activity": "Swim"}]}
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from agent.graph import get_graph
+from agent.nodes import itinerary_creator
+from agent.tools import llm
+from agent.tools.cache import LRUCache
+from agent.tools.fake_gemini import CHARS_PER_TOKEN, FakeGeminiModel
+from agent.tools.metrics import llm_budget_trims, llm_tokens, render
+from agent.tools.usage import estimate_tokens, ledger, node_scope, usage_scope
+from tests.helpers import NICE, ROME, StubModel, make_state, trip
+
+
+class RecordingFake(FakeGeminiModel):
+    def __init__(self):
+        super().__init__(latency=0, tokens_per_s=1e9, seed=3)
+        self.prompts = []
+
+    def _reply(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        return super()._reply(prompt, generation_config)
+
+
+def test_graph_calls_are_accounted_per_node_request_and_session(monkeypatch):
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: StubModel(0))
+    before = llm_tokens.value(llm.DEFAULT_MODEL, "create_itinerary", "prompt")
+    with usage_scope("usage-s1") as usage:
+        get_graph().invoke(make_state())
+
+    spent = usage.summary()
+    assert spent["calls"] == 1 and set(spent["nodes"]) == {"create_itinerary"}
+    assert spent["prompt_tokens"] > 0 and spent["response_tokens"] > 0  # the stub reports none: estimated
+    assert spent["cost_usd"] > 0 and ledger.get("usage-s1")["nodes"] == spent["nodes"]
+    assert llm_tokens.value(llm.DEFAULT_MODEL, "create_itinerary", "prompt") == before + spent["prompt_tokens"]
+    assert 'agent_llm_cost_usd_total{model="gemini-2.5-flash",node="create_itinerary"}' in render()
+
+
+def test_reported_usage_is_used_for_day_ranges_and_streams(monkeypatch):
+    model = RecordingFake()
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    monkeypatch.setattr(itinerary_creator, "CHUNK_DAYS", 2)
+    with usage_scope() as usage, node_scope("create_itinerary"):
+        itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 4)))
+    # Both ranges ran on chunk_pool threads and still count towards this request and node
+    assert len(model.prompts) == 2 and usage.nodes["create_itinerary"]["calls"] == 2
+    assert usage.totals["prompt_tokens"] == sum(len(prompt) // CHARS_PER_TOKEN for prompt in model.prompts)
+
+    async def stream():
+        with usage_scope() as streamed:
+            text = "".join([chunk async for chunk in llm.astream_text("Plan Days 1-1 of a 1-day itinerary "
+                                                                        "for couple travelers visiting: Nice.\n")])
+        return streamed, text
+
+    streamed, text = asyncio.run(stream())
+    assert streamed.totals["calls"] == 1 and streamed.totals["response_tokens"] == len(text) // CHARS_PER_TOKEN
+
+
+def test_budget_sends_the_compact_prompt(monkeypatch):
+    model = RecordingFake()
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    full = estimate_tokens(itinerary_creator._itinerary_prompt(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 3))))
+    trims = llm_budget_trims.value("create_itinerary")
+
+    with usage_scope(budget=full + 1000), node_scope("create_itinerary"):
+        itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 3)))
+    with usage_scope(budget=full - 1), node_scope("create_itinerary"):
+        result = itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 3)))
+
+    assert "EXACTLY" in model.prompts[0] and "EXACTLY" not in model.prompts[1]
+    assert len(model.prompts[1]) < len(model.prompts[0]) / 2
+    assert llm_budget_trims.value("create_itinerary") == trims + 1
+    assert [item["title"] for item in result.itinerary if item["title"]] and len(result.itinerary) == 3
+
+
+def test_session_usage_endpoint(monkeypatch):
+    import main
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: StubModel(0))
+    payload = {"session_id": "usage-s2", "message": "A beach trip in Europe", "start_date": "2026-07-01",
+               "end_date": "2026-07-03"}
+    with TestClient(main.app) as client:
+        body = client.post("/recommend", json=payload).json()
+        assert body["usage"]["calls"] == 1 and body["usage"]["budget"] == 0
+        assert client.post("/recommend", json={**payload, "token_budget": "lots"}).status_code == 422
+        assert client.get("/sessions/usage-s2/usage").json()["calls"] == 1
+        client.delete("/sessions/usage-s2")
+        assert client.get("/sessions/usage-s2/usage").status_code == 404
+
+
+def test_compact_replies_are_cached_apart_from_full_ones(monkeypatch):
+    model = RecordingFake()
+    monkeypatch.setattr(llm, "get_model", lambda name=llm.DEFAULT_MODEL: model)
+    monkeypatch.setattr(itinerary_creator, "response_cache", LRUCache(maxsize=10))
+    with usage_scope(budget=50):
+        itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 3)))
+    with usage_scope(budget=0):
+        itinerary_creator.create_itinerary(trip([NICE, ROME], date(2026, 7, 1), date(2026, 7, 3)))
+    with usage_scope(budget=50):
+        itinerary_creator.create_itinerary(trip([ROME, NICE], date(2026, 8, 1), date(2026, 8, 3)))
+    # The unbudgeted request got its own full-prompt reply; the second compact one came from the cache
+    assert len(model.prompts) == 2 and "EXACTLY" not in model.prompts[0] and "EXACTLY" in model.prompts[1]